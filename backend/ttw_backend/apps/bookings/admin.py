@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Booking, AdminNotification
+from .models import Booking, AdminNotification, AvailabilitySlot
 
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
@@ -8,6 +8,13 @@ class BookingAdmin(admin.ModelAdmin):
     search_fields = ('user__email', 'listing__title', 'id')
     readonly_fields = ('service_fee', 'provider_payout', 'listing_snapshot')
 
+@admin.register(AvailabilitySlot)
+class AvailabilitySlotAdmin(admin.ModelAdmin):
+    list_display = ('listing', 'date', 'session', 'booked', 'updated_at')
+    list_filter = ('date',)
+    search_fields = ('listing__title',)
+    raw_id_fields = ('listing', 'session')
+
 @admin.register(AdminNotification)
 class AdminNotificationAdmin(admin.ModelAdmin):
     list_display = (
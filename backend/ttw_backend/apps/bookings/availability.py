@@ -0,0 +1,165 @@
+"""
+Seat inventory (availability) for bookings.
+
+Every listing date — and every calendar session — that has been booked owns
+one AvailabilitySlot row counting the seats taken. Taking seats is a single
+conditional UPDATE:
+
+    UPDATE slot SET booked = booked + n WHERE id = ? AND booked <= capacity - n
+
+The UPDATE's row lock serializes concurrent checkouts on the same slot and
+the loser just gets 0 rows back (SoldOut): no read-modify-write window and
+no lock held across round trips.
+
+Capacity is read live: `Session.max` for session slots,
+`Listing.max_group_size` otherwise (None = not capped, seats are still
+counted). Multi-day trips sell seats per departure (`start_date`).
+Session / experience listings are sized per session: their
+`max_group_size` is students per instructor (1 for private classes), so
+their days are not capped.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from apps.calendar.models import Session
+from apps.listings.models import Listing
+
+from .models import AvailabilitySlot, Booking
+
+
+class SoldOut(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Not enough seats left for this date."
+    default_code = "sold_out"
+
+
+# Listing types whose maxGroupSize is a per-session ratio, not a daily cap
+PER_SESSION_TYPES = [Listing.ListingType.SESSION, Listing.ListingType.EXPERIENCE]
+
+
+def day_capacity(listing):
+    if listing.type in PER_SESSION_TYPES:
+        return None
+    return listing.max_group_size
+
+
+def capacity_for(listing, session=None):
+    if session is not None:
+        return session.max
+    return day_capacity(listing)
+
+
+def _remaining(capacity, booked):
+    return None if capacity is None else max(capacity - booked, 0)
+
+
+def remaining_seats(listing, date, session=None):
+    """
+    Seats left on `date` (None = unlimited). A plain read: use it to fail
+    fast, reserve_seats() is what actually guarantees the seats.
+    """
+    booked = AvailabilitySlot.objects.filter(
+        listing=listing, date=date, session=session
+    ).values_list("booked", flat=True).first()
+    return _remaining(capacity_for(listing, session), booked or 0)
+
+
+def reserve_seats(listing, date, guests, session=None):
+    """
+    Takes `guests` seats and returns the slot to store on the booking.
+    Call it inside the transaction creating the booking, so a failed insert
+    gives the seats back. Raises SoldOut when they are not available.
+    """
+    slot, _ = AvailabilitySlot.objects.get_or_create(listing=listing, date=date, session=session)
+
+    seats = AvailabilitySlot.objects.filter(pk=slot.pk)
+    capacity = capacity_for(listing, session)
+    if capacity is not None:
+        seats = seats.filter(booked__lte=capacity - guests)
+
+    if not seats.update(booked=F("booked") + guests, updated_at=timezone.now()):
+        raise SoldOut()
+    return slot
+
+
+def release_seats(booking):
+    """
+    Gives the seats of `booking` back. Idempotent: the booking's link to the
+    slot is cleared in the same transaction, so a retried cancellation
+    (e.g. a replayed Stripe webhook) releases nothing twice.
+    """
+    slot_id = booking.slot_id
+    with transaction.atomic():
+        if Booking.objects.filter(pk=booking.pk, slot_id=slot_id).update(slot=None):
+            AvailabilitySlot.objects.filter(pk=slot_id).update(
+                booked=Greatest(F("booked") - booking.guests, Value(0)),
+                updated_at=timezone.now(),
+            )
+    booking.slot = None
+
+
+def release_deleted_booking_seats(booking):
+    """
+    Gives back the seats of a deleted booking (post_delete: there is no
+    booking row left to clear, the slot is simply decremented).
+    """
+    if booking.slot_id:
+        AvailabilitySlot.objects.filter(pk=booking.slot_id).update(
+            booked=Greatest(F("booked") - booking.guests, Value(0)),
+            updated_at=timezone.now(),
+        )
+
+
+def availability(listing, date_from, date_to):
+    """
+    Remaining capacity per day in [date_from, date_to]: one indexed range
+    query over the listing's day slots and one over its sessions (with their
+    slot's seats joined in). Days and sessions nobody booked yet have no
+    slot row and simply report the full capacity.
+    """
+    capacity = day_capacity(listing)
+    days = {}
+    for offset in range((date_to - date_from).days + 1):
+        day = date_from + timedelta(days=offset)
+        days[day] = {
+            "date": day,
+            "booked": 0,
+            "remaining": capacity,
+            "sessions": [],
+        }
+
+    day_slots = (
+        AvailabilitySlot.objects
+        .filter(listing=listing, date__range=(date_from, date_to), session__isnull=True)
+        .values_list("date", "booked")
+    )
+    for day, booked in day_slots:
+        days[day]["booked"] = booked
+        days[day]["remaining"] = _remaining(capacity, booked)
+
+    slot_seats = AvailabilitySlot.objects.filter(
+        listing=listing, session=OuterRef("pk")
+    ).values("booked")[:1]
+    sessions = (
+        Session.objects
+        .filter(listing=listing, date__range=(date_from, date_to))
+        .annotate(seats=Coalesce(Subquery(slot_seats), 0))
+        .order_by("date", "time", "pk")
+        .values_list("pk", "date", "time", "max", "seats")
+    )
+    for session_id, day, time, session_max, booked in sessions:
+        days[day]["sessions"].append({
+            "id": session_id,
+            "time": time,
+            "capacity": session_max,
+            "booked": booked,
+            "remaining": _remaining(session_max, booked),
+        })
+
+    return list(days.values())
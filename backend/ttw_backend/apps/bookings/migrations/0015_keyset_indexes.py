@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0014_booking_estimated_platform_fee_and_more'),
+        ('calendar', '0002_remove_session_provider_id_session_auto_generated_and_more'),
+        ('listings', '0010_listingfacetcount'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['created_at', 'id'], name='bookings_bo_created_b97bfb_idx'),
+        ),
+    ]
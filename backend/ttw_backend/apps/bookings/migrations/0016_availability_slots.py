@@ -0,0 +1,76 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+from django.utils import timezone
+
+
+def backfill_slots(apps, schema_editor):
+    """
+    Counts the seats of upcoming, non-cancelled bookings into the new
+    inventory so existing reservations are not oversold.
+    """
+    Booking = apps.get_model("bookings", "Booking")
+    AvailabilitySlot = apps.get_model("bookings", "AvailabilitySlot")
+
+    upcoming = Booking.objects.filter(
+        start_date__gte=timezone.now().date(),
+        status__in=["AUTHORIZED", "COMPLETED"],
+        slot__isnull=True,
+    )
+    groups = upcoming.values("listing_id", "start_date", "session_id").annotate(seats=Sum("guests")).order_by()
+
+    for group in groups:
+        slot = AvailabilitySlot.objects.create(
+            listing_id=group["listing_id"],
+            date=group["start_date"],
+            session_id=group["session_id"],
+            booked=group["seats"],
+        )
+        upcoming.filter(
+            listing_id=group["listing_id"],
+            start_date=group["start_date"],
+            session_id=group["session_id"],
+        ).update(slot=slot)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0015_keyset_indexes'),
+        ('calendar', '0003_attendee_updated_at_session_updated_at'),
+        ('listings', '0014_listing_trip_meta'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvailabilitySlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('booked', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_slots', to='listings.listing')),
+                ('session', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='availability_slots', to='calendar.session')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='slot',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bookings', to='bookings.availabilityslot'),
+        ),
+        migrations.AddIndex(
+            model_name='availabilityslot',
+            index=models.Index(fields=['listing', 'date'], name='bookings_av_listing_0c97c4_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='availabilityslot',
+            constraint=models.UniqueConstraint(condition=models.Q(('session__isnull', True)), fields=('listing', 'date'), name='unique_listing_date_slot'),
+        ),
+        migrations.AddConstraint(
+            model_name='availabilityslot',
+            constraint=models.UniqueConstraint(condition=models.Q(('session__isnull', False)), fields=('listing', 'date', 'session'), name='unique_listing_session_slot'),
+        ),
+        migrations.RunPython(backfill_slots, migrations.RunPython.noop),
+    ]
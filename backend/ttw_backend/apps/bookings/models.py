@@ -32,6 +32,15 @@ class Booking(models.Model):
         blank=True,
         related_name='bookings'
     )
+    # Seats held in the availability inventory (cleared when released)
+    slot = models.ForeignKey(
+        'bookings.AvailabilitySlot',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='bookings'
+    )
 
     # Schedule
     start_date = models.DateField()
@@ -174,6 +183,7 @@ class Booking(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['user']),
             models.Index(fields=['listing']),
+            models.Index(fields=['created_at', 'id']),  # Keyset pagination
         ]
 
     def __str__(self):
@@ -298,6 +308,59 @@ class Booking(models.Model):
 
         super().save(*args, **kwargs)
 
+        # ----------------------------------------------------
+        # 5) GIVE SEATS BACK ON CANCELLATION
+        # ----------------------------------------------------
+        if self.status == Booking.Status.CANCELLED and self.slot_id:
+            from apps.bookings.availability import release_seats
+            release_seats(self)
+
+
+class AvailabilitySlot(models.Model):
+    """
+    Seat inventory of a listing for one date (session=None) or for one
+    calendar session on that date. Only `booked` is stored; capacity is read
+    live from the listing (max_group_size) or the session (max), so resizing
+    a group never leaves stale counters behind. See apps.bookings.availability.
+    """
+    listing = models.ForeignKey(
+        'listings.Listing',
+        on_delete=models.CASCADE,
+        related_name='availability_slots'
+    )
+    date = models.DateField()
+    # PROTECT: deleting a session would silently drop its seat count (and
+    # unlink its bookings' slot). Merge or empty the slot first.
+    session = models.ForeignKey(
+        'calendar.Session',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='availability_slots'
+    )
+    booked = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['listing', 'date'],
+                condition=models.Q(session__isnull=True),
+                name='unique_listing_date_slot',
+            ),
+            models.UniqueConstraint(
+                fields=['listing', 'date', 'session'],
+                condition=models.Q(session__isnull=False),
+                name='unique_listing_session_slot',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['listing', 'date']),  # Range reads
+        ]
+
+    def __str__(self):
+        return f"{self.listing_id} {self.date} ({self.booked} booked)"
+
 
 class AdminNotification(models.Model):
     """
@@ -340,4 +403,15 @@ class AdminNotification(models.Model):
         ]
 
     def __str__(self):
-        return f"[ADMIN] {self.type} – Booking {self.booking_id}"
\ No newline at end of file
+        return f"[ADMIN] {self.type} – Booking {self.booking_id}"
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+@receiver(post_delete, sender=Booking)
+def release_seats_on_delete(sender, instance, **kwargs):
+    """
+    Seats are otherwise only given back on cancellation (Booking.save).
+    """
+    from apps.bookings.availability import release_deleted_booking_seats
+    release_deleted_booking_seats(instance)
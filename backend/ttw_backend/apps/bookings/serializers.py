@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Booking
+from .availability import remaining_seats
 from apps.listings.serializers import ListingSerializer
 from apps.users.serializers import UserSerializer
 from django.utils import timezone
@@ -76,22 +77,31 @@ class CreateBookingSerializer(serializers.ModelSerializer):
     class Meta:
         model = Booking
         fields = [
-            'listing', 'start_date', 'end_date', 'guests'
+            'listing', 'session', 'start_date', 'end_date', 'guests'
         ]
     
     def validate(self, data):
         """
         Expert Validation:
-        1. Check availability (Overlap logic)
+        1. Check availability (seat inventory)
         2. Prevent booking past dates
         """
         if data['start_date'] < timezone.now().date():
             raise serializers.ValidationError("Cannot book dates in the past.")
 
-        # Add Availability Check Here (Optional for MVP, Critical for Prod)
-        # existing = Booking.objects.filter(listing=data['listing'], start_date=data['start_date'])
-        # if existing.exists(): raise serializers.ValidationError("Date unavailable")
+        guests = data.get('guests', 1)
+        if guests < 1:
+            raise serializers.ValidationError({"guests": "At least one guest is required."})
 
+        session = data.get('session')
+        if session is not None:
+            if session.date != data['start_date'] or session.listing_id != data['listing'].pk:
+                raise serializers.ValidationError({"session": "Session does not belong to this listing and date."})
+
+        # Fail fast; the seats are actually taken atomically in BookingViewSet.create
+        remaining = remaining_seats(data['listing'], data['start_date'], session)
+        if remaining is not None and guests > remaining:
+            raise serializers.ValidationError("Date unavailable: not enough seats left.")
 
         return data
 
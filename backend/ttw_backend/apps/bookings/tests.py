@@ -1,3 +1,302 @@
+from datetime import time, timedelta
+from unittest import mock
+
+from django.db import connection
+from django.db.models import ProtectedError
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.bookings.availability import SoldOut, availability, reserve_seats
+from apps.bookings.models import AvailabilitySlot, Booking
+from apps.calendar.models import Session
+from apps.core.models import OutboxEmail
+from apps.core.outbox import CLAIM_TIMEOUT, deliver
+from apps.core.ratelimit import RateLimited
+from apps.listings.models import Listing, Sport
+from apps.locations.models import City, Country
+from apps.payments.stripe_webhooks import _handle_checkout_session_expired
+from apps.users.models import User
+
+
+class BookingTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        country = Country.objects.create(code="ES", name="Spain")
+        city = City.objects.create(
+            name="Tarifa", slug="tarifa", latitude=36.01, longitude=-5.6, country=country
+        )
+        sport = Sport.objects.create(name="Kitesurf", slug="kitesurf")
+        self.owner = User.objects.create_user(email="school@example.com", password="x", role="PROVIDER")
+        self.traveler = User.objects.create_user(email="traveler@example.com", password="x", role="TRAVELER")
+
+        self.listing = Listing.objects.create(
+            owner=self.owner,
+            title="Kite camp",
+            description="Learn to kite",
+            type="TRIP",
+            sport=sport,
+            city=city,
+            price=100,
+            universal_level="BEGINNER",
+            details={"maxGroupSize": 4},
+        )
+        self.date = timezone.now().date() + timedelta(days=10)
+
+    def book(self, guests):
+        self.client.force_authenticate(self.traveler)
+        return self.client.post("/api/bookings/", {
+            "listing": str(self.listing.pk),
+            "start_date": self.date.isoformat(),
+            "guests": guests,
+        }, secure=True)
+
+
+
+class AvailabilityTests(BookingTestCase):
+    def booked(self):
+        return AvailabilitySlot.objects.get(listing=self.listing, date=self.date, session=None).booked
+
+    def test_reserve_until_sold_out(self):
+        reserve_seats(self.listing, self.date, 3)
+        with self.assertRaises(SoldOut):
+            reserve_seats(self.listing, self.date, 2)
+        reserve_seats(self.listing, self.date, 1)
+        self.assertEqual(self.booked(), 4)
+
+    def test_create_booking_takes_seats(self):
+        self.assertEqual(self.book(3).status_code, 201)
+        self.assertEqual(self.booked(), 3)
+
+        response = self.book(2)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_expired_checkout_releases_seats(self):
+        self.book(4)
+        booking = Booking.objects.get()
+        event = {
+            "id": "evt_1",
+            "type": "checkout.session.expired",
+            "data": {"object": {"metadata": {"booking_id": str(booking.pk), "type": "booking"}}},
+        }
+
+        _handle_checkout_session_expired(event)
+        _handle_checkout_session_expired(event)  # Replayed webhook
+
+        booking.refresh_from_db()
+        self.assertEqual((booking.status, booking.slot_id), (Booking.Status.CANCELLED, None))
+        self.assertEqual(self.booked(), 0)
+
+    def test_expired_checkout_keeps_paid_bookings(self):
+        self.book(4)
+        Booking.objects.update(payment_authorized_at=timezone.now())
+
+        _handle_checkout_session_expired({
+            "id": "evt_1",
+            "data": {"object": {"metadata": {"booking_id": str(Booking.objects.get().pk)}}},
+        })
+
+        self.assertEqual(Booking.objects.get().status, Booking.Status.AUTHORIZED)
+        self.assertEqual(self.booked(), 4)
+
+    def test_cancel_releases_seats_once(self):
+        self.book(4)
+        booking = Booking.objects.get()
+
+        booking.status = Booking.Status.CANCELLED
+        booking.save()
+        booking.save()  # Replayed cancellation
+
+        self.assertEqual(self.booked(), 0)
+        self.assertIsNone(Booking.objects.get().slot_id)
+
+    def test_availability_range(self):
+        self.book(3)
+        url = (
+            f"/api/availability/?listing={self.listing.pk}"
+            f"&from={self.date - timedelta(days=1)}&to={self.date + timedelta(days=1)}"
+        )
+
+        with self.assertNumQueries(3):  # listing + day slots + sessions
+            response = self.client.get(url, secure=True)
+
+        self.assertEqual(response.status_code, 200)
+        days = response.json()["days"]
+        self.assertEqual([d["remaining"] for d in days], [4, 1, 4])
+
+    def test_deleting_a_booking_releases_seats(self):
+        self.book(3)
+        Booking.objects.get().delete()
+
+        self.assertEqual(self.booked(), 0)
+        self.assertEqual(self.book(4).status_code, 201)
+
+    def test_unbooked_sessions_report_their_capacity(self):
+        session_at = {
+            hour: Session.objects.create(
+                provider=self.owner.provider_profile, listing=self.listing,
+                date=self.date, time=time(hour, 0), max=6,
+            )
+            for hour in (9, 11)
+        }
+        reserve_seats(self.listing, self.date, 2, session_at[11])
+
+        (day,) = availability(self.listing, self.date, self.date)
+
+        self.assertEqual(
+            [(s["id"], s["booked"], s["remaining"]) for s in day["sessions"]],
+            [(session_at[9].pk, 0, 6), (session_at[11].pk, 2, 4)],
+        )
+
+    def test_sessions_holding_seats_are_protected(self):
+        session = Session.objects.create(
+            provider=self.owner.provider_profile, listing=self.listing,
+            date=self.date, time=time(9, 0), max=6,
+        )
+        reserve_seats(self.listing, self.date, 2, session)
+
+        with self.assertRaises(ProtectedError):
+            session.delete()
+
+    def test_private_sessions_do_not_cap_the_day(self):
+        # maxGroupSize 1 = one student per instructor, not one booking a day
+        self.listing.type = Listing.ListingType.SESSION
+        self.listing.details = {"isPrivate": True, "maxGroupSize": 1}
+        self.listing.save()
+
+        self.assertEqual(self.book(1).status_code, 201)
+        self.assertEqual(self.book(1).status_code, 201)
+        self.assertEqual(self.booked(), 2)
+
+    def test_session_must_belong_to_listing(self):
+        other = Listing.objects.create(
+            owner=self.owner, title="Surf lesson", description="Learn to surf", type="SESSION",
+            sport=self.listing.sport, city=self.listing.city, price=50, universal_level="BEGINNER",
+        )
+        session = Session.objects.create(
+            provider=self.owner.provider_profile, listing=other, date=self.date, time=time(10, 0), max=4
+        )
+        self.client.force_authenticate(self.traveler)
+
+        response = self.client.post("/api/bookings/", {
+            "listing": str(self.listing.pk),
+            "session": session.pk,
+            "start_date": self.date.isoformat(),
+            "guests": 1,
+        }, secure=True)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("session", response.json())
+
+    def test_availability_rejects_bad_range(self):
+        url = f"/api/availability/?listing={self.listing.pk}&from=2030-01-10&to=2030-01-01"
+        self.assertEqual(self.client.get(url, secure=True).status_code, 400)
+
+
+
+class BookingEmailOutboxTests(BookingTestCase):
+    def test_create_queues_emails_after_commit(self):
+        with mock.patch("apps.core.tasks.dispatch_outbox_email.delay") as delay, \
+                mock.patch("apps.calendar.tasks.materialize_booking_task.delay") as materialize:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(self.book(1).status_code, 201)
+
+        emails = OutboxEmail.objects.all()
+        self.assertEqual(
+            sorted(e.template for e in emails),
+            ["booking_created_admin", "booking_created_provider", "booking_created_user"],
+        )
+        self.assertEqual(sorted(c.args[0] for c in delay.call_args_list), sorted(e.pk for e in emails))
+        materialize.assert_called_once()
+
+    def test_sold_out_booking_queues_nothing(self):
+        self.book(4)
+        OutboxEmail.objects.all().delete()
+
+        self.assertEqual(self.book(1).status_code, 400)
+        self.assertFalse(OutboxEmail.objects.exists())
+
+    def test_deliver_batches_pending_emails(self):
+        self.book(1)
+        email = OutboxEmail.objects.get(template="booking_created_provider")
+
+        with mock.patch("apps.core.outbox.send_batch") as send_batch:
+            self.assertEqual(deliver(email.pk), 3)
+            self.assertEqual(deliver(email.pk), 0)
+
+        send_batch.assert_called_once()
+        self.assertEqual(len(send_batch.call_args.args[0]), 3)
+        self.assertFalse(OutboxEmail.objects.exclude(status=OutboxEmail.Status.SENT).exists())
+
+    def test_deliver_renders_without_loading_the_booking(self):
+        self.book(1)
+        email = OutboxEmail.objects.first()
+
+        with mock.patch("apps.core.outbox.send_batch"), CaptureQueriesContext(connection) as queries:
+            deliver(email.pk)
+
+        self.assertFalse([q for q in queries if "bookings_booking" in q["sql"]])
+
+    def test_deliver_records_failures(self):
+        self.book(1)
+        email = OutboxEmail.objects.first()
+
+        with mock.patch("apps.core.outbox.send_batch", side_effect=Exception("Resend error 500")):
+            with self.assertRaises(Exception):
+                deliver(email.pk)
+
+        for row in OutboxEmail.objects.all():
+            self.assertEqual((row.status, row.attempts), (OutboxEmail.Status.PENDING, 1))
+            self.assertIn("500", row.last_error)
+
+    def test_deliver_sends_outside_the_transaction(self):
+        self.book(1)
+        email = OutboxEmail.objects.first()
+        savepoints = len(connection.savepoint_ids)  # TestCase's own atomic blocks
+
+        def send_batch(payloads, **kwargs):
+            self.assertEqual(len(connection.savepoint_ids), savepoints)
+            statuses = set(OutboxEmail.objects.values_list("status", flat=True))
+            self.assertEqual(statuses, {OutboxEmail.Status.SENDING})
+
+        with mock.patch("apps.core.outbox.send_batch", side_effect=send_batch):
+            self.assertEqual(deliver(email.pk), 3)
+
+    def test_claimed_emails_are_left_to_their_worker(self):
+        self.book(1)
+        email = OutboxEmail.objects.first()
+        OutboxEmail.objects.update(status=OutboxEmail.Status.SENDING, claimed_at=timezone.now())
+
+        with mock.patch("apps.core.outbox.send_batch") as send_batch:
+            self.assertEqual(deliver(email.pk), 0)
+            # Worker died mid-send: the claim expires
+            OutboxEmail.objects.update(claimed_at=timezone.now() - CLAIM_TIMEOUT - timedelta(seconds=1))
+            self.assertEqual(deliver(email.pk), 1)
+
+        send_batch.assert_called_once()
+        self.assertEqual(OutboxEmail.objects.get(pk=email.pk).status, OutboxEmail.Status.SENT)
+
+    def test_rate_limited_emails_are_released(self):
+        self.book(1)
+        email = OutboxEmail.objects.first()
+
+        with mock.patch("apps.core.outbox.send_batch", side_effect=RateLimited(1.0)):
+            with self.assertRaises(RateLimited):
+                deliver(email.pk)
+
+        for row in OutboxEmail.objects.all():
+            self.assertEqual((row.status, row.attempts), (OutboxEmail.Status.PENDING, 0))
+
+    def test_failed_email_is_retried_alone(self):
+        self.book(1)
+        first, *others = OutboxEmail.objects.all()
+        OutboxEmail.objects.filter(pk=first.pk).update(attempts=1)
+
+        with mock.patch("apps.core.outbox.send_batch") as send_batch:
+            self.assertEqual(deliver(first.pk), 1)
+            self.assertEqual(deliver(others[0].pk), 2)
 
-# Create your tests here.
+        self.assertEqual([len(c.args[0]) for c in send_batch.call_args_list], [1, 2])
@@ -1,27 +1,38 @@
 from rest_framework.authentication import SessionAuthentication
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
+from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.db import transaction
 from django.db.models import Q
 from rest_framework.permissions import IsAdminUser
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from django.conf import settings
 from django.utils import timezone
-from apps.core.emails import send_email
-from apps.core.tasks import send_booking_email_task
+from django.utils.dateparse import parse_date
+from datetime import timedelta
+from apps.core.email_templates import booking_email_data
+from apps.core.outbox import enqueue_email
+from apps.core.pagination import KeysetPagination
+from apps.calendar.reconcile import materialize_on_commit
 
 from apps.bookings.models import AdminNotification
 from .models import Booking
+from .availability import availability, day_capacity, reserve_seats
 from .serializers import BookingSerializer, CreateBookingSerializer
 from .serializers import AdminBookingSerializer
 from apps.listings.models import Listing
 
 from decimal import Decimal
+import logging
+import uuid
 
 from apps.payments.models import MerchantPayout
 
+logger = logging.getLogger(__name__)
+
 class BookingViewSet(viewsets.ModelViewSet):
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -59,7 +70,6 @@ class BookingViewSet(viewsets.ModelViewSet):
 
 
     def create(self, request, *args, **kwargs):
-        print('🔥 BOOKING CREATE VIEW HIT')
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
@@ -67,64 +77,66 @@ class BookingViewSet(viewsets.ModelViewSet):
         guests = serializer.validated_data.get('guests', 1)
         total_price = listing.price * guests
 
-        booking = serializer.save(
-            user=request.user,
-            total_price=total_price,
-            currency=listing.currency,
-            status=Booking.Status.AUTHORIZED,
-        )
-        # Ensure estimated financials are persisted on creation (AUTHORIZED)
-        booking.save()
-        print('🔥 BOOKING SAVED:', booking.id)
-
-        # =============================
-        # EMAILS — BOOKING CREATED
-        # =============================
-
-        # USER EMAIL
-        if booking.user and booking.user.email:
-            print('📧 EMAIL SENT -> USER')
-            send_email(
-                to=[booking.user.email],
-                subject='Booking received – The Travel Wild',
-                template='booking_created_user',
-                context={
-                    'booking': booking,
-                    'listing': booking.listing,
-                },
-                from_email=settings.BOOKINGS_EMAIL,
-                reply_to=settings.EMAIL_REPLY_TO,
+        # Seats + booking commit together: a sold-out slot raises SoldOut (409)
+        with transaction.atomic():
+            slot = reserve_seats(
+                listing,
+                serializer.validated_data['start_date'],
+                guests,
+                serializer.validated_data.get('session'),
             )
-
-        # PROVIDER / SCHOOL EMAIL
-        provider_email = booking.listing.owner.email if booking.listing.owner else None
-        if provider_email:
-            print('📧 EMAIL SENT -> PROVIDER')
-            send_email(
-                to=[provider_email],
-                subject='New booking received – Action required',
-                template='booking_created_provider',
-                context={
-                    'booking': booking,
-                    'listing': booking.listing,
-                },
-                from_email=settings.BOOKINGS_EMAIL,
-                reply_to=settings.EMAIL_REPLY_TO,
+            booking = serializer.save(
+                user=request.user,
+                total_price=total_price,
+                currency=listing.currency,
+                status=Booking.Status.AUTHORIZED,
+                slot=slot,
+            )
+            # Ensure estimated financials are persisted on creation (AUTHORIZED)
+            booking.save()
+            logger.info("Booking %s created for listing %s", booking.id, listing.id)
+
+            # Provider calendar: session + attendee, after commit
+            materialize_on_commit(booking)
+
+            # =============================
+            # EMAILS — BOOKING CREATED
+            # =============================
+            # Queued in the booking's transaction, sent by Celery after commit
+            context = booking_email_data(booking)
+
+            # USER EMAIL
+            if booking.user and booking.user.email:
+                enqueue_email(
+                    to=[booking.user.email],
+                    subject='Booking received – The Travel Wild',
+                    template='booking_created_user',
+                    context=context,
+                    from_email=settings.BOOKINGS_EMAIL,
+                    reply_to=settings.EMAIL_REPLY_TO,
+                )
+
+            # PROVIDER / SCHOOL EMAIL
+            provider_email = listing.owner.email if listing.owner else None
+            if provider_email:
+                enqueue_email(
+                    to=[provider_email],
+                    subject='New booking received – Action required',
+                    template='booking_created_provider',
+                    context=context,
+                    from_email=settings.BOOKINGS_EMAIL,
+                    reply_to=settings.EMAIL_REPLY_TO,
+                )
+
+            # ADMIN EMAIL
+            enqueue_email(
+                to=[settings.SUPPORT_EMAIL],
+                subject='ADMIN: New booking created',
+                template='booking_created_admin',
+                context=context,
+                from_email=settings.SUPPORT_EMAIL,
+                reply_to=settings.SUPPORT_EMAIL,
             )
-
-        # ADMIN EMAIL
-        print('📧 EMAIL SENT -> ADMIN')
-        send_email(
-            to=[settings.SUPPORT_EMAIL],
-            subject='ADMIN: New booking created',
-            template='booking_created_admin',
-            context={
-                'booking': booking,
-                'listing': booking.listing,
-            },
-            from_email=settings.SUPPORT_EMAIL,
-            reply_to=settings.SUPPORT_EMAIL,
-        )
 
         headers = self.get_success_headers(serializer.data)
         return Response(
@@ -261,42 +273,44 @@ class BookingViewSet(viewsets.ModelViewSet):
         )
 
         # ---------------------------------------------------------
-        # EMAIL NOTIFICATIONS (CELERY)
+        # EMAIL NOTIFICATIONS (OUTBOX → one batch request after commit)
         # ---------------------------------------------------------
-
-        # USER
-        if booking.user and booking.user.email:
-            send_booking_email_task.delay(
-                to=[booking.user.email],
-                subject="Your activity has been finalized – The Travel Wild",
-                template="booking_finalized_user",
-                context={"booking_id": str(booking.id)},
+        context = booking_email_data(booking)
+
+        with transaction.atomic():
+            # USER
+            if booking.user and booking.user.email:
+                enqueue_email(
+                    to=[booking.user.email],
+                    subject="Your activity has been finalized – The Travel Wild",
+                    template="booking_finalized_user",
+                    context=context,
+                    from_email=settings.BOOKINGS_EMAIL,
+                )
+
+            # PROVIDER
+            provider_email = booking.listing.owner.email if booking.listing.owner else None
+            if provider_email:
+                enqueue_email(
+                    to=[provider_email],
+                    subject="Booking finalized – The Travel Wild",
+                    template="booking_finalized_provider",
+                    context=context,
+                    from_email=settings.BOOKINGS_EMAIL,
+                )
+
+            # ADMIN / OPS
+            enqueue_email(
+                to=[settings.SUPPORT_EMAIL],
+                subject="Booking finalized – Admin notification",
+                template="booking_finalized_admin",
+                context=context,
                 from_email=settings.BOOKINGS_EMAIL,
             )
 
-        # PROVIDER
-        provider_email = booking.listing.owner.email if booking.listing.owner else None
-        if provider_email:
-            send_booking_email_task.delay(
-                to=[provider_email],
-                subject="Booking finalized – The Travel Wild",
-                template="booking_finalized_provider",
-                context={"booking_id": str(booking.id)},
-                from_email=settings.BOOKINGS_EMAIL,
-            )
-
-        # ADMIN / OPS
-        send_booking_email_task.delay(
-            to=[settings.SUPPORT_EMAIL],
-            subject="Booking finalized – Admin notification",
-            template="booking_finalized_admin",
-            context={"booking_id": str(booking.id)},
-            from_email=settings.BOOKINGS_EMAIL,
-        )
-
-        # --- MARK FINAL EMAILS AS SENT (IDEMPOTENCY) ---
-        booking.final_emails_sent_at = timezone.now()
-        booking.save(update_fields=["final_emails_sent_at"])
+            # --- MARK FINAL EMAILS AS SENT (IDEMPOTENCY) ---
+            booking.final_emails_sent_at = timezone.now()
+            booking.save(update_fields=["final_emails_sent_at"])
 
         # ---------------------------------------------------------
         # ADMIN DASHBOARD NOTIFICATION
@@ -390,6 +404,7 @@ class AdminBookingViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = AdminBookingSerializer
     authentication_classes = [JWTAuthentication, SessionAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination  # ?cursor= → keyset on (created_at, id)
 
     def get_queryset(self):
         return Booking.objects.select_related(
@@ -407,4 +422,53 @@ class AdminBookingViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        return super().list(request, *args, **kwargs)
\ No newline at end of file
+        return super().list(request, *args, **kwargs)
+
+class AvailabilityView(APIView):
+    """
+    GET /api/availability/?listing=<id>&from=YYYY-MM-DD&to=YYYY-MM-DD
+
+    Remaining seats per day (and per booked session) of a listing.
+    Defaults to the next 30 days; at most MAX_AVAILABILITY_DAYS per request.
+    """
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    MAX_AVAILABILITY_DAYS = 62
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            listing_id = uuid.UUID(params.get('listing', ''))
+        except ValueError:
+            return Response({"error": "Missing or invalid listing"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            date_from = parse_date(params['from']) if 'from' in params else timezone.now().date()
+            date_to = parse_date(params['to']) if 'to' in params else date_from and date_from + timedelta(days=30)
+        except ValueError:
+            date_from = date_to = None
+        if date_from is None or date_to is None or date_to < date_from:
+            return Response(
+                {"error": "Invalid date range. Expected from/to as YYYY-MM-DD, to not before from."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if (date_to - date_from).days >= self.MAX_AVAILABILITY_DAYS:
+            return Response(
+                {"error": f"Range too large (max {self.MAX_AVAILABILITY_DAYS} days)."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        listing = get_object_or_404(
+            Listing.objects.only('id', 'type', 'max_group_size'),
+            pk=listing_id,
+            status='ACTIVE',
+        )
+
+        return Response({
+            "listing": listing.id,
+            "from": date_from,
+            "to": date_to,
+            "capacity": day_capacity(listing),
+            "days": availability(listing, date_from, date_to),
+        })
@@ -8,6 +8,8 @@ from .views import (
     UpdateAttendeeView,
     DeleteAttendeeView,
     ProviderWeeklyCalendarView,
+    CalendarFeedView,
+    provider_ics_feed,
 )
 
 urlpatterns = [
@@ -18,5 +20,7 @@ urlpatterns = [
     path("attendees/<int:attendee_id>/update", UpdateAttendeeView.as_view(), name="calendar-update-attendee"),
     path("attendees/<int:attendee_id>/delete", DeleteAttendeeView.as_view(), name="calendar-delete-attendee"),
     path("<uuid:provider_id>/week", ProviderWeeklyCalendarView.as_view()),
+    path("feed", CalendarFeedView.as_view(), name="calendar-feed"),
+    path("feed/<str:token>.ics", provider_ics_feed, name="calendar-ics-feed"),
 
 ]
\ No newline at end of file
@@ -0,0 +1,147 @@
+"""
+iCalendar (RFC 5545) rendering of a provider's sessions.
+
+`stream_calendar` is an async generator: sessions are read in keyset chunks
+of CHUNK_SIZE (attendees / bookings prefetched per chunk), each fetched and
+rendered through sync_to_async, so a feed with years of history never sits
+in memory. It must be async: under ASGI Django buffers a sync iterator
+completely (sync_to_async(list)) before sending the first byte.
+
+    StreamingHttpResponse(stream_calendar(sessions, "Surf school"), content_type=CONTENT_TYPE)
+
+Session times are stored without a timezone (the school's local time), so
+events use floating DTSTART / DTEND, which calendar apps show as-is.
+"""
+import re
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+
+CONTENT_TYPE = "text/calendar; charset=utf-8"
+CHUNK_SIZE = 500
+DEFAULT_DURATION = timedelta(hours=1)
+
+_DURATION = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(h|hrs?|hours?|m|mins?|minutes?)\s*$", re.IGNORECASE)
+
+
+def escape(text):
+    """
+    TEXT value escaping (RFC 5545 3.3.11).
+    """
+    return (
+        str(text)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line):
+    """
+    Content line folded at 75 octets, CRLF-terminated (RFC 5545 3.1).
+    """
+    raw = line.encode()
+    if len(raw) <= 75:
+        return line + "\r\n"
+    parts, start, limit = [], 0, 75
+    while start < len(raw):
+        end = min(start + limit, len(raw))
+        while end < len(raw) and (raw[end] & 0xC0) == 0x80:  # Don't split a UTF-8 char
+            end -= 1
+        parts.append(raw[start:end].decode())
+        start, limit = end, 74  # Continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def session_duration(session):
+    """
+    Session.duration is free text ("2h", "90min", "1.5 hours"); anything
+    else lasts DEFAULT_DURATION.
+    """
+    match = _DURATION.match(session.duration or "")
+    if not match:
+        return DEFAULT_DURATION
+    value, unit = float(match.group(1)), match.group(2).lower()
+    delta = timedelta(hours=value) if unit.startswith("h") else timedelta(minutes=value)
+    return delta or DEFAULT_DURATION
+
+
+def _stamp(value):
+    return value.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def session_event(session, domain):
+    """
+    VEVENT lines for a session with prefetched `attendees` and `bookings`.
+    """
+    start = datetime.combine(session.date, session.time)
+    attendees = list(session.attendees.all())
+    bookings = list(session.bookings.all())
+
+    description = [f"Students: {len(attendees)}/{session.max}"]
+    pending = sum(not a.waiver for a in attendees)
+    if pending:
+        description.append(f"Pending waivers: {pending}")
+    if bookings:
+        guests = sum(b.guests for b in bookings)
+        description.append(f"TTW bookings: {len(bookings)} ({guests} guests)")
+    description += [f"- {a.name} ({a.source})" for a in attendees]
+
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:session-{session.pk}@{domain}",
+        f"DTSTAMP:{_stamp(session.updated_at)}",
+        f"LAST-MODIFIED:{_stamp(session.updated_at)}",
+        f"DTSTART:{start:%Y%m%dT%H%M%S}",
+        f"DTEND:{start + session_duration(session):%Y%m%dT%H%M%S}",
+        f"SUMMARY:{escape(session.title)}",
+        f"DESCRIPTION:{escape(chr(10).join(description))}",
+    ]
+    if session.instructor:
+        lines.append(f"X-TTW-INSTRUCTOR:{escape(session.instructor)}")
+    lines.append("END:VEVENT")
+    return lines
+
+
+def render_chunk(sessions, after, domain):
+    """
+    (VEVENTs of the next CHUNK_SIZE sessions after the (date, time, pk) key
+    `after`, key of the last one), or ("", None) at the end. One range query.
+    """
+    if after is not None:
+        date, time, pk = after
+        sessions = sessions.filter(
+            Q(date__gt=date) | Q(date=date, time__gt=time) | Q(date=date, time=time, pk__gt=pk)
+        )
+    chunk = list(
+        sessions.prefetch_related("attendees", "bookings").order_by("date", "time", "pk")[:CHUNK_SIZE]
+    )
+    if not chunk:
+        return "", None
+    last = chunk[-1]
+    text = "".join(fold(line) for session in chunk for line in session_event(session, domain))
+    return text, (last.date, last.time, last.pk)
+
+
+async def stream_calendar(sessions, name, domain="thetravelwild.com"):
+    """
+    Yields the VCALENDAR for `sessions` one chunk of events at a time.
+    """
+    yield "".join(fold(line) for line in [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//The Travel Wild//Provider calendar//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape(name)}",
+    ])
+    after = None
+    while True:
+        text, after = await sync_to_async(render_chunk)(sessions, after, domain)
+        if after is None:
+            break
+        yield text
+    yield fold("END:VCALENDAR")
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendar', '0002_remove_session_provider_id_session_auto_generated_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendee',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
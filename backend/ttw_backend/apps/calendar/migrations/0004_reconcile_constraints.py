@@ -0,0 +1,72 @@
+from django.db import migrations, models
+from django.db.models import F
+
+
+def dedupe(apps, schema_editor):
+    """
+    Merges duplicate auto-generated sessions into the oldest one of their
+    slot and drops duplicate imported attendees, so the constraints apply.
+    """
+    Session = apps.get_model("calendar", "Session")
+    Attendee = apps.get_model("calendar", "Attendee")
+    Booking = apps.get_model("bookings", "Booking")
+    AvailabilitySlot = apps.get_model("bookings", "AvailabilitySlot")
+
+    def merge_seats(session_id, first):
+        # Seat counts move with the bookings (slots PROTECT their session)
+        for slot in AvailabilitySlot.objects.filter(session_id=session_id):
+            target = AvailabilitySlot.objects.filter(
+                listing_id=slot.listing_id, date=slot.date, session_id=first
+            ).first()
+            if target is None:
+                slot.session_id = first
+                slot.save(update_fields=["session"])
+                continue
+            AvailabilitySlot.objects.filter(pk=target.pk).update(booked=F("booked") + slot.booked)
+            Booking.objects.filter(slot_id=slot.pk).update(slot_id=target.pk)
+            slot.delete()
+
+    keep = {}
+    for session_id, provider_id, day, at in (
+        Session.objects.filter(auto_generated=True)
+        .order_by("id")
+        .values_list("id", "provider_id", "date", "time")
+    ):
+        first = keep.setdefault((provider_id, day, at), session_id)
+        if first != session_id:
+            Attendee.objects.filter(session_id=session_id).update(session_id=first)
+            Booking.objects.filter(session_id=session_id).update(session_id=first)
+            merge_seats(session_id, first)
+            Session.objects.filter(id=session_id).delete()
+
+    seen = set()
+    duplicates = []
+    for attendee_id, session_id, name in (
+        Attendee.objects.filter(source="TTW")
+        .order_by("id")
+        .values_list("id", "session_id", "name")
+    ):
+        if (session_id, name) in seen:
+            duplicates.append(attendee_id)
+        seen.add((session_id, name))
+    Attendee.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0016_availability_slots'),
+        ('calendar', '0003_attendee_updated_at_session_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='session',
+            constraint=models.UniqueConstraint(condition=models.Q(('auto_generated', True)), fields=('provider', 'date', 'time'), name='unique_auto_session_slot'),
+        ),
+        migrations.AddConstraint(
+            model_name='attendee',
+            constraint=models.UniqueConstraint(condition=models.Q(('source', 'TTW')), fields=('session', 'name'), name='unique_imported_attendee'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendar', '0004_reconcile_constraints'),
+        ('listings', '0014_listing_trip_meta'),
+        ('providers', '0011_merchantprofile_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='session',
+            name='listing',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='sessions', to='listings.listing'),
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='recurring',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddConstraint(
+            model_name='session',
+            constraint=models.UniqueConstraint(condition=models.Q(('recurring', True)), fields=('listing', 'date', 'time'), name='unique_recurring_session_slot'),
+        ),
+    ]
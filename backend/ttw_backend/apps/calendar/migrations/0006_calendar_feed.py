@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:24
+
+import apps.calendar.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendar', '0005_recurring_sessions'),
+        ('providers', '0011_merchantprofile_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarFeed',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(default=apps.calendar.models.new_feed_token, max_length=64, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('provider', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='calendar_feed', to='providers.providerprofile')),
+            ],
+        ),
+    ]
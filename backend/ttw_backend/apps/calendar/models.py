@@ -1,7 +1,31 @@
+import secrets
+
 from django.db import models
 from apps.providers.models import ProviderProfile
 
 
+def new_feed_token():
+    return secrets.token_urlsafe(32)
+
+
+# Attendee.source values counted as "direct" (booked outside TTW)
+DIRECT_SOURCES = ["DIRECT", "Walk-in"]
+
+
+class SessionQuerySet(models.QuerySet):
+    def with_counts(self):
+        """
+        Annotates the attendee counts the calendar shows (students,
+        pending waivers, per source) in the same query, one JOIN.
+        """
+        return self.annotate(
+            students_count=models.Count("attendees"),
+            pending_waivers_count=models.Count("attendees", filter=models.Q(attendees__waiver=False)),
+            ttw_count=models.Count("attendees", filter=models.Q(attendees__source="TTW")),
+            direct_count=models.Count("attendees", filter=models.Q(attendees__source__in=DIRECT_SOURCES)),
+        )
+
+
 class Session(models.Model):
     provider = models.ForeignKey(
     ProviderProfile,
@@ -20,6 +44,35 @@ class Session(models.Model):
     max = models.IntegerField(default=4)
     auto_generated = models.BooleanField(default=False)
 
+    # Expanded from the listing's weeklySchedule (see schedule.py)
+    listing = models.ForeignKey(
+        "listings.Listing",
+        on_delete=models.CASCADE,
+        related_name="sessions",
+        null=True,
+        blank=True,
+    )
+    recurring = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = SessionQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # One auto-generated session per slot (booking reconciliation)
+            models.UniqueConstraint(
+                fields=["provider", "date", "time"],
+                condition=models.Q(auto_generated=True),
+                name="unique_auto_session_slot",
+            ),
+            # One recurring session per listing slot (schedule expansion)
+            models.UniqueConstraint(
+                fields=["listing", "date", "time"],
+                condition=models.Q(recurring=True),
+                name="unique_recurring_session_slot",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.title} ({self.date} {self.time})"
 
@@ -33,6 +86,38 @@ class Attendee(models.Model):
     source = models.CharField(max_length=20, default="Walk-in")  # TTW, Direct, Walk-in
     waiver = models.BooleanField(default=False)
     notes = models.TextField(blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # A booking is imported at most once per session
+            models.UniqueConstraint(
+                fields=["session", "name"],
+                condition=models.Q(source="TTW"),
+                name="unique_imported_attendee",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.session_id})"
+
+
+class CalendarFeed(models.Model):
+    """
+    Secret token of a provider's ICS subscription URL (see ics.py).
+    Rotating the token revokes every existing subscription.
+    """
+    provider = models.OneToOneField(
+        ProviderProfile,
+        on_delete=models.CASCADE,
+        related_name="calendar_feed",
+    )
+    token = models.CharField(max_length=64, unique=True, default=new_feed_token)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def rotate(self):
+        self.token = new_feed_token()
+        self.save(update_fields=["token"])
+
+    def __str__(self):
+        return f"Calendar feed ({self.provider_id})"
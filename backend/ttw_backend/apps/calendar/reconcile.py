@@ -0,0 +1,227 @@
+"""
+Booking → calendar reconciliation, set-based.
+
+Every authorized / completed booking of a provider must appear on the
+calendar: linked to a session (an auto-generated one at the listing's start
+time when none exists) and imported as an attendee. This happens when the
+booking is made or its payment authorized (`materialize_on_commit`), with a
+periodic sweep (`sweep_unlinked`) as safety net — never while serving the
+calendar, which is a plain read.
+
+Instead of checking and creating row by row, `reconcile_bookings` reads the
+range once, computes what is missing in memory and writes it with a fixed
+number of bulk statements in one transaction:
+
+    bookings + sessions + attendees     3 reads
+    missing sessions                    bulk_create + re-read
+    booking → session links             bulk_update
+    missing attendees                   bulk_create
+
+Unique constraints on auto-generated sessions (provider, date, time) and on
+imported attendees (session, name) make it idempotent, also when two
+requests reconcile the same week concurrently.
+"""
+from datetime import time, timedelta
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from apps.bookings.models import Booking
+
+from .models import Attendee, Session
+
+# Bookings that hold a seat on the calendar (payment authorized or already run)
+CALENDAR_BOOKING_STATUSES = [Booking.Status.AUTHORIZED, Booking.Status.COMPLETED]
+
+DEFAULT_SESSION_TIME = time(9, 0)
+
+# How far back the sweep looks for bookings still missing from the calendar
+SWEEP_LOOKBACK = timedelta(days=7)
+
+
+def booking_session_time(booking):
+    # The listing's scheduled start that day; listings without one run at 09:00
+    from .schedule import schedule_start
+
+    start_time = schedule_start(booking.listing, booking.start_date)
+    return start_time or DEFAULT_SESSION_TIME
+
+
+def _imported_attendee(session_id, booking):
+    return Attendee(
+        session_id=session_id,
+        name=booking.user.email,
+        age=0,
+        level="Unknown",
+        source="TTW",
+        waiver=False,
+        notes="Imported from booking",
+    )
+
+
+def reconcile_bookings(provider_id, date_from, date_to, bookings=None):
+    """
+    Attaches the provider's calendar bookings between `date_from` and
+    `date_to` (inclusive) to sessions and attendees; `bookings` narrows
+    them down (e.g. to a single booking). Returns the number of rows
+    written (0 when the calendar was already in sync).
+    """
+    bookings = list(
+        (Booking.objects.all() if bookings is None else bookings).filter(
+            listing__merchant__provider__id=provider_id,
+            start_date__range=[date_from, date_to],
+            status__in=CALENDAR_BOOKING_STATUSES,
+        )
+        .select_related("user", "listing", "session")
+    )
+    if not bookings:
+        return 0
+
+    sessions = Session.objects.filter(provider__id=provider_id, date__range=[date_from, date_to])
+    session_ids = {}
+    listing_session_ids = {}  # Recurring sessions, by (listing, date, time)
+
+    def load(rows):
+        for session_id, day, at, listing_id, recurring in rows:
+            session_ids.setdefault((day, at), session_id)
+            if recurring:
+                listing_session_ids.setdefault((listing_id, day, at), session_id)
+
+    pinned = {}  # Bookings already linked to a session of this calendar
+
+    def session_for(booking, key):
+        # Existing link, else the booked listing's own recurring session,
+        # else any session at that time
+        return (
+            pinned.get(booking.pk)
+            or listing_session_ids.get((booking.listing_id, *key))
+            or session_ids.get(key)
+        )
+
+    load(sessions.values_list("id", "date", "time", "listing_id", "recurring"))
+
+    # 1) Target session of every booking (existing link, or slot by date/time)
+    targets = []
+    for booking in bookings:
+        linked = booking.session
+        if (
+            linked
+            and str(linked.provider_id) == str(provider_id)
+            and date_from <= linked.date <= date_to
+        ):
+            targets.append((booking, (linked.date, linked.time)))
+            pinned[booking.pk] = linked.id
+        else:
+            targets.append((booking, (booking.start_date, booking_session_time(booking))))
+
+    written = 0
+    with transaction.atomic():
+        # 2) Sessions missing for some slot (first booking of the slot shapes it)
+        missing = {}
+        for booking, key in targets:
+            if session_for(booking, key) is None and key not in missing:
+                snapshot = booking.listing_snapshot or {}
+                missing[key] = Session(
+                    provider_id=provider_id,
+                    date=key[0],
+                    time=key[1],
+                    duration="",
+                    title=snapshot.get("title", "Booking Session"),
+                    instructor=snapshot.get("provider_name", ""),
+                    max=booking.guests or 4,
+                    auto_generated=True,
+                )
+        if missing:
+            Session.objects.bulk_create(missing.values(), ignore_conflicts=True)
+            written += len(missing)
+            # ignore_conflicts returns no ids, and a concurrent request may have won
+            load(sessions.filter(auto_generated=True).values_list("id", "date", "time", "listing_id", "recurring"))
+
+        # 3) Booking → session links
+        now = timezone.now()
+        relinked = []
+        for booking, key in targets:
+            session_id = session_for(booking, key)
+            if booking.session_id != session_id:
+                booking.session_id = session_id
+                booking.updated_at = now
+                relinked.append(booking)
+        if relinked:
+            Booking.objects.bulk_update(relinked, ["session", "updated_at"])
+            written += len(relinked)
+
+        # 4) Attendees missing for booked users
+        present = set(
+            Attendee.objects.filter(session_id__in=set(session_ids.values()))
+            .values_list("session_id", "name")
+        )
+        attendees = []
+        for booking, key in targets:
+            if not booking.user:
+                continue
+            pair = (session_for(booking, key), booking.user.email)
+            if pair not in present:
+                present.add(pair)
+                attendees.append(_imported_attendee(pair[0], booking))
+        if attendees:
+            Attendee.objects.bulk_create(attendees, ignore_conflicts=True)
+            written += len(attendees)
+
+    return written
+
+
+def materialize_booking(booking_id):
+    """
+    Puts one booking on its provider's calendar (no-op unless it holds a
+    seat). Returns the number of rows written.
+    """
+    booking = (
+        Booking.objects.filter(pk=booking_id, status__in=CALENDAR_BOOKING_STATUSES)
+        .values("start_date", "listing__merchant__provider__id")
+        .first()
+    )
+    if booking is None or booking["listing__merchant__provider__id"] is None:
+        return 0
+    day = booking["start_date"]
+    return reconcile_bookings(
+        booking["listing__merchant__provider__id"], day, day,
+        bookings=Booking.objects.filter(pk=booking_id),
+    )
+
+
+def materialize_on_commit(booking):
+    """
+    Schedules `materialize_booking` once the current transaction commits.
+    """
+    # robust: a broker outage must not fail the already committed request
+    transaction.on_commit(partial(_schedule, booking.pk), robust=True)
+
+
+def _schedule(booking_id):
+    from .tasks import materialize_booking_task
+    materialize_booking_task.delay(str(booking_id))
+
+
+def sweep_unlinked():
+    """
+    Materializes recent calendar bookings still without a session (lost
+    task, broker outage, bookings older than this code). One reconciliation
+    per provider. Returns the number of rows written.
+    """
+    unlinked = Booking.objects.filter(
+        status__in=CALENDAR_BOOKING_STATUSES,
+        session__isnull=True,
+        start_date__gte=timezone.now().date() - SWEEP_LOOKBACK,
+        listing__merchant__provider__isnull=False,
+    )
+    ranges = (
+        unlinked.values("listing__merchant__provider__id")
+        .annotate(first=Min("start_date"), last=Max("start_date"))
+        .order_by()
+    )
+    return sum(
+        reconcile_bookings(r["listing__merchant__provider__id"], r["first"], r["last"], bookings=unlinked)
+        for r in ranges
+    )
@@ -0,0 +1,191 @@
+"""
+Recurring sessions from a listing's weekly schedule.
+
+Listings carry their opening days in `details`:
+
+    weeklySchedule: {"mon": {"open": true, "start": "09:00", "end": "18:00"}, ...}
+    seasonMonths:   [5, 6, 7]          (0-based → June-August; empty / missing → all year)
+
+`sync_listing_sessions` expands that into one `Session` per open day over a
+rolling horizon and diffs it against the listing's recurring sessions:
+
+    missing slots                  bulk_create
+    changed title / max / ...      bulk_update
+    slots no longer scheduled      deleted, unless someone is booked on them
+                                   (attendees, bookings or seats held)
+
+so calendars and availability lookups read precomputed rows. The
+`generate_recurring_sessions` beat job keeps every listing in sync.
+"""
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q
+from django.utils import timezone
+
+from apps.bookings.models import AvailabilitySlot
+from apps.listings.details import promoted_columns
+from apps.listings.models import Listing
+
+from .models import Session
+
+HORIZON = timedelta(days=56)
+
+# Listing types run as timed sessions (trips / rentals / courses span days)
+SCHEDULED_TYPES = [Listing.ListingType.SESSION, Listing.ListingType.EXPERIENCE]
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+# Fields refreshed on existing sessions when the listing changes
+SYNCED_FIELDS = ["provider_id", "duration", "title", "max"]
+
+
+def _time(value):
+    try:
+        return datetime.strptime(str(value), "%H:%M").time()
+    except ValueError:
+        return None
+
+
+def schedule_start(listing, day):
+    """
+    Start time of the listing's weekly schedule on `day`'s weekday, or None
+    when closed / not scheduled.
+    """
+    details = listing.details if isinstance(listing.details, dict) else {}
+    schedule = details.get("weeklySchedule")
+    entry = schedule.get(WEEKDAYS[day.weekday()]) if isinstance(schedule, dict) else None
+    if isinstance(entry, dict) and entry.get("open"):
+        return _time(entry.get("start"))
+    return None
+
+
+def _duration(details, entry, start):
+    hours = details.get("durationHours")
+    if isinstance(hours, (int, float)) and not isinstance(hours, bool) and hours > 0:
+        return f"{hours:g}h"
+    end = _time(entry.get("end"))
+    if end and end > start:
+        minutes = (end.hour * 60 + end.minute) - (start.hour * 60 + start.minute)
+        return f"{minutes // 60}h" if minutes % 60 == 0 else f"{minutes}min"
+    return ""
+
+
+def expand_schedule(listing, date_from, date_to):
+    """
+    {(date, time): Session} wanted for `listing` between the two dates
+    (inclusive), unsaved. Empty when the listing has no usable schedule.
+    """
+    details = listing.details if isinstance(listing.details, dict) else {}
+    schedule = details.get("weeklySchedule")
+    provider = getattr(listing.merchant, "provider", None) if listing.merchant_id else None
+    if (
+        listing.type not in SCHEDULED_TYPES
+        or listing.status != "ACTIVE"
+        or not isinstance(schedule, dict)
+        or provider is None
+    ):
+        return {}
+
+    # Weekday → (start, duration), parsed once
+    slots = {}
+    for weekday, name in enumerate(WEEKDAYS):
+        entry = schedule.get(name)
+        if isinstance(entry, dict) and entry.get("open"):
+            start = _time(entry.get("start"))
+            if start:
+                slots[weekday] = (start, _duration(details, entry, start))
+
+    months = set(promoted_columns(details)["season_months"])
+    wanted = {}
+    day = date_from
+    while day <= date_to:
+        slot = slots.get(day.weekday())
+        if slot and (not months or day.month - 1 in months):  # seasonMonths is 0-based
+            start, duration = slot
+            wanted[(day, start)] = Session(
+                provider=provider,
+                listing=listing,
+                recurring=True,
+                date=day,
+                time=start,
+                duration=duration,
+                title=listing.title[:255],
+                max=listing.max_group_size or 4,
+            )
+        day += timedelta(days=1)
+    return wanted
+
+
+def sync_listing_sessions(listing, date_from=None, date_to=None):
+    """
+    Brings the listing's recurring sessions in [date_from, date_to] (default:
+    today + HORIZON) in line with its schedule. Returns (created, updated,
+    deleted).
+    """
+    date_from = date_from or timezone.now().date()
+    date_to = date_to or date_from + HORIZON
+
+    wanted = expand_schedule(listing, date_from, date_to)
+    existing = {
+        (s.date, s.time): s
+        for s in Session.objects.filter(
+            listing=listing, recurring=True, date__range=[date_from, date_to]
+        ).annotate(
+            # Booked sessions are never removed, even when no longer scheduled
+            taken=Count("attendees", distinct=True) + Count("bookings", distinct=True),
+            holds_seats=Exists(
+                AvailabilitySlot.objects.filter(session=OuterRef("pk"), booked__gt=0)
+            ),
+        )
+    }
+
+    created = [session for key, session in wanted.items() if key not in existing]
+    updated = []
+    for key, session in existing.items():
+        target = wanted.get(key)
+        if target is None:
+            continue
+        if any(getattr(session, f) != getattr(target, f) for f in SYNCED_FIELDS):
+            for field in SYNCED_FIELDS:
+                setattr(session, field, getattr(target, field))
+            updated.append(session)
+    stale = [
+        s.pk for key, s in existing.items()
+        if key not in wanted and not s.taken and not s.holds_seats
+    ]
+
+    with transaction.atomic():
+        if created:
+            Session.objects.bulk_create(created, ignore_conflicts=True)
+        if updated:
+            now = timezone.now()
+            for session in updated:
+                session.updated_at = now
+            Session.objects.bulk_update(updated, SYNCED_FIELDS + ["updated_at"])
+        if stale:
+            # Empty slots (all seats released) would PROTECT the session
+            AvailabilitySlot.objects.filter(session__in=stale).delete()
+            Session.objects.filter(pk__in=stale).delete()
+
+    return len(created), len(updated), len(stale)
+
+
+def sync_all_listings(date_from=None, date_to=None):
+    """
+    Syncs every listing that has, or had, a weekly schedule. Returns the
+    number of sessions created, updated and deleted.
+    """
+    date_from = date_from or timezone.now().date()
+    listings = (
+        Listing.objects.filter(
+            Q(type__in=SCHEDULED_TYPES, details__has_key="weeklySchedule")
+            | Q(sessions__recurring=True, sessions__date__gte=date_from)
+        )
+        .select_related("merchant__provider")
+        .distinct()
+    )
+    total = 0
+    for listing in listings.iterator(chunk_size=200):
+        total += sum(sync_listing_sessions(listing, date_from, date_to))
+    return total
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Session, Attendee
+from .models import DIRECT_SOURCES, Session, Attendee
 from apps.bookings.models import Booking
 
 
@@ -106,17 +106,28 @@ class SessionOutSerializer(serializers.ModelSerializer):
 
     # ===== FRONTEND CALCULATED FIELDS =====
 
+    def _counts(self, obj):
+        # Annotated by Session.objects.with_counts(); otherwise count the
+        # (prefetched) attendees in Python
+        if not hasattr(obj, "students_count"):
+            attendees = list(obj.attendees.all())
+            obj.students_count = len(attendees)
+            obj.pending_waivers_count = sum(not a.waiver for a in attendees)
+            obj.ttw_count = sum(a.source == "TTW" for a in attendees)
+            obj.direct_count = sum(a.source in DIRECT_SOURCES for a in attendees)
+        return obj
+
     def get_students(self, obj):
-        return obj.attendees.count()
+        return self._counts(obj).students_count
 
     def get_pendingWaivers(self, obj):
-        return obj.attendees.filter(waiver=False).count()
+        return self._counts(obj).pending_waivers_count
 
     def get_sources(self, obj):
-        attendees = obj.attendees.all()
+        obj = self._counts(obj)
         return {
-            "ttw": attendees.filter(source="TTW").count(),
-            "direct": attendees.filter(source__in=["DIRECT", "Walk-in"]).count(),
+            "ttw": obj.ttw_count,
+            "direct": obj.direct_count,
         }
 
     def get_color(self, obj):
@@ -0,0 +1,30 @@
+from celery import shared_task
+
+from .reconcile import materialize_booking, sweep_unlinked
+from .schedule import sync_all_listings
+
+
+@shared_task(autoretry_for=(Exception,), retry_backoff=10, retry_kwargs={"max_retries": 3})
+def materialize_booking_task(booking_id):
+    """
+    Puts a booking on the calendar (scheduled on commit by
+    reconcile.materialize_on_commit).
+    """
+    return materialize_booking(booking_id)
+
+
+@shared_task
+def sweep_calendar_bookings():
+    """
+    Periodic safety net for bookings whose materialize task was never run.
+    """
+    return sweep_unlinked()
+
+
+@shared_task
+def generate_recurring_sessions():
+    """
+    Expands listings' weekly schedules into sessions over the rolling
+    horizon (schedule.HORIZON).
+    """
+    return sync_all_listings()
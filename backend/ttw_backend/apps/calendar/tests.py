@@ -0,0 +1,292 @@
+from datetime import date, time
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.bookings.availability import reserve_seats
+from apps.bookings.models import AvailabilitySlot, Booking
+from apps.calendar import ics
+from apps.calendar.models import Attendee, CalendarFeed, Session
+from apps.calendar.schedule import sync_all_listings, sync_listing_sessions
+from apps.calendar.reconcile import (
+    materialize_booking,
+    materialize_on_commit,
+    reconcile_bookings,
+    sweep_unlinked,
+)
+from apps.listings.models import Listing, Sport
+from apps.locations.models import City, Country
+from apps.users.models import User
+
+
+class CalendarTestCase(TestCase):
+    monday = date(2030, 6, 3)  # Far ahead: within the sweep window
+
+    def setUp(self):
+        self.client = APIClient()
+
+        country = Country.objects.create(code="PT", name="Portugal")
+        city = City.objects.create(
+            name="Peniche", slug="peniche", latitude=39.35, longitude=-9.38, country=country
+        )
+        sport = Sport.objects.create(name="Surf", slug="surf")
+        owner = User.objects.create_user(email="school@example.com", password="x", role="PROVIDER")
+        self.provider = owner.provider_profile  # Created with the PROVIDER user
+        self.listing = Listing.objects.create(
+            owner=owner,
+            title="Surf camp",
+            description="Learn to surf",
+            type="TRIP",
+            sport=sport,
+            city=city,
+            price=100,
+            universal_level="BEGINNER",
+        )
+
+    def add_bookings(self, count):
+        bookings = []
+        for n in range(count):
+            traveler = User.objects.create_user(
+                email=f"traveler{Booking.objects.count()}@example.com", password="x", role="TRAVELER"
+            )
+            bookings.append(Booking.objects.create(
+                listing=self.listing,
+                user=traveler,
+                start_date=self.monday.replace(day=self.monday.day + n % 7),
+                guests=1,
+                total_price=100,
+                status=Booking.Status.AUTHORIZED,
+            ))
+        return bookings
+
+    def get_week(self):
+        return self.client.get(
+            f"/api/calendar/{self.provider.pk}/week", {"date": self.monday.isoformat()}, secure=True
+        )
+
+
+class WeeklyCalendarTests(CalendarTestCase):
+    def test_week_is_a_plain_read(self):
+        self.add_bookings(7)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.get_week().json(), [])
+
+        self.assertTrue(all(q["sql"].startswith("SELECT") for q in ctx.captured_queries))
+
+    def week_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.get_week().status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_sessions(self):
+        self.add_bookings(2)
+        sweep_unlinked()
+        few = self.week_queries()
+
+        self.add_bookings(7)
+        sweep_unlinked()
+        many = self.week_queries()
+
+        self.assertEqual(Session.objects.count(), 7)
+        self.assertEqual(few, many)
+
+    def test_counts_are_annotated(self):
+        materialize_booking(self.add_bookings(1)[0].pk)
+        Attendee.objects.create(session=Session.objects.get(), name="Walk-in", waiver=True)
+
+        session = self.get_week().json()[0]
+
+        self.assertEqual(session["students"], 2)
+        self.assertEqual(session["pendingWaivers"], 1)
+        self.assertEqual(session["sources"], {"ttw": 1, "direct": 1})
+
+    def test_booking_materialized_on_commit(self):
+        with mock.patch("apps.calendar.tasks.materialize_booking_task.delay", side_effect=materialize_booking):
+            with self.captureOnCommitCallbacks(execute=True):
+                booking = self.add_bookings(1)[0]
+                materialize_on_commit(booking)
+
+        data = self.get_week().json()
+        self.assertEqual([a["name"] for a in data[0]["attendees"]], ["traveler0@example.com"])
+        self.assertEqual([b["id"] for b in data[0]["bookings"]], [str(booking.id)])
+
+    def test_sweep_links_unlinked_bookings(self):
+        self.add_bookings(3)
+
+        self.assertGreater(sweep_unlinked(), 0)
+        self.assertEqual(sweep_unlinked(), 0)
+        self.assertFalse(Booking.objects.filter(session=None).exists())
+
+    def test_reconcile_is_idempotent(self):
+        self.add_bookings(9)
+
+        self.assertGreater(reconcile_bookings(self.provider.pk, self.monday, self.monday.replace(day=9)), 0)
+        self.assertEqual(reconcile_bookings(self.provider.pk, self.monday, self.monday.replace(day=9)), 0)
+
+        self.assertEqual(Session.objects.filter(auto_generated=True).count(), 7)
+        self.assertEqual(Attendee.objects.filter(source="TTW").count(), 9)
+        self.assertFalse(Booking.objects.filter(session=None).exists())
+
+    def test_bookings_join_existing_session(self):
+        session = Session.objects.create(
+            provider=self.provider, date=self.monday, time=time(9, 0), duration="2h", title="Morning"
+        )
+        materialize_booking(self.add_bookings(1)[0].pk)
+
+        data = self.get_week().json()
+
+        self.assertEqual([s["id"] for s in data], [session.id])
+        self.assertEqual([a["name"] for a in data[0]["attendees"]], ["traveler0@example.com"])
+
+
+class RecurringSessionTests(CalendarTestCase):
+    june = (date(2030, 6, 1), date(2030, 6, 30))
+
+    def setUp(self):
+        super().setUp()
+        self.listing.type = Listing.ListingType.SESSION
+        self.listing.details = {
+            "seasonMonths": [5],  # June (0-based)
+            "maxGroupSize": 6,
+            "weeklySchedule": {
+                "mon": {"open": True, "start": "10:00", "end": "12:00"},
+                "wed": {"open": True, "start": "16:30", "end": "18:00"},
+                "sun": {"open": False, "start": "09:00", "end": "18:00"},
+            },
+        }
+        self.listing.save()
+
+    def test_schedule_expands_once(self):
+        self.assertEqual(sync_listing_sessions(self.listing, *self.june), (8, 0, 0))
+        self.assertEqual(sync_listing_sessions(self.listing, *self.june), (0, 0, 0))
+
+        session = Session.objects.get(date=self.monday)
+        self.assertEqual((session.time, session.duration, session.max), (time(10, 0), "2h", 6))
+        self.assertFalse(Session.objects.filter(date__month=7).exists())
+
+    def test_season_months_are_zero_based(self):
+        # May → July: only June is in season
+        sync_listing_sessions(self.listing, date(2030, 5, 1), date(2030, 7, 31))
+        self.assertEqual(set(Session.objects.values_list("date__month", flat=True)), {6})
+
+        self.listing.details["seasonMonths"] = [0, 11]
+        self.listing.save()
+        Session.objects.all().delete()
+        sync_listing_sessions(self.listing, date(2030, 11, 1), date(2031, 2, 28))
+        self.assertEqual(set(Session.objects.values_list("date__month", flat=True)), {1, 12})
+
+    def test_beat_job_covers_unscheduled_listings(self):
+        self.assertEqual(sync_all_listings(*self.june), 8)
+
+        # Schedule removed → the listing is still visited to drop its sessions
+        self.listing.details = {}
+        self.listing.save()
+        self.assertEqual(sync_all_listings(*self.june), 8)
+        self.assertFalse(Session.objects.exists())
+
+    def test_schedule_changes_are_diffed(self):
+        sync_listing_sessions(self.listing, *self.june)
+        booked = Session.objects.get(date=date(2030, 6, 5))
+        Attendee.objects.create(session=booked, name="Walk-in")
+
+        self.listing.title = "Surf lesson"
+        self.listing.details["weeklySchedule"]["wed"]["open"] = False
+        self.listing.save()
+
+        # 4 Mondays renamed, 3 empty Wednesdays dropped, the booked one kept
+        self.assertEqual(sync_listing_sessions(self.listing, *self.june), (0, 4, 3))
+        self.assertEqual(Session.objects.filter(title="Surf lesson").count(), 4)
+        self.assertTrue(Session.objects.filter(pk=booked.pk).exists())
+
+    def test_sessions_holding_seats_are_kept(self):
+        sync_listing_sessions(self.listing, *self.june)
+        held, released = Session.objects.filter(date__in=[date(2030, 6, 5), date(2030, 6, 12)]).order_by("date")
+        reserve_seats(self.listing, held.date, 2, held)
+        reserve_seats(self.listing, released.date, 1, released)
+        AvailabilitySlot.objects.filter(session=released).update(booked=0)  # Cancelled since
+
+        self.listing.details["weeklySchedule"]["wed"]["open"] = False
+        self.listing.save()
+
+        self.assertEqual(sync_listing_sessions(self.listing, *self.june), (0, 0, 3))
+        self.assertTrue(Session.objects.filter(pk=held.pk).exists())
+        self.assertFalse(Session.objects.filter(pk=released.pk).exists())
+
+    def test_bookings_join_the_listing_session(self):
+        sync_listing_sessions(self.listing, *self.june)
+        booking = self.add_bookings(1)[0]
+
+        materialize_booking(booking.pk)
+
+        booking.refresh_from_db()
+        self.assertEqual((booking.session.listing_id, booking.session.time), (self.listing.pk, time(10, 0)))
+        self.assertFalse(Session.objects.filter(auto_generated=True).exists())
+
+
+class IcsFeedTests(CalendarTestCase):
+    def setUp(self):
+        super().setUp()
+        self.session = Session.objects.create(
+            provider=self.provider, date=self.monday, time=time(9, 0), duration="90min",
+            title="Morning, surf; session", max=6,
+        )
+        Attendee.objects.create(session=self.session, name="Ana " + "x" * 80, source="Walk-in")
+        self.client.force_authenticate(self.provider.user)
+        self.url = self.client.get("/api/calendar/feed", secure=True).json()["url"]
+        self.client.force_authenticate(None)
+
+    def get_feed(self, url=None, **headers):
+        return self.client.get(url or self.url, secure=True, headers=headers)
+
+    def read(self, response):
+        async def chunks():
+            return [chunk async for chunk in response.streaming_content]
+        return async_to_sync(chunks)()
+
+    def test_feed_streams_sessions(self):
+        response = self.get_feed()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertTrue(response.is_async)  # A sync iterator is buffered under ASGI
+        body = b"".join(self.read(response)).decode()
+        self.assertTrue(body.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertIn("DTSTART:20300603T090000\r\nDTEND:20300603T103000\r\n", body)
+        self.assertIn("SUMMARY:Morning\\, surf\\; session\r\n", body)
+        self.assertTrue(all(len(line.encode()) <= 75 for line in body.split("\r\n")))
+        self.assertEqual(body.count("BEGIN:VEVENT"), 1)
+
+    def test_sessions_are_read_chunk_by_chunk(self):
+        for hour in (10, 11, 12, 13):
+            Session.objects.create(provider=self.provider, date=self.monday, time=time(hour, 0), max=4)
+
+        with mock.patch.object(ics, "CHUNK_SIZE", 2), CaptureQueriesContext(connection) as queries:
+            chunks = self.read(self.get_feed())
+
+        # Header, 3 chunks of up to 2 events, footer
+        self.assertEqual([chunk.count(b"BEGIN:VEVENT") for chunk in chunks], [0, 2, 2, 1, 0])
+        chunk_reads = [q for q in queries if 'ORDER BY "calendar_session"."date"' in q["sql"]]
+        self.assertEqual(len(chunk_reads), 4)  # 3 chunks + the empty last one
+
+    def test_unchanged_feed_is_not_modified(self):
+        etag = self.get_feed()["ETag"]
+
+        self.assertEqual(self.get_feed(**{"If-None-Match": etag}).status_code, 304)
+
+        Attendee.objects.create(session=self.session, name="Late booker")
+        self.assertEqual(self.get_feed(**{"If-None-Match": etag}).status_code, 200)
+
+    def test_rotating_revokes_the_old_url(self):
+        self.client.force_authenticate(self.provider.user)
+        new_url = self.client.post("/api/calendar/feed", secure=True).json()["url"]
+        self.client.force_authenticate(None)
+
+        self.assertEqual(self.get_feed().status_code, 404)
+        self.assertEqual(self.get_feed(new_url).status_code, 200)
+        self.assertEqual(CalendarFeed.objects.count(), 1)
@@ -1,13 +1,19 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import permissions, status
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from datetime import datetime, time
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import require_GET
+from datetime import datetime
 from apps.providers.models import ProviderProfile
 from apps.bookings.models import Booking
 from django.db.models import Prefetch
+from apps.core.conditional import queryset_stamp, version_stamp, not_modified, set_validators
 
-from .models import Session, Attendee
+from .ics import CONTENT_TYPE, stream_calendar
+from .models import CalendarFeed, Session, Attendee
 from .serializers import (
     SessionCreateSerializer,
     SessionUpdateSerializer,
@@ -16,7 +22,6 @@ from .serializers import (
     AttendeeUpdateSerializer,
 )
 
-
 # ============================================================
 #   GET SESSIONS FOR PROVIDER ON SPECIFIC DATE
 #   /provider/<provider_id>/sessions?date=YYYY-MM-DD
@@ -33,62 +38,10 @@ class ProviderSessionsView(APIView):
         except ValueError:
             return Response({"error": "Invalid date format"}, status=400)
 
-        # 1) Fetch provider-created sessions
-        sessions = list(
-            Session.objects.filter(provider__id=provider_id, date=day)
-            .select_related("provider")
-            .prefetch_related("attendees")
-            .order_by("time")
-        )
-
-        # Build a lookup table by time for matching bookings
-        session_by_time = {s.time: s for s in sessions}
-
-        # 2) Fetch bookings for that provider and date
-        bookings = Booking.objects.filter(
-            listing__merchant__provider__id=provider_id,
-            start_date=day,
-            status=Booking.Status.CONFIRMED
-        ).select_related("user", "listing", "listing__sport")
-
-        # 3) Convert bookings → attendees or auto-generate sessions
-        for booking in bookings:
-            # Extract or default time (HH:MM)
-            # If listing has no explicit time, default to 09:00
-            time_str = "09:00"
-            if hasattr(booking.listing, "start_time") and booking.listing.start_time:
-                time_str = booking.listing.start_time.strftime("%H:%M")
-
-            # Find or create session for that booking
-            session = session_by_time.get(time_str)
-            if not session:
-                session = Session.objects.create(
-                    provider_id=provider_id,
-                    date=day,
-                    time=time_str,
-                    title=booking.listing_snapshot.get("title", "Booking Session"),
-                    instructor=booking.listing_snapshot.get("provider_name", ""),
-                    max=booking.guests,
-                    auto_generated=True,
-                )
-                session_by_time[time_str] = session
-                sessions.append(session)
-
-            # Ensure attendees exist (avoid duplicates)
-            if not Attendee.objects.filter(session=session, name=booking.user.email).exists():
-                Attendee.objects.create(
-                    session=session,
-                    name=booking.user.email,
-                    age=0,
-                    level="Unknown",
-                    source="TTW",
-                    waiver=False,
-                    notes="Imported from booking",
-                )
-
-        # 4) Refresh sessions with updated attendees
+        # Bookings are already on the calendar (see reconcile.py): read only
         sessions = (
             Session.objects.filter(provider__id=provider_id, date=day)
+            .with_counts()
             .select_related("provider")
             .prefetch_related("attendees")
             .order_by("time")
@@ -105,11 +58,30 @@ class ProviderSessionsView(APIView):
 
 from datetime import timedelta
 
+
+def week_stamp(provider_id, week_start, week_end):
+    """
+    Version stamp of everything the weekly calendar renders: the week's
+    sessions, their attendees and the bookings attached to them.
+    """
+    sessions = Session.objects.filter(
+        provider__id=provider_id,
+        date__range=[week_start, week_end],
+    )
+    bookings = Booking.objects.filter(session__in=sessions)
+    return version_stamp(
+        queryset_stamp(sessions),
+        queryset_stamp(Attendee.objects.filter(session__in=sessions)),
+        queryset_stamp(bookings),
+        extra=[provider_id, week_start],
+    )
+
+
 class ProviderWeeklyCalendarView(APIView):
     """
     Returns all sessions (manual + auto-generated) for a provider
-    for the week containing the given date. Also ensures bookings
-    are attached to sessions and converted into attendees when needed.
+    for the week containing the given date, bookings and imported
+    attendees included (materialized by reconcile.materialize_booking).
     """
 
     def get(self, request, provider_id):
@@ -126,117 +98,29 @@ class ProviderWeeklyCalendarView(APIView):
         week_start = selected_date - timedelta(days=selected_date.weekday())
         week_end = week_start + timedelta(days=6)
 
-        # 1) Load existing sessions for that provider in the week
-        sessions_qs = (
-            Session.objects.filter(
-                provider__id=provider_id,
-                date__range=[week_start, week_end],
-            )
-            .select_related("provider")
-            .prefetch_related("attendees", "bookings")
-            .order_by("date", "time")
-        )
-        sessions = list(sessions_qs)
-
-        # Build lookup by (date, time) for quick matching
-        session_lookup = {(s.date, s.time): s for s in sessions}
+        # Nothing changed since the client's copy → 304
+        stamp = week_stamp(provider_id, week_start, week_end)
+        cached = not_modified(request, stamp)
+        if cached is not None:
+            return cached
 
-        # 2) Fetch confirmed bookings for that provider in the same week
-        confirmed_bookings = (
-            Booking.objects.filter(
-                listing__merchant__provider__id=provider_id,
-                start_date__range=[week_start, week_end],
-                status=Booking.Status.CONFIRMED,
-            )
-            .select_related("user", "listing", "session")
-        )
-
-        for booking in confirmed_bookings:
-            # If the booking is already linked to a session in this week, ensure
-            # that session is included in our sessions list and continue.
-            if booking.session_id:
-                session = booking.session
-                if (
-                    session
-                    and session.provider_id == provider_id
-                    and week_start <= session.date <= week_end
-                ):
-                    key = (session.date, session.time)
-                    if key not in session_lookup:
-                        session_lookup[key] = session
-                        sessions.append(session)
-
-                    # Ensure attendee for this booking user exists
-                    if booking.user and not Attendee.objects.filter(
-                        session=session, name=booking.user.email
-                    ).exists():
-                        Attendee.objects.create(
-                            session=session,
-                            name=booking.user.email,
-                            age=0,
-                            level="Unknown",
-                            source="TTW",
-                            waiver=False,
-                            notes="Imported from booking",
-                        )
-                    continue
-
-            # If not linked yet, derive a time for the session
-            # Try listing.start_time if present; otherwise default to 09:00
-            if hasattr(booking.listing, "start_time") and booking.listing.start_time:
-                session_time = booking.listing.start_time
-            else:
-                session_time = time(9, 0)
-
-            key = (booking.start_date, session_time)
-
-            # Find or create session for this booking
-            session = session_lookup.get(key)
-            if not session:
-                session = Session.objects.create(
-                    provider_id=provider_id,
-                    date=booking.start_date,
-                    time=session_time,
-                    title=booking.listing_snapshot.get("title", "Booking Session"),
-                    instructor=booking.listing_snapshot.get("provider_name", ""),
-                    max=booking.guests or 4,
-                    auto_generated=True,
-                )
-                session_lookup[key] = session
-                sessions.append(session)
-
-            # Attach booking to session if not already linked
-            if booking.session_id != session.id:
-                booking.session = session
-                booking.save(update_fields=["session"])
-
-            # Ensure attendee exists representing this booking
-            if booking.user and not Attendee.objects.filter(
-                session=session, name=booking.user.email
-            ).exists():
-                Attendee.objects.create(
-                    session=session,
-                    name=booking.user.email,
-                    age=0,
-                    level="Unknown",
-                    source="TTW",
-                    waiver=False,
-                    notes="Imported from booking",
-                )
-
-        # 3) Reload sessions with up-to-date attendees and bookings
+        # Bookings are already on the calendar (see reconcile.py): read only
         refreshed_sessions = (
             Session.objects.filter(
                 provider__id=provider_id,
                 date__range=[week_start, week_end],
             )
+            .with_counts()
             .select_related("provider")
-            .prefetch_related("attendees", "bookings")
+            .prefetch_related("attendees", "bookings", "bookings__user")
             .order_by("date", "time")
         )
 
         serializer = SessionOutSerializer(refreshed_sessions, many=True)
-        return Response(serializer.data)
+        return set_validators(
+            Response(serializer.data),
+            stamp,
+        )
 
 
 
@@ -336,4 +220,70 @@ class DeleteAttendeeView(APIView):
             return Response({"error": "Attendee not found"}, status=404)
 
         attendee.delete()
-        return Response({"success": True})
\ No newline at end of file
+        return Response({"success": True})
+
+
+
+# ============================================================
+#   ICS SUBSCRIPTION FEED
+#   GET/POST /feed            (provider: URL / rotate token)
+#   GET /feed/<token>.ics     (calendar apps, no login)
+# ============================================================
+
+FEED_HISTORY = timedelta(days=365)
+
+
+class CalendarFeedView(APIView):
+    """
+    GET returns the provider's ICS subscription URL (created on first use),
+    POST rotates its token, revoking the previous URL.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_feed(self, request):
+        provider = getattr(request.user, "provider_profile", None)
+        if provider is None:
+            return None
+        feed, _ = CalendarFeed.objects.get_or_create(provider=provider)
+        return feed
+
+    def feed_response(self, request, feed):
+        if feed is None:
+            return Response({"error": "Only providers have a calendar feed"}, status=403)
+        url = request.build_absolute_uri(reverse("calendar-ics-feed", args=[feed.token]))
+        return Response({"url": url})
+
+    def get(self, request):
+        return self.feed_response(request, self.get_feed(request))
+
+    def post(self, request):
+        feed = self.get_feed(request)
+        if feed is not None:
+            feed.rotate()
+        return self.feed_response(request, feed)
+
+
+@require_GET
+def provider_ics_feed(request, token):
+    """
+    Sessions of the last FEED_HISTORY and all upcoming ones as iCalendar,
+    streamed. Polling clients get a 304 until something changes.
+    """
+    feed = get_object_or_404(CalendarFeed.objects.select_related("provider"), token=token)
+    since = timezone.now().date() - FEED_HISTORY
+    sessions = Session.objects.filter(provider=feed.provider, date__gte=since)
+
+    stamp = version_stamp(
+        queryset_stamp(sessions),
+        queryset_stamp(Attendee.objects.filter(session__in=sessions)),
+        queryset_stamp(Booking.objects.filter(session__in=sessions)),
+        extra=[feed.token, since],
+    )
+    cached = not_modified(request, stamp)
+    if cached is not None:
+        return cached
+
+    name = feed.provider.company_name or "The Travel Wild"
+    response = StreamingHttpResponse(stream_calendar(sessions, name), content_type=CONTENT_TYPE)
+    response["Content-Disposition"] = 'inline; filename="calendar.ics"'
+    return set_validators(response, stamp)
@@ -2,7 +2,12 @@ import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
-from apps.chat.models import ChatRoom, Message
+from rest_framework.utils.encoders import JSONEncoder
+from apps.chat.history import InvalidCursor, message_page
+from apps.chat.models import ChatRoom, Message, ReadCursor, mark_read
+from apps.chat.notifications import notify_on_commit
+from apps.chat.serializers import MessageSerializer
+from apps.chat.views import user_can_access_chat
 
 User = get_user_model()
 
@@ -12,6 +17,15 @@ class ChatConsumer(AsyncWebsocketConsumer):
         self.room_id = self.scope["url_route"]["kwargs"]["room_id"]
         self.room_group_name = f"chat_{self.room_id}"
 
+        # Authenticated (apps.chat.middleware) participants only; the room is
+        # resolved once here and reused for every frame of the connection
+        user = self.scope["user"]
+        room = await self.resolve_room(user) if user.is_authenticated else None
+        if room is None:
+            await self.close()
+            return
+        self.chat_id, self.receiver_id = room
+
         # Join the group so views.py can broadcast to us
         await self.channel_layer.group_add(
             self.room_group_name,
@@ -29,23 +43,31 @@ class ChatConsumer(AsyncWebsocketConsumer):
     # This handles messages sent FROM the frontend via WebSocket (optional)
     async def receive(self, text_data):
         data = json.loads(text_data)
-        message_text = data.get("message")
-        sender = self.scope["user"]
 
-        if not sender.is_authenticated:
-            return 
+        # {"type": "sync", "after": "<last message id seen>"} → missed messages
+        if data.get("type") == "sync":
+            payload = await self.load_history(data.get("after"))
+            await self.send(text_data=json.dumps(payload, cls=JSONEncoder))
+            return
 
-        # Save to DB using the Helper
-        saved_message = await self.save_message(self.room_id, sender, message_text)
-        
-        if not saved_message:
+        # {"type": "read"} → everything up to now is seen (no email digest)
+        if data.get("type") == "read":
+            await database_sync_to_async(mark_read)(self.chat_id, self.scope["user"])
             return
 
+        message_text = (data.get("message") or "").strip()
+        if not message_text:
+            return
+
+        # Save to DB using the Helper
+        saved_message = await self.save_message(self.scope["user"], message_text)
+
         # Broadcast the new message to everyone in the room
         await self.channel_layer.group_send(
             self.room_group_name,
             {
                 "type": "chat_message",
+                "id": saved_message['id'],
                 "message": saved_message['text'],
                 "sender_id": saved_message['sender_id'],
                 "created_at": saved_message['created_at'],
@@ -55,6 +77,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
     # This handles messages broadcast FROM views.py
     async def chat_message(self, event):
         await self.send(text_data=json.dumps({
+            "id": event.get("id"),
             "message": event["message"],
             "sender_id": event["sender_id"],
             "created_at": event["created_at"]
@@ -62,21 +85,46 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
     # --- Database Helper ---
     @database_sync_to_async
-    def save_message(self, booking_id, sender, text):
+    def resolve_room(self, user):
+        """
+        (chat id, receiver id) of the booking's chat, or None when it doesn't
+        exist or the user isn't one of its participants.
+        """
+        room = (
+            ChatRoom.objects.select_related("booking__user", "booking__listing__owner")
+            .filter(booking__id=self.room_id)
+            .first()
+        )
+        if room is None or not user_can_access_chat(user, room.booking):
+            return None
+        receiver_id = next(iter(room.participant_ids() - {user.id}), None)
+        return room.id, receiver_id
+
+    @database_sync_to_async
+    def load_history(self, after):
         try:
-            # FIX: Look up ChatRoom by BOOKING ID, not ChatRoom ID
-            room = ChatRoom.objects.get(booking__id=booking_id)
-            
-            msg = Message.objects.create(
-                chat=room,
-                sender=sender,
-                text=text,
-            )
-            return {
-                "text": msg.text,
-                "sender_id": str(msg.sender.id),
-                "created_at": msg.created_at.isoformat()
-            }
-        except Exception as e:
-            print(f"❌ Error saving message: {e}")
-            return None
\ No newline at end of file
+            page = message_page(self.chat_id, after=after or None)
+        except InvalidCursor as exc:
+            return {"type": "error", "detail": str(exc)}
+        context = {"read_cursors": list(ReadCursor.objects.filter(chat_id=self.chat_id))}
+        messages = MessageSerializer(page.messages, many=True, context=context)
+        return {"type": "history", "messages": messages.data, "has_more": page.has_more}
+
+    @database_sync_to_async
+    def save_message(self, sender, text):
+        # Room and receiver come from connect(): just the INSERT (and the
+        # receiver's unread counter, see Message.save). The digest task is
+        # queued, not run.
+        msg = Message.objects.create(
+            chat_id=self.chat_id,
+            sender=sender,
+            receiver_id=self.receiver_id,
+            text=text,
+        )
+        notify_on_commit(msg)
+        return {
+            "id": str(msg.id),
+            "text": msg.text,
+            "sender_id": str(sender.id),
+            "created_at": msg.created_at.isoformat()
+        }
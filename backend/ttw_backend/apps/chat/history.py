@@ -0,0 +1,69 @@
+"""
+Chat history pages, seeking on (created_at, id).
+
+    page = message_page(chat, limit=50)                 # the latest 50
+    page = message_page(chat, before=oldest_id)         # scrolling up
+    page = message_page(chat, after=newest_id)          # deltas since last seen
+
+Messages always come oldest first. Each page is one range scan on the
+Message(chat, created_at, id) index, whatever the size of the chat.
+"""
+from collections import namedtuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+from .models import Message
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+Page = namedtuple("Page", ["messages", "has_more"])
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def parse_limit(value):
+    try:
+        limit = int(value) if value not in (None, "") else DEFAULT_LIMIT
+    except (TypeError, ValueError):
+        raise InvalidCursor("limit must be a number")
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def _anchor(chat, message_id):
+    try:
+        return Message.objects.filter(chat=chat).values("created_at", "id").get(pk=message_id)
+    except (Message.DoesNotExist, ValidationError, ValueError):
+        raise InvalidCursor(f"Unknown message {message_id}")
+
+
+def message_page(chat, before=None, after=None, limit=DEFAULT_LIMIT):
+    """
+    Up to `limit` messages of `chat` just before / after the given message
+    id (the latest ones by default). `has_more` tells whether older messages
+    (default / before) or newer ones (after) are left.
+    """
+    messages = Message.objects.filter(chat=chat).select_related(
+        "sender", "sender__provider_profile", "sender__instructor_profile"
+    )
+
+    if after is not None:
+        anchor = _anchor(chat, after)
+        messages = messages.filter(
+            Q(created_at__gt=anchor["created_at"])
+            | Q(created_at=anchor["created_at"], id__gt=anchor["id"])
+        ).order_by("created_at", "id")
+        rows = list(messages[:limit + 1])
+        return Page(rows[:limit], len(rows) > limit)
+
+    if before is not None:
+        anchor = _anchor(chat, before)
+        messages = messages.filter(
+            Q(created_at__lt=anchor["created_at"])
+            | Q(created_at=anchor["created_at"], id__lt=anchor["id"])
+        )
+    rows = list(messages.order_by("-created_at", "-id")[:limit + 1])
+    return Page(rows[:limit][::-1], len(rows) > limit)
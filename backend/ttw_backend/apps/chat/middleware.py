@@ -0,0 +1,53 @@
+"""
+JWT authentication for WebSocket connections.
+
+Browsers can't set an Authorization header on a WebSocket, so the SimpleJWT
+access token travels in the query string:
+
+    new WebSocket(`wss://host/ws/chat/<booking_id>/?token=${access}`)
+
+Non-browser clients may send `Authorization: Bearer <access>` instead.
+Without a token the session user (AuthMiddlewareStack) is kept; an invalid
+or expired token means an anonymous user.
+"""
+from urllib.parse import parse_qs
+
+from channels.auth import AuthMiddlewareStack
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+
+def scope_token(scope):
+    token = parse_qs(scope.get("query_string", b"").decode()).get("token")
+    if token:
+        return token[0]
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            kind, _, raw = value.decode().partition(" ")
+            if kind.lower() == "bearer" and raw:
+                return raw.strip()
+    return None
+
+
+@database_sync_to_async
+def token_user(raw_token):
+    authentication = JWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    async def __call__(self, scope, receive, send):
+        raw_token = scope_token(scope)
+        if raw_token:
+            scope = dict(scope, user=await token_user(raw_token))
+        return await super().__call__(scope, receive, send)
+
+
+def JWTAuthMiddlewareStack(inner):
+    return AuthMiddlewareStack(JWTAuthMiddleware(inner))
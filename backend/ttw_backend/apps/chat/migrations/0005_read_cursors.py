@@ -0,0 +1,56 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def backfill_cursors(apps, schema_editor):
+    """
+    One cursor per (room, participant) from the MessageSeen rows: read up
+    to the newest message they saw, unread = others' messages not seen.
+    """
+    ChatRoom = apps.get_model("chat", "ChatRoom")
+    Message = apps.get_model("chat", "Message")
+    ReadCursor = apps.get_model("chat", "ReadCursor")
+
+    cursors = []
+    rooms = ChatRoom.objects.values_list("id", "booking__user_id", "booking__listing__owner_id")
+    for room_id, traveler_id, owner_id in rooms.iterator():
+        messages = Message.objects.filter(chat_id=room_id)
+        for user_id in {traveler_id, owner_id} - {None}:
+            seen = messages.filter(seen_records__user_id=user_id)
+            cursors.append(ReadCursor(
+                chat_id=room_id,
+                user_id=user_id,
+                last_read_at=seen.aggregate(latest=Max("created_at"))["latest"],
+                unread_count=messages.exclude(sender_id=user_id).exclude(id__in=seen.values("id")).count(),
+            ))
+    ReadCursor.objects.bulk_create(cursors, batch_size=500, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0004_message_receiver'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReadCursor',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_read_at', models.DateTimeField(blank=True, null=True)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('chat', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_cursors', to='chat.chatroom')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chat_read_cursors', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('chat', 'user'), name='unique_chat_read_cursor')],
+            },
+        ),
+        migrations.RunPython(backfill_cursors, migrations.RunPython.noop),
+    ]
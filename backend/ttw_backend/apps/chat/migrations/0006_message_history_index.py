@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0005_read_cursors'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['chat', 'created_at', 'id'], name='chat_message_history_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0006_message_history_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='readcursor',
+            name='notified_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
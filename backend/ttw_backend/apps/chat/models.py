@@ -1,5 +1,6 @@
 import uuid
 from django.db import models
+from django.db.models.functions import Coalesce, Now
 from django.conf import settings
 
 class ChatRoom(models.Model):
@@ -16,6 +17,22 @@ class ChatRoom(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding:
+            ReadCursor.objects.bulk_create(
+                [ReadCursor(chat=self, user_id=user_id) for user_id in self.participant_ids()],
+                ignore_conflicts=True,
+            )
+
+    def participant_ids(self):
+        """
+        Traveler and listing owner (see views.user_can_access_chat).
+        """
+        booking = self.booking
+        return {booking.user_id, booking.listing.owner_id} - {None}
+
     def __str__(self):
         return f"Chat for booking {self.booking_id}"
 
@@ -47,13 +64,76 @@ class Message(models.Model):
     # Ejemplo futuro: file = models.FileField(...)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding:
+            # One UPDATE: every other participant has one more unread message
+            ReadCursor.objects.filter(chat_id=self.chat_id).exclude(user_id=self.sender_id).update(
+                unread_count=models.F("unread_count") + 1,
+                updated_at=self.created_at,
+            )
+
+    class Meta:
+        indexes = [
+            # History pages seek on (created_at, id) within a chat
+            models.Index(fields=["chat", "created_at", "id"], name="chat_message_history_idx"),
+        ]
+
     def __str__(self):
         return f"Message from {self.sender} in chat {self.chat_id}"
 
+class ReadCursor(models.Model):
+    """
+    Read state of one participant in one chat: everything up to
+    `last_read_at` is seen. `unread_count` is kept up to date as messages
+    arrive (Message.save) and reset when the user reads the chat, so unread
+    badges are a single-row read. `notified_at` is the newest message already
+    sent to the user in an email digest (apps.chat.notifications).
+    """
+    chat = models.ForeignKey(ChatRoom, on_delete=models.CASCADE, related_name="read_cursors")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="chat_read_cursors",
+    )
+    last_read_at = models.DateTimeField(null=True, blank=True)
+    unread_count = models.PositiveIntegerField(default=0)
+    notified_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["chat", "user"], name="unique_chat_read_cursor"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} read {self.chat_id} up to {self.last_read_at}"
+
+
+def mark_read(chat, user):
+    """
+    Marks everything in `chat` as read by `user` in ONE UPDATE. Returns
+    whether the user takes part in the chat.
+    """
+    latest = Message.objects.filter(chat=chat).order_by().values("chat").annotate(
+        latest=models.Max("created_at")
+    ).values("latest")
+    return bool(
+        ReadCursor.objects.filter(chat=chat, user=user).update(
+            last_read_at=Coalesce(
+                models.Subquery(latest), models.F("last_read_at")
+            ),
+            unread_count=0,
+            updated_at=Now(),
+        )
+    )
+
+
 class MessageSeen(models.Model):
     """
-    Tracks which user has seen which message.
-    One row per (message, user).
+    DEPRECATED: one row per (message, user), replaced by ReadCursor. Kept
+    (no longer written) until the data migration has run everywhere.
     """
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
@@ -0,0 +1,97 @@
+"""
+Debounced email digests of unread chat messages.
+
+Every message schedules, on commit, a `send_chat_digest_task` for its
+receiver that runs QUIET_WINDOW later. Only the task of the last message in
+a quiet window sends anything: one "chat_digest" email (through the outbox)
+listing whatever the receiver hasn't read nor been emailed yet. Earlier
+tasks see a newer message and do nothing, and if the receiver read the chat
+in the meantime (HTTP or WebSocket, see mark_read) there is nothing left to
+send. A rapid back-and-forth is one email instead of one per line, and
+sending never happens inside the request.
+
+The receiver's ReadCursor holds the state: `last_read_at` and `notified_at`
+(newest message already emailed) bound what is pending.
+"""
+from datetime import timedelta
+from functools import partial
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.outbox import enqueue_email
+
+from .models import ReadCursor
+
+QUIET_WINDOW = timedelta(minutes=5)
+
+# Messages quoted in a digest (the latest ones; the rest are only counted)
+DIGEST_MESSAGES = 10
+
+
+def notify_on_commit(message):
+    """
+    Schedules the receiver's digest once the current transaction commits.
+    """
+    if message.receiver_id is None:
+        return
+    # robust: a broker outage must not fail the already committed request
+    transaction.on_commit(partial(_schedule, message.chat_id, message.receiver_id), robust=True)
+
+
+def _schedule(chat_id, user_id):
+    from .tasks import send_chat_digest_task
+    send_chat_digest_task.apply_async(
+        args=[str(chat_id), str(user_id)], countdown=QUIET_WINDOW.total_seconds()
+    )
+
+
+def send_digest(chat_id, user_id):
+    """
+    Queues the digest of `user_id`'s unread, not yet emailed messages in
+    the chat, once it has been quiet for QUIET_WINDOW. Returns whether an
+    email was queued.
+    """
+    cursor = (
+        ReadCursor.objects.select_related("user", "chat__booking__listing")
+        .filter(chat_id=chat_id, user_id=user_id)
+        .first()
+    )
+    if cursor is None or not cursor.user.email:
+        return False
+
+    pending = cursor.chat.messages.exclude(sender_id=user_id)
+    since = max(filter(None, [cursor.last_read_at, cursor.notified_at]), default=None)
+    if since is not None:
+        pending = pending.filter(created_at__gt=since)
+    latest = list(pending.select_related("sender").order_by("-created_at", "-id")[:DIGEST_MESSAGES])
+    if not latest:
+        return False  # Read (or emailed) meanwhile
+    if latest[0].created_at > timezone.now() - QUIET_WINDOW:
+        return False  # Still talking: the newer message's task sends it
+
+    with transaction.atomic():
+        # Claim the window; a concurrent task for the same receiver gets 0 rows
+        claimed = ReadCursor.objects.filter(pk=cursor.pk, notified_at=cursor.notified_at).update(
+            notified_at=latest[0].created_at
+        )
+        if not claimed:
+            return False
+
+        booking = cursor.chat.booking
+        snapshot = booking.listing_snapshot or {}
+        title = snapshot.get("title") or booking.listing.title
+        enqueue_email(
+            to=cursor.user.email,
+            subject=f"New messages about {title}",
+            template="chat_digest",
+            context={
+                "title": title,
+                "count": pending.count(),
+                "messages": [
+                    {"sender": m.sender.get_full_name() or m.sender.email, "text": m.text}
+                    for m in reversed(latest)
+                ],
+            },
+        )
+    return True
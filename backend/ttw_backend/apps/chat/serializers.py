@@ -27,9 +27,16 @@ class MessageSerializer(serializers.ModelSerializer):
         )
 
     def get_seen_by(self, obj):
+        # Seen by every other participant who has read past this message
+        cursors = self.context.get("read_cursors")
+        if cursors is None:
+            cursors = obj.chat.read_cursors.all()
         return [
-            {"user": seen.user.id, "seen_at": seen.seen_at}
-            for seen in obj.seen_records.all()
+            {"user": cursor.user_id, "seen_at": cursor.last_read_at}
+            for cursor in cursors
+            if cursor.user_id != obj.sender_id
+            and cursor.last_read_at
+            and cursor.last_read_at >= obj.created_at
         ]
 
     def get_sender_role(self, obj):
@@ -41,9 +48,17 @@ class MessageSerializer(serializers.ModelSerializer):
         return "USER"
 
 class ChatRoomSerializer(serializers.ModelSerializer):
+    # No messages: they are paged from /chat/bookings/<id>/messages/
     booking_id = serializers.UUIDField(source="booking.id", read_only=True)
-    messages = MessageSerializer(many=True, read_only=True)
+    unread_count = serializers.SerializerMethodField()
 
     class Meta:
         model = ChatRoom
-        fields = ("id", "booking_id", "created_at", "messages")
\ No newline at end of file
+        fields = ("id", "booking_id", "created_at", "unread_count")
+
+    def get_unread_count(self, obj):
+        request = self.context.get("request")
+        cursors = self.context.get("read_cursors")
+        if request is None or cursors is None:
+            return 0
+        return next((c.unread_count for c in cursors if c.user_id == request.user.id), 0)
\ No newline at end of file
@@ -0,0 +1,12 @@
+from celery import shared_task
+
+from .notifications import send_digest
+
+
+@shared_task(autoretry_for=(Exception,), retry_backoff=10, retry_kwargs={"max_retries": 3})
+def send_chat_digest_task(chat_id, user_id):
+    """
+    Emails a receiver their unread chat messages once the chat went quiet
+    (scheduled on commit by notifications.notify_on_commit).
+    """
+    return send_digest(chat_id, user_id)
@@ -0,0 +1,335 @@
+from collections import Counter
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.bookings.models import Booking
+from apps.chat.history import message_page
+from apps.chat.middleware import JWTAuthMiddlewareStack
+from apps.chat.models import ChatRoom, Message, ReadCursor, mark_read
+from apps.chat.notifications import QUIET_WINDOW, send_digest
+from apps.chat.routing import websocket_urlpatterns
+from apps.core.email_templates import render
+from apps.core.models import OutboxEmail
+from apps.core.pagination import KeysetPagination
+from apps.listings.models import Listing, Sport
+from apps.locations.models import City, Country
+from apps.users.models import User
+
+
+class ChatTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        # Email digests are scheduled on commit (see ChatDigestTests)
+        patcher = mock.patch("apps.chat.tasks.send_chat_digest_task.apply_async")
+        self.schedule_digest = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        country = Country.objects.create(code="ES", name="Spain")
+        city = City.objects.create(
+            name="Tarifa", slug="tarifa", latitude=36.01, longitude=-5.6, country=country
+        )
+        sport = Sport.objects.create(name="Kitesurf", slug="kitesurf")
+        self.owner = User.objects.create_user(email="school@example.com", password="x", role="PROVIDER")
+        self.listing = Listing.objects.create(
+            owner=self.owner,
+            title="Kite camp",
+            description="Learn to kite",
+            type="TRIP",
+            sport=sport,
+            city=city,
+            price=100,
+            universal_level="BEGINNER",
+        )
+
+    def add_room(self):
+        n = ChatRoom.objects.count()
+        traveler = User.objects.create_user(email=f"traveler{n}@example.com", password="x", role="TRAVELER")
+        booking = Booking.objects.create(
+            listing=self.listing,
+            user=traveler,
+            start_date=timezone.now().date() + timedelta(days=10),
+            guests=1,
+            total_price=100,
+        )
+        return ChatRoom.objects.create(booking=booking)
+
+    def say(self, room, sender, text):
+        return Message.objects.create(chat=room, sender=sender, text=text)
+
+
+class ProviderInboxTests(ChatTestCase):
+    def inbox(self, **params):
+        self.client.force_authenticate(self.owner)
+        return self.client.get("/api/chat/provider/", params, secure=True)
+
+    def test_last_message_and_unread_count(self):
+        quiet = self.add_room()
+        room = self.add_room()
+        traveler = room.booking.user
+        self.say(room, traveler, "Hi")
+        mark_read(room, self.owner)
+        self.say(room, traveler, "Is the wind good?")
+        self.say(room, traveler, "Any news?")
+        self.say(room, self.owner, "Yes, 20 knots")
+
+        data = self.inbox().json()
+
+        self.assertEqual([c["booking_id"] for c in data], [str(room.booking_id), str(quiet.booking_id)])
+        self.assertEqual((data[0]["last_message"], data[0]["unread_count"]), ("Yes, 20 knots", 2))
+        self.assertEqual((data[1]["last_message"], data[1]["unread_count"]), ("", 0))
+
+    def test_query_count_does_not_grow_with_rooms(self):
+        def queries():
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self.inbox().status_code, 200)
+            return len(ctx.captured_queries)
+
+        for _ in range(2):
+            self.say(self.add_room(), self.owner, "Welcome")
+        few = queries()
+
+        for _ in range(8):
+            self.say(self.add_room(), self.owner, "Welcome")
+        self.assertEqual(queries(), few)
+
+    def test_keyset_pages(self):
+        rooms = [self.add_room() for _ in range(5)]
+        for room in rooms:
+            self.say(room, self.owner, "Welcome")
+
+        seen, pages, url = [], 0, None
+        with mock.patch.object(KeysetPagination, "page_size", 2):
+            while True:
+                page = (self.client.get(url, secure=True) if url else self.inbox(cursor="")).json()
+                seen += [c["booking_id"] for c in page["results"]]
+                pages += 1
+                url = page["next"]
+                if not url:
+                    break
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(seen, [str(r.booking_id) for r in reversed(rooms)])
+
+
+class ReadCursorTests(ChatTestCase):
+    def setUp(self):
+        super().setUp()
+        self.room = self.add_room()
+        self.traveler = self.room.booking.user
+
+    def unread(self, user):
+        return ReadCursor.objects.get(chat=self.room, user=user).unread_count
+
+    def test_counters_follow_messages(self):
+        self.say(self.room, self.traveler, "Hi")
+        self.say(self.room, self.traveler, "Anyone?")
+        self.say(self.room, self.owner, "Hello")
+
+        self.assertEqual((self.unread(self.owner), self.unread(self.traveler)), (2, 1))
+
+    def test_mark_seen_is_one_update(self):
+        first = self.say(self.room, self.traveler, "Hi")
+        last = self.say(self.room, self.traveler, "Anyone?")
+        self.client.force_authenticate(self.owner)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.patch(f"/api/chat/bookings/{self.room.booking_id}/seen/", secure=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([q["sql"].split()[0] for q in ctx.captured_queries].count("UPDATE"), 1)
+        self.assertEqual(self.unread(self.owner), 0)
+
+        messages = self.client.get(f"/api/chat/bookings/{self.room.booking_id}/messages/", secure=True).json()
+        self.assertEqual([len(m["seen_by"]) for m in messages], [1, 1])
+        self.assertEqual(
+            ReadCursor.objects.get(chat=self.room, user=self.owner).last_read_at,
+            max(first.created_at, last.created_at),
+        )
+
+    def test_room_reports_unread_badge(self):
+        self.say(self.room, self.owner, "Welcome")
+        self.client.force_authenticate(self.traveler)
+
+        room = self.client.get(f"/api/chat/bookings/{self.room.booking_id}/", secure=True).json()
+
+        self.assertEqual(room["unread_count"], 1)
+
+    def test_room_does_not_load_messages(self):
+        url = f"/api/chat/bookings/{self.room.booking_id}/"
+        self.client.force_authenticate(self.traveler)
+        self.say(self.room, self.owner, "Welcome")
+
+        with CaptureQueriesContext(connection) as first:
+            room = self.client.get(url, secure=True).json()
+        for n in range(5):
+            self.say(self.room, self.owner, f"#{n}")
+        with self.assertNumQueries(len(first)):
+            self.client.get(url, secure=True)
+
+        self.assertNotIn("messages", room)
+        self.assertFalse([q for q in first if 'FROM "chat_message"' in q["sql"]])
+
+
+class MessageHistoryTests(ChatTestCase):
+    def setUp(self):
+        super().setUp()
+        self.room = self.add_room()
+        start = timezone.now() - timedelta(hours=1)
+        self.messages = []
+        for n in range(5):
+            message = self.say(self.room, self.room.booking.user, f"#{n}")
+            Message.objects.filter(pk=message.pk).update(created_at=start + timedelta(minutes=n))
+            self.messages.append(message)
+        self.client.force_authenticate(self.owner)
+
+    def history(self, **params):
+        return self.client.get(f"/api/chat/bookings/{self.room.booking_id}/messages/", params, secure=True)
+
+    def test_latest_page_links_to_older_messages(self):
+        response = self.history(limit=2)
+
+        self.assertEqual([m["text"] for m in response.json()], ["#3", "#4"])
+        self.assertIn(f"before={self.messages[3].pk}", response["Link"])
+        self.assertIn('rel="prev"', response["Link"])
+
+        older = self.history(limit=2, before=self.messages[3].pk)
+        self.assertEqual([m["text"] for m in older.json()], ["#1", "#2"])
+
+        oldest = self.history(limit=2, before=self.messages[1].pk)
+        self.assertEqual([m["text"] for m in oldest.json()], ["#0"])
+        self.assertFalse(oldest.has_header("Link"))
+
+    def test_after_returns_newer_messages(self):
+        response = self.history(limit=2, after=self.messages[1].pk)
+
+        self.assertEqual([m["text"] for m in response.json()], ["#2", "#3"])
+        self.assertIn(f"after={self.messages[3].pk}", response["Link"])
+        self.assertEqual(message_page(self.room, after=self.messages[4].pk).messages, [])
+
+    def test_unknown_cursor_is_rejected(self):
+        other = self.add_room()
+        foreign = self.say(other, other.booking.user, "Elsewhere")
+
+        self.assertEqual(self.history(before=foreign.pk).status_code, 400)
+        self.assertEqual(self.history(after="not-an-id").status_code, 400)
+        self.assertEqual(self.history(limit="many").status_code, 400)
+
+
+class ChatSocketTests(ChatTestCase):
+    def setUp(self):
+        super().setUp()
+        self.room = self.add_room()
+        self.traveler = self.room.booking.user
+
+    def socket(self, user=None, token=None):
+        if user is not None:
+            token = AccessToken.for_user(user)
+        path = f"/ws/chat/{self.room.booking_id}/" + (f"?token={token}" if token else "")
+        return WebsocketCommunicator(JWTAuthMiddlewareStack(URLRouter(websocket_urlpatterns)), path)
+
+    def exchange(self, socket, *frames):
+        async def run():
+            connected, _ = await socket.connect()
+            self.assertTrue(connected)
+            replies = []
+            for frame in frames:
+                await socket.send_json_to(frame)
+                replies.append(await socket.receive_json_from())
+            await socket.disconnect()
+            return replies
+        return async_to_sync(run)()
+
+    def test_rejects_anonymous_and_outsiders(self):
+        stranger = User.objects.create_user(email="stranger@example.com", password="x")
+
+        for socket in [self.socket(), self.socket(token="garbage"), self.socket(stranger)]:
+            connected, _ = async_to_sync(socket.connect)()
+            self.assertFalse(connected)
+
+    def test_message_is_one_insert(self):
+        def statements(count):
+            with CaptureQueriesContext(connection) as ctx:
+                events = self.exchange(self.socket(self.traveler), *[{"message": "Hello"}] * count)
+            return Counter(q["sql"].split()[0] for q in ctx.captured_queries), events
+
+        one, _ = statements(1)
+        three, events = statements(3)
+
+        # Beyond connecting, each message is its INSERT + the unread counter UPDATE
+        self.assertEqual(three - one, Counter({"INSERT": 2, "UPDATE": 2}))
+        message = Message.objects.get(pk=events[0]["id"])
+        self.assertEqual((message.receiver_id, events[0]["message"]), (self.owner.id, "Hello"))
+
+    def test_sync_returns_missed_messages(self):
+        first = self.say(self.room, self.traveler, "Hi")
+        self.say(self.room, self.traveler, "Still there?")
+
+        [history] = self.exchange(self.socket(self.owner), {"type": "sync", "after": str(first.pk)})
+
+        self.assertEqual([m["text"] for m in history["messages"]], ["Still there?"])
+
+
+class ChatDigestTests(ChatTestCase):
+    def setUp(self):
+        super().setUp()
+        self.room = self.add_room()
+        self.traveler = self.room.booking.user
+
+    def say_earlier(self, text, minutes):
+        message = self.say(self.room, self.traveler, text)
+        Message.objects.filter(pk=message.pk).update(created_at=timezone.now() - timedelta(minutes=minutes))
+        return message
+
+    def test_post_schedules_digest_instead_of_mailing(self):
+        self.client.force_authenticate(self.traveler)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f"/api/chat/bookings/{self.room.booking_id}/messages/", {"text": "Hi"}, secure=True
+            )
+
+        self.assertEqual(response.status_code, 201)
+        self.schedule_digest.assert_called_once_with(
+            args=[str(self.room.pk), str(self.owner.pk)], countdown=QUIET_WINDOW.total_seconds()
+        )
+        self.assertFalse(OutboxEmail.objects.exists())
+
+    def test_one_digest_per_quiet_window(self):
+        for n, text in enumerate(["Hi", "Is the wind good?", "Any news?"]):
+            self.say_earlier(text, minutes=30 - n)
+
+        # One task per message: the first to run sends, the others find nothing
+        self.assertEqual([send_digest(self.room.pk, self.owner.pk) for _ in range(3)], [True, False, False])
+
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.to, [self.owner.email])
+        self.assertEqual(email.context["count"], 3)
+        self.assertIn("traveler0@example.com: Any news?", render(email.template, email.context))
+
+        self.say_earlier("Hello?", minutes=10)
+        self.assertTrue(send_digest(self.room.pk, self.owner.pk))
+        self.assertEqual(OutboxEmail.objects.latest("created_at").context["count"], 1)
+
+    def test_waits_while_chat_is_active(self):
+        self.say_earlier("Hi", minutes=30)
+        self.say(self.room, self.traveler, "Still there?")
+
+        self.assertFalse(send_digest(self.room.pk, self.owner.pk))
+        self.assertFalse(OutboxEmail.objects.exists())
+
+    def test_skipped_once_read(self):
+        self.say_earlier("Hi", minutes=30)
+        mark_read(self.room, self.owner)
+
+        self.assertFalse(send_digest(self.room.pk, self.owner.pk))
+        self.assertFalse(OutboxEmail.objects.exists())
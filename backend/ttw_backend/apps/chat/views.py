@@ -2,14 +2,11 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
+from rest_framework.utils.urls import replace_query_param
 
 from django.utils import timezone
-from django.db.models import Max
-
-# --- EMAIL IMPORTS ---
-from django.core.mail import send_mail
-from django.conf import settings
-# ---------------------
+from django.db.models import IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
 # --- WEBSOCKET IMPORTS ---
 from channels.layers import get_channel_layer
@@ -17,7 +14,11 @@ from asgiref.sync import async_to_sync
 # -------------------------
 
 from apps.bookings.models import Booking
-from .models import ChatRoom, Message
+from apps.core.conditional import queryset_stamp, version_stamp, not_modified, set_validators
+from apps.core.pagination import KeysetPagination
+from .history import InvalidCursor, message_page, parse_limit
+from .models import ChatRoom, Message, ReadCursor, mark_read
+from .notifications import notify_on_commit
 from .serializers import MessageSerializer, ChatRoomSerializer
 
 
@@ -41,7 +42,7 @@ class BookingChatView(APIView):
 
     def get(self, request, booking_id):
         try:
-            booking = Booking.objects.get(id=booking_id)
+            booking = Booking.objects.select_related("user", "listing__owner").get(id=booking_id)
         except Booking.DoesNotExist:
             return Response({"detail": "Booking not found"}, status=status.HTTP_404_NOT_FOUND)
 
@@ -49,7 +50,7 @@ class BookingChatView(APIView):
             return Response({"detail": "Not allowed"}, status=status.HTTP_403_FORBIDDEN)
 
         chat, created = ChatRoom.objects.get_or_create(booking=booking)
-        serializer = ChatRoomSerializer(chat)
+        serializer = ChatRoomSerializer(chat, context=read_context(request, chat))
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -66,15 +67,47 @@ class BookingMessagesView(APIView):
         return chat, None
 
     def get(self, request, booking_id):
+        """
+        The latest `limit` messages (default 50), oldest first. `?before=<id>`
+        pages back through history, `?after=<id>` returns what is new since
+        that message. A Link header points to the next page when there is one.
+        """
         chat, error = self.get_chat(booking_id)
         if error: return error
 
         if not user_can_access_chat(request.user, chat.booking):
             return Response({"detail": "Not allowed"}, status=status.HTTP_403_FORBIDDEN)
 
-        messages = chat.messages.order_by("created_at")
-        serializer = MessageSerializer(messages, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # Messages are append-only; read cursors are the only other change
+        stamp = version_stamp(
+            queryset_stamp(chat.messages.all(), "created_at"),
+            queryset_stamp(chat.read_cursors.all()),
+            extra=[request.get_full_path()],
+        )
+        cached = not_modified(request, stamp)
+        if cached is not None:
+            return cached
+
+        before = request.query_params.get("before") or None
+        after = request.query_params.get("after") or None
+        try:
+            page = message_page(
+                chat, before=before, after=after, limit=parse_limit(request.query_params.get("limit"))
+            )
+        except InvalidCursor as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = MessageSerializer(page.messages, many=True, context=read_context(request, chat))
+        response = Response(serializer.data, status=status.HTTP_200_OK)
+        if page.has_more and page.messages:
+            # Older history (or, with ?after=, more news) left: link to it
+            if after is not None:
+                param, rel, edge = "after", "next", page.messages[-1]
+            else:
+                param, rel, edge = "before", "prev", page.messages[0]
+            url = replace_query_param(request.build_absolute_uri(), param, edge.id)
+            response["Link"] = f'<{url}>; rel="{rel}"'
+        return set_validators(response, stamp)
 
     def post(self, request, booking_id):
         chat, error = self.get_chat(booking_id)
@@ -124,6 +157,7 @@ class BookingMessagesView(APIView):
                 room_group_name,
                 {
                     "type": "chat_message",
+                    "id": str(message.id),
                     "message": message.text,
                     "sender_id": str(message.sender.id),
                     "created_at": message.created_at.isoformat()
@@ -132,28 +166,8 @@ class BookingMessagesView(APIView):
         except Exception as e:
             print(f"WebSocket broadcast error: {e}")
 
-        # 5. SEND EMAIL NOTIFICATION (New Feature)
-        if receiver and receiver.email:
-            try:
-                subject = f"New Message from {sender.email} - Booking #{str(booking.id)[:8]}"
-                email_body = (
-                    f"Hello,\n\n"
-                    f"You have received a new message regarding booking {booking.listing.title}.\n\n"
-                    f"From: {sender.email}\n"
-                    f"Message: \"{text}\"\n\n"
-                    f"Please log in to your dashboard to reply."
-                )
-                
-                send_mail(
-                    subject,
-                    email_body,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [receiver.email],
-                    fail_silently=True # Prevents crashing if email fails
-                )
-                print(f"📧 Email sent to {receiver.email}")
-            except Exception as e:
-                print(f"❌ Email sending failed: {e}")
+        # 5. Email the receiver a digest if they don't read it soon
+        notify_on_commit(message)
 
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -171,23 +185,47 @@ class BookingMarkSeenView(APIView):
             return Response({"detail": "Not allowed"}, status=status.HTTP_403_FORBIDDEN)
 
         chat, _ = ChatRoom.objects.get_or_create(booking=booking)
+        mark_read(chat, request.user)
 
-        from .models import MessageSeen
+        return Response({"detail": "Messages marked as seen"}, status=status.HTTP_200_OK)
 
-        messages = chat.messages.exclude(sender=request.user)
 
-        for msg in messages:
-            MessageSeen.objects.get_or_create(
-                message=msg,
-                user=request.user,
-                defaults={"seen_at": timezone.now()}
-            )
+def read_context(request, chat):
+    """
+    Serializer context with the chat's read cursors, loaded once for all
+    messages (MessageSerializer.seen_by, ChatRoomSerializer.unread_count).
+    """
+    return {"request": request, "read_cursors": list(chat.read_cursors.all())}
 
-        return Response({"detail": "Messages marked as seen"}, status=status.HTTP_200_OK)
+
+def inbox_rooms(user):
+    """
+    The provider's booking chats with last message and unread count (from
+    the provider's read cursor), in ONE query: correlated subqueries per
+    room instead of queries per room.
+    `last_activity` (last message, else room creation) orders the inbox.
+    """
+    last = Message.objects.filter(chat=OuterRef("pk")).order_by("-created_at")
+    unread = ReadCursor.objects.filter(chat=OuterRef("pk"), user=user).values("unread_count")[:1]
+    return (
+        ChatRoom.objects.filter(booking__listing__owner=user)
+        .select_related("booking__user", "booking__listing")
+        .annotate(
+            last_message=Subquery(last.values("text")[:1]),
+            last_message_at=Subquery(last.values("created_at")[:1]),
+            unread_count=Coalesce(Subquery(unread, output_field=IntegerField()), 0),
+        )
+        .annotate(last_activity=Coalesce("last_message_at", "created_at"))
+    )
 
 
 class ProviderChatListView(APIView):
+    """
+    Provider inbox. Plain list by default; `?cursor=` (empty for the first
+    page) switches to keyset pages ordered by latest activity.
+    """
     permission_classes = [IsAuthenticated]
+    keyset_ordering = ("-last_activity", "-id")
 
     def get(self, request):
         user = request.user
@@ -195,22 +233,26 @@ class ProviderChatListView(APIView):
         if user.role not in ['PROVIDER', 'INSTRUCTOR', 'ADMIN']:
              return Response({"detail": "Not a provider or instructor"}, status=status.HTTP_403_FORBIDDEN)
 
-        rooms = ChatRoom.objects.filter(booking__listing__owner=user).annotate(
-            last_message_time=Max("messages__created_at")
-        ).order_by("-last_message_time")
+        rooms = inbox_rooms(user).order_by(*self.keyset_ordering)
+
+        paginator = None
+        if KeysetPagination.cursor_query_param in request.query_params:
+            paginator = KeysetPagination()
+            rooms = paginator.paginate_queryset(rooms, request, view=self)
 
         data = []
         for room in rooms:
-            last_msg = room.messages.order_by("-created_at").first()
             booking = room.booking
 
             data.append({
                 "booking_id": str(booking.id),
                 "customer": booking.user.email,
                 "title": booking.listing.title,
-                "last_message": last_msg.text if last_msg else "",
-                "timestamp": last_msg.created_at if last_msg else room.created_at,
-                "unread_count": room.messages.exclude(sender=user).exclude(seen_records__user=user).count(),
+                "last_message": room.last_message or "",
+                "timestamp": room.last_activity,
+                "unread_count": room.unread_count,
             })
 
-        return Response(data, status=status.HTTP_200_OK)
\ No newline at end of file
+        if paginator is not None:
+            return paginator.get_paginated_response(data)
+        return Response(data, status=status.HTTP_200_OK)
@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import OutboxEmail
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ("template", "subject", "status", "attempts", "created_at", "sent_at")
+    list_filter = ("status", "template")
+    search_fields = ("subject", "last_error")
+    readonly_fields = ("created_at", "claimed_at", "sent_at", "last_error")
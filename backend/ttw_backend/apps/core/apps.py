@@ -5,4 +5,5 @@ class CoreConfig(AppConfig):
     name = "apps.core"
 
     def ready(self):
-        import apps.core.tasks  # 🔥 REGISTRA TODAS LAS TASKS
\ No newline at end of file
+        import apps.core.tasks  # 🔥 REGISTRA TODAS LAS TASKS
+        import apps.core.signals  # Response cache invalidation
@@ -0,0 +1,142 @@
+"""
+Response cache for public, user-independent read endpoints.
+
+Cached responses are keyed by URL + the current "version" of every model the
+response depends on. Saving or deleting one of those models bumps its version
+(see apps.core.signals), so stale entries are simply never read again and
+expire on their own — no key scanning or pattern deletes.
+
+Backend: the "default" cache (Redis when CACHE_URL / REDIS_URL is set).
+Without one, settings.RESPONSE_CACHE is off and responses aren't cached
+(versions are still kept for ETags). If it is unreachable we fall back to the in-process LRU ("local") with a
+short TTL instead of failing the request, and stop trying it for
+BREAKER_COOLDOWN seconds so an outage doesn't cost the connect timeout on
+every cache operation.
+"""
+import hashlib
+import logging
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_TIMEOUT = 60 * 15  # Safety net; invalidation is version-driven
+FALLBACK_TIMEOUT = 60       # Per-process copies can't see other workers' bumps
+VERSION_TIMEOUT = None      # Versions never expire
+BREAKER_COOLDOWN = 30       # Seconds the shared cache is skipped after a failure
+
+_VERSION_KEY = "cache-version:{}"
+
+# Per process: monotonic time until which the shared cache is considered down
+_shared_down_until = 0.0
+
+
+def _label(model):
+    return model if isinstance(model, str) else model._meta.label_lower
+
+
+def breaker_open():
+    """
+    True while the shared Redis is considered down. Also consulted by
+    apps.core.ratelimit, whose buckets live on the same server.
+    """
+    return time.monotonic() < _shared_down_until
+
+
+def trip_breaker(exc, fallback="local cache"):
+    global _shared_down_until
+    logger.warning(
+        "Shared cache unavailable (%s), using %s for %ss", exc, fallback, BREAKER_COOLDOWN
+    )
+    _shared_down_until = time.monotonic() + BREAKER_COOLDOWN
+
+
+def _shared_cache():
+    """
+    The shared cache, or None while the breaker is open.
+    """
+    if breaker_open():
+        return None
+    return caches["default"]
+
+
+def _call(method, *args, **kwargs):
+    """
+    Runs a cache operation on the shared cache, falling back to the local one.
+    """
+    shared = _shared_cache()
+    if shared is not None:
+        try:
+            return getattr(shared, method)(*args, **kwargs)
+        except Exception as exc:  # Redis down / timeout
+            trip_breaker(exc)
+    if "timeout" in kwargs:
+        kwargs["timeout"] = min(kwargs["timeout"], FALLBACK_TIMEOUT)
+    return getattr(caches["local"], method)(*args, **kwargs)
+
+
+def model_versions(*models):
+    keys = [_VERSION_KEY.format(_label(m)) for m in models]
+    found = _call("get_many", keys)
+    return [found.get(key, 0) for key in keys]
+
+
+def bump_model_version(model):
+    """
+    Invalidates every cached response depending on `model`.
+    """
+    key = _VERSION_KEY.format(_label(model))
+    for cache in (_shared_cache(), caches["local"]):
+        if cache is None:
+            continue
+        try:
+            if cache.add(key, 1, VERSION_TIMEOUT):
+                continue
+            cache.incr(key)
+        except ValueError:
+            # Evicted between add() and incr()
+            cache.set(key, 1, VERSION_TIMEOUT)
+        except Exception as exc:
+            trip_breaker(exc)
+
+
+def response_cache_key(request, models):
+    versions = model_versions(*models)
+    raw = "|".join([
+        request.get_host(),
+        request.get_full_path(),
+        request.accepted_renderer.format,
+        ",".join(f"{_label(m)}={v}" for m, v in zip(models, versions)),
+    ])
+    return "response:" + hashlib.md5(raw.encode()).hexdigest()
+
+
+def cache_response(*models, timeout=RESPONSE_TIMEOUT):
+    """
+    Caches successful responses of a ViewSet method until one of `models`
+    changes. Only for responses that are the same for every visitor.
+
+        @cache_response(Sport, Listing)
+        def list(self, request, *args, **kwargs): ...
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            if not settings.RESPONSE_CACHE:
+                return method(view, request, *args, **kwargs)
+            key = response_cache_key(request, models)
+
+            cached = _call("get", key)
+            if cached is not None:
+                return Response(cached)
+
+            response = method(view, request, *args, **kwargs)
+            if response.status_code == 200:
+                _call("set", key, response.data, timeout=timeout)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,60 @@
+"""
+Conditional GET (ETag / Last-Modified → 304 Not Modified).
+
+Validators come from a cheap version stamp of the rows behind a response —
+`COUNT(*)` + `MAX(updated_at)` in one aggregate query per table — instead of
+hashing the rendered body, so an unchanged poll returns before any
+serialization happens.
+
+    stamp = version_stamp(queryset_stamp(qs), extra=[request.get_full_path()])
+    response = not_modified(request, stamp)
+    if response is not None:
+        return response
+    ...
+    return set_validators(Response(data), stamp)
+"""
+import hashlib
+from collections import namedtuple
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+Stamp = namedtuple("Stamp", ["etag", "last_modified"])
+
+
+def queryset_stamp(queryset, field="updated_at"):
+    """
+    (row count, latest `field`) of `queryset` in ONE aggregate query.
+    """
+    row = queryset.order_by().aggregate(n=Count("pk"), latest=Max(field))
+    return row["n"], row["latest"]
+
+
+def version_stamp(*stamps, extra=()):
+    """
+    Strong ETag + Last-Modified from queryset stamps (and any extra
+    discriminators such as the query string or the current user).
+    """
+    latest = max((ts for _, ts in stamps if ts is not None), default=None)
+    raw = repr([(n, ts.isoformat() if ts else None) for n, ts in stamps] + [str(e) for e in extra])
+    return Stamp(f'"{hashlib.sha1(raw.encode()).hexdigest()}"', latest)
+
+
+def not_modified(request, stamp):
+    """
+    304 response when the client's If-None-Match / If-Modified-Since still
+    match `stamp`, otherwise None.
+    """
+    last_modified = int(stamp.last_modified.timestamp()) if stamp.last_modified else None
+    return get_conditional_response(request, etag=stamp.etag, last_modified=last_modified)
+
+
+def set_validators(response, stamp):
+    if response.status_code == 200:
+        response["ETag"] = stamp.etag
+        if stamp.last_modified:
+            response["Last-Modified"] = http_date(stamp.last_modified.timestamp())
+        # Clients may keep the body but must revalidate before reusing it
+        response["Cache-Control"] = "no-cache"
+    return response
@@ -0,0 +1,559 @@
+"""
+Email template registry.
+
+Templates are compiled once at import (split into literal chunks and field
+names) and rendered from plain dicts — no ORM objects — so a Celery worker
+can render an email from the JSON stored in the outbox without reloading
+the booking. The static shell (header, footer, styles) is rendered once and
+cached; rendering an email is just joining strings.
+
+    render("booking_finalized_user", booking_email_data(booking))
+
+`python manage.py bench_email_templates` measures the per-email cost.
+"""
+from functools import lru_cache
+from html import escape
+from string import Formatter
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+class EmailTemplate:
+    def __init__(self, name, body, prepare=None):
+        self.name = name
+        self.parts = [(literal, field) for literal, field, _, _ in Formatter().parse(body)]
+        self.fields = tuple(field for _, field in self.parts if field)
+        self.prepare = prepare
+
+    def render(self, data):
+        if self.prepare:
+            data = self.prepare(data)
+
+        missing = [field for field in self.fields if data.get(field) is None]
+        if missing:
+            raise Exception(f"Template '{self.name}' requires {', '.join(sorted(set(missing)))} in context")
+
+        chunks = []
+        for literal, field in self.parts:
+            chunks.append(literal)
+            if field:
+                chunks.append(escape(str(data[field])))
+
+        head, tail = _shell()
+        return head + "".join(chunks) + tail
+
+
+# --------------- STATIC SHELL ---------------
+SHELL = """
+    <!DOCTYPE html>
+    <html>
+      <body style="margin:0;padding:0;background-color:#f8fafc;font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',Roboto,Inter,Helvetica,Arial,sans-serif;">
+        <table width="100%" cellpadding="0" cellspacing="0">
+          <tr>
+            <td align="center" style="padding:40px 16px;">
+              <table width="100%" style="max-width:520px;background:#ffffff;border-radius:16px;padding:32px;box-shadow:0 10px 25px rgba(0,0,0,0.08);">
+                
+                <tr>
+                  <td align="center" style="padding-bottom:24px;">
+                    <img 
+                      src="https://res.cloudinary.com/dmvlubzor/image/upload/v1765793941/uyn9cdwhmfpggdf1eqyo.png"
+                      alt="The Travel Wild"
+                      style="height:48px;"
+                    />
+                  </td>
+                </tr>
+
+                <tr>
+                  <td>
+                    {content_html}
+                  </td>
+                </tr>
+
+              </table>
+
+              <div style="margin-top:20px;font-size:12px;color:#94a3b8;text-align:center;">
+                © The Travel Wild — Wild adventures worldwide<br/>
+                Support: <a href="mailto:{support_email}" style="color:#0f2a44;text-decoration:none;">{support_email}</a>
+              </div>
+            </td>
+          </tr>
+        </table>
+      </body>
+    </html>
+    """
+
+
+@lru_cache(maxsize=1)
+def _shell():
+    """
+    (head, tail) of the shared layout, rendered once per process.
+    """
+    head, tail = SHELL.replace("{support_email}", settings.SUPPORT_EMAIL).split("{content_html}")
+    return head, tail
+
+
+@receiver(setting_changed)
+def _reset_shell(*, setting, **kwargs):
+    if setting == "SUPPORT_EMAIL":
+        _shell.cache_clear()
+
+
+def wrap(content_html):
+    """
+    Any HTML fragment inside the shared layout.
+    """
+    head, tail = _shell()
+    return head + content_html + tail
+
+
+# --------------- BODIES ---------------
+VERIFICATION = """
+        <div style="text-align:center;">
+          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
+            Verify your email
+          </h2>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            Welcome to <strong>The Travel Wild</strong>.<br/>
+            Use the following code to complete your verification.
+          </p>
+
+          <div style="
+            display:inline-block;
+            background:#f1f5f9;
+            color:#0f2a44;
+            font-size:32px;
+            font-weight:700;
+            letter-spacing:6px;
+            padding:16px 28px;
+            border-radius:12px;
+            margin:24px 0;
+          ">
+            {code}
+          </div>
+
+          <p style="font-size:12px;color:#64748b;">
+            This code will expire shortly. If you didn’t request this, you can safely ignore this email.
+          </p>
+        </div>
+    """
+
+PASSWORD_RESET = """
+        <div style="text-align:center;">
+          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
+            Reset your password
+          </h2>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            We received a request to reset your password for <strong>The Travel Wild</strong>.
+          </p>
+
+          <div style="
+            display:inline-block;
+            background:#f1f5f9;
+            color:#0f2a44;
+            font-size:32px;
+            font-weight:700;
+            letter-spacing:6px;
+            padding:16px 28px;
+            border-radius:12px;
+            margin:24px 0;
+          ">
+            {code}
+          </div>
+
+          <p style="font-size:12px;color:#64748b;">
+            If you did not request this, you can safely ignore this email.
+          </p>
+        </div>
+    """
+
+BOOKING_CREATED_USER = """
+        <div style="text-align:center;">
+          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
+            Your booking request was received
+          </h2>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            Your reservation request for <strong>{title}</strong> has been successfully sent.
+          </p>
+
+          <p style="font-size:14px;color:#475569;line-height:1.6;">
+            📅 The exact schedule will be coordinated directly with the school or instructor
+            through the <strong>in-platform chat</strong>.
+          </p>
+
+          <p style="font-size:13px;color:#64748b;margin-top:20px;">
+            For your safety, all communication and payments must remain inside The Travel Wild.
+            Any attempt to bypass the platform may result in account suspension.
+          </p>
+        </div>
+    """
+
+BOOKING_CREATED_PROVIDER = """
+        <div style="text-align:center;">
+          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
+            New booking request
+          </h2>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            You have received a new booking request for <strong>{title}</strong>.
+          </p>
+
+          <p style="font-size:14px;color:#475569;line-height:1.6;">
+            Please contact the guest (<strong>{customer_email}</strong>) via the
+            <strong>platform chat</strong> to agree on the exact schedule.
+          </p>
+
+          <p style="font-size:13px;color:#b91c1c;margin-top:20px;font-weight:600;">
+            ⚠️ Important:
+          </p>
+
+          <p style="font-size:13px;color:#64748b;line-height:1.6;">
+            Any attempt to move communication or payment outside The Travel Wild
+            may be considered a breach of contract and could lead to account suspension
+            and legal action in cases of fraud.
+          </p>
+        </div>
+    """
+
+BOOKING_AUTHORIZED_USER = """
+        <div style="text-align:center;">
+          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
+            Your booking is authorized
+          </h2>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            <strong>Activity:</strong> {title}
+          </p>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            <strong>Date:</strong> {date}
+          </p>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            <strong>Amount authorized:</strong> {authorized_amount}
+          </p>
+
+          <p style="font-size:14px;color:#475569;line-height:1.6;">
+            The provider will contact you via the platform chat to coordinate the exact time.
+          </p>
+        </div>
+    """
+
+BOOKING_AUTHORIZED_PROVIDER = """
+        <div style="text-align:center;">
+          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
+            New authorized booking
+          </h2>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            <strong>Activity:</strong> {title}
+          </p>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            <strong>Date:</strong> {date}
+          </p>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            <strong>Guest:</strong> {customer_email}
+          </p>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            <strong>Estimated payout:</strong> {estimated_payout}
+          </p>
+
+          <p style="font-size:14px;color:#475569;line-height:1.6;">
+            Please contact the guest via the platform chat to coordinate the details.
+          </p>
+        </div>
+    """
+
+BOOKING_AUTHORIZED_ADMIN = """
+        <div style="text-align:center;">
+          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
+            Booking authorized
+          </h2>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            <strong>Booking ID:</strong> {booking_id}
+          </p>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            <strong>Activity:</strong> {title}
+          </p>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            <strong>Date:</strong> {date}
+          </p>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            <strong>Customer:</strong> {customer_email}
+          </p>
+
+          <hr style="margin:24px 0;"/>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            <strong>Total charged:</strong> {authorized_amount}
+          </p>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            <strong>Platform fee:</strong> {estimated_fee}
+          </p>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            <strong>Provider payout:</strong> {estimated_payout}
+          </p>
+        </div>
+    """
+
+BOOKING_FINALIZED_USER = """
+        <div style="text-align:center;">
+          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
+            Your activity has been completed
+          </h2>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            <strong>Activity:</strong> {title}
+          </p>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            <strong>Date:</strong> {date}
+          </p>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            <strong>Final amount charged:</strong> {final_amount}
+          </p>
+
+          <p style="font-size:14px;color:#475569;line-height:1.6;">
+            Thank you for using The Travel Wild. We hope to see you again soon.
+          </p>
+        </div>
+    """
+
+BOOKING_FINALIZED_PROVIDER = """
+        <div style="text-align:center;">
+          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
+            Booking completed – payout confirmed
+          </h2>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            <strong>Activity:</strong> {title}
+          </p>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            <strong>Date:</strong> {date}
+          </p>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            <strong>Final payout:</strong> {payout}
+          </p>
+
+          <p style="font-size:14px;color:#475569;line-height:1.6;">
+            The payout has been processed according to the completed percentage.
+          </p>
+        </div>
+    """
+
+BOOKING_FINALIZED_ADMIN = """
+        <div style="text-align:center;">
+          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
+            Booking finalized
+          </h2>
+
+          <p><strong>Booking ID:</strong> {booking_id}</p>
+          <p><strong>Activity:</strong> {title}</p>
+          <p><strong>Customer:</strong> {customer_email}</p>
+
+          <hr style="margin:24px 0;"/>
+
+          <p><strong>Final amount charged:</strong> {final_amount}</p>
+          <p><strong>Platform fee:</strong> {fee}</p>
+          <p><strong>Provider payout:</strong> {payout}</p>
+        </div>
+    """
+
+PREMIUM_PARTNER_ACTIVATED_ADMIN = """
+        <div style="text-align:center;">
+          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
+            Premium Partner Activated
+          </h2>
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            <strong>{partner_name}</strong> has been activated as a Premium Partner.
+          </p>
+        </div>
+    """
+
+PREMIUM_PARTNER_PENDING_ADMIN = """
+        <div style="text-align:center;">
+          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
+            Premium Partner Pending
+          </h2>
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            <strong>{partner_name}</strong> is pending Premium Partner activation.
+          </p>
+        </div>
+    """
+
+PROVIDER_DOCUMENTS_UPLOADED = """
+        <div style="text-align:center;">
+          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
+            New provider documents uploaded
+          </h2>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            A provider has uploaded new verification documents.
+          </p>
+
+          <p><strong>Provider:</strong> {name}</p>
+          <p><strong>Email:</strong> {email}</p>
+
+          <p style="margin-top:20px;font-size:14px;color:#475569;">
+            Please review the documents in the admin dashboard.
+          </p>
+        </div>
+    """
+
+INSTRUCTOR_DOCUMENTS_UPLOADED = """
+        <div style="text-align:center;">
+          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
+            New instructor documents uploaded
+          </h2>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            An instructor has uploaded new verification documents.
+          </p>
+
+          <p><strong>Instructor:</strong> {name}</p>
+          <p><strong>Email:</strong> {email}</p>
+
+          <p style="margin-top:20px;font-size:14px;color:#475569;">
+            Please review the documents in the admin dashboard.
+          </p>
+        </div>
+    """
+
+CHAT_DIGEST = """
+        <div style="text-align:center;">
+          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
+            {summary}
+          </h2>
+
+          <p style="font-size:15px;color:#475569;line-height:1.6;">
+            About your booking <strong>{title}</strong>:
+          </p>
+
+          <p style="font-size:14px;color:#0f2a44;line-height:1.6;text-align:left;white-space:pre-line;">{messages}</p>
+
+          <p style="margin-top:20px;font-size:14px;color:#475569;">
+            Log in to your dashboard to reply.
+          </p>
+        </div>
+    """
+
+
+# --------------- CONTEXT → PLAIN DATA ---------------
+def _money(amount, currency, empty=None):
+    if empty is not None and not amount:
+        return empty
+    return f"{amount} {currency}"
+
+
+def booking_email_data(booking):
+    """
+    Everything the booking templates show, as JSON-safe strings.
+    Stored in the outbox so workers render without touching the DB.
+    """
+    snapshot = booking.listing_snapshot or {}
+    listing = booking.listing
+    currency = booking.currency
+
+    return {
+        "booking_id": str(booking.id),
+        "title": snapshot.get("title") or (listing.title if listing else None) or "—",
+        "date": booking.start_date.strftime("%d %B %Y") if booking.start_date else "—",
+        "customer_email": booking.user.email if booking.user else "—",
+        # Authorized emails show "—" for amounts not known yet
+        "authorized_amount": _money(booking.total_price, currency, empty="—"),
+        "estimated_fee": _money(booking.service_fee, currency, empty="—"),
+        "estimated_payout": _money(booking.provider_payout, currency, empty="—"),
+        "final_amount": _money(booking.adjusted_total_price or booking.total_price, currency),
+        "fee": _money(booking.service_fee, currency),
+        "payout": _money(booking.provider_payout, currency),
+    }
+
+
+def profile_email_data(profile):
+    user = profile.user
+    return {"name": user.get_full_name() or user.email, "email": user.email}
+
+
+def plain_context(context):
+    """
+    Legacy contexts carrying model instances → plain template data.
+    """
+    data = dict(context)
+    booking = data.pop("booking", None)
+    if booking is not None:
+        data = {**booking_email_data(booking), **data}
+    data.pop("listing", None)
+    for key in ("provider", "instructor"):
+        profile = data.pop(key, None)
+        if profile is not None:
+            data = {**profile_email_data(profile), **data}
+    return data
+
+
+def _chat_digest(data):
+    # [{"sender": ..., "text": ...}] → one "sender: text" line per message
+    messages = data.get("messages") or []
+    count = data.get("count") or len(messages)
+    lines = [f"{m['sender']}: {m['text']}" for m in messages]
+    if count > len(messages):
+        lines.insert(0, f"… and {count - len(messages)} earlier")
+    return {
+        "title": data.get("title"),
+        "summary": "1 new message" if count == 1 else f"{count} new messages",
+        "messages": "\n".join(lines) or None,
+    }
+
+
+def _partner(data):
+    # Tasks only know the premium intent / activated target
+    name = data.get("partner_name") or data.get("activated_target") or data.get("premium_intent_id")
+    return {"partner_name": name}
+
+
+# --------------- REGISTRY ---------------
+TEMPLATES = {
+    template.name: template
+    for template in [
+        EmailTemplate("verification", VERIFICATION),
+        EmailTemplate("password_reset", PASSWORD_RESET),
+        EmailTemplate("booking_created_user", BOOKING_CREATED_USER),
+        EmailTemplate("booking_created_provider", BOOKING_CREATED_PROVIDER),
+        # Created bookings are already payment-authorized
+        EmailTemplate("booking_created_admin", BOOKING_AUTHORIZED_ADMIN),
+        EmailTemplate("booking_authorized_user", BOOKING_AUTHORIZED_USER),
+        EmailTemplate("booking_authorized_provider", BOOKING_AUTHORIZED_PROVIDER),
+        EmailTemplate("booking_authorized_admin", BOOKING_AUTHORIZED_ADMIN),
+        EmailTemplate("booking_finalized_user", BOOKING_FINALIZED_USER),
+        EmailTemplate("booking_finalized_provider", BOOKING_FINALIZED_PROVIDER),
+        EmailTemplate("booking_finalized_admin", BOOKING_FINALIZED_ADMIN),
+        EmailTemplate("premium_partner_activated_admin", PREMIUM_PARTNER_ACTIVATED_ADMIN, prepare=_partner),
+        EmailTemplate("premium_partner_pending_admin", PREMIUM_PARTNER_PENDING_ADMIN, prepare=_partner),
+        EmailTemplate("provider_documents_uploaded", PROVIDER_DOCUMENTS_UPLOADED),
+        EmailTemplate("instructor_documents_uploaded", INSTRUCTOR_DOCUMENTS_UPLOADED),
+        EmailTemplate("chat_digest", CHAT_DIGEST, prepare=_chat_digest),
+    ]
+}
+
+
+def render(name, data):
+    try:
+        template = TEMPLATES[name]
+    except KeyError:
+        raise Exception(f"Unknown template: {name}")
+    return template.render(data)
@@ -1,513 +1,39 @@
-import requests
 from django.conf import settings
 
+from .email_templates import plain_context, render, wrap
+from .ratelimit import email_bucket, throttle
+from .transport import BATCH_LIMIT, get_transport
+
 DEFAULT_FROM_NOREPLY = settings.EMAIL_FROM_NOREPLY
 DEFAULT_REPLY_TO = getattr(settings, "EMAIL_REPLY_TO", None)
 
 
-RESEND_URL = "https://api.resend.com/emails"
-
-
+# Templates live in apps/core/email_templates.py (compiled registry)
 def base_email_template(content_html: str) -> str:
-    return f"""
-    <!DOCTYPE html>
-    <html>
-      <body style="margin:0;padding:0;background-color:#f8fafc;font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',Roboto,Inter,Helvetica,Arial,sans-serif;">
-        <table width="100%" cellpadding="0" cellspacing="0">
-          <tr>
-            <td align="center" style="padding:40px 16px;">
-              <table width="100%" style="max-width:520px;background:#ffffff;border-radius:16px;padding:32px;box-shadow:0 10px 25px rgba(0,0,0,0.08);">
-                
-                <tr>
-                  <td align="center" style="padding-bottom:24px;">
-                    <img 
-                      src="https://res.cloudinary.com/dmvlubzor/image/upload/v1765793941/uyn9cdwhmfpggdf1eqyo.png"
-                      alt="The Travel Wild"
-                      style="height:48px;"
-                    />
-                  </td>
-                </tr>
-
-                <tr>
-                  <td>
-                    {content_html}
-                  </td>
-                </tr>
-
-              </table>
-
-              <div style="margin-top:20px;font-size:12px;color:#94a3b8;text-align:center;">
-                © The Travel Wild — Wild adventures worldwide<br/>
-                Support: <a href="mailto:{settings.SUPPORT_EMAIL}" style="color:#0f2a44;text-decoration:none;">{settings.SUPPORT_EMAIL}</a>
-              </div>
-            </td>
-          </tr>
-        </table>
-      </body>
-    </html>
-    """
+    return wrap(content_html)
 
 
 def verification_email_html(code: str) -> str:
-    return base_email_template(f"""
-        <div style="text-align:center;">
-          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
-            Verify your email
-          </h2>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            Welcome to <strong>The Travel Wild</strong>.<br/>
-            Use the following code to complete your verification.
-          </p>
-
-          <div style="
-            display:inline-block;
-            background:#f1f5f9;
-            color:#0f2a44;
-            font-size:32px;
-            font-weight:700;
-            letter-spacing:6px;
-            padding:16px 28px;
-            border-radius:12px;
-            margin:24px 0;
-          ">
-            {code}
-          </div>
-
-          <p style="font-size:12px;color:#64748b;">
-            This code will expire shortly. If you didn’t request this, you can safely ignore this email.
-          </p>
-        </div>
-    """)
+    return render("verification", {"code": code})
 
 
 def password_reset_email_html(code: str) -> str:
-    return base_email_template(f"""
-        <div style="text-align:center;">
-          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
-            Reset your password
-          </h2>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            We received a request to reset your password for <strong>The Travel Wild</strong>.
-          </p>
-
-          <div style="
-            display:inline-block;
-            background:#f1f5f9;
-            color:#0f2a44;
-            font-size:32px;
-            font-weight:700;
-            letter-spacing:6px;
-            padding:16px 28px;
-            border-radius:12px;
-            margin:24px 0;
-          ">
-            {code}
-          </div>
-
-          <p style="font-size:12px;color:#64748b;">
-            If you did not request this, you can safely ignore this email.
-          </p>
-        </div>
-    """)
-
-
-# Booking created user email HTML
-def booking_created_user_email_html(listing_title: str) -> str:
-    return base_email_template(f"""
-        <div style="text-align:center;">
-          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
-            Your booking request was received
-          </h2>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            Your reservation request for <strong>{listing_title}</strong> has been successfully sent.
-          </p>
-
-          <p style="font-size:14px;color:#475569;line-height:1.6;">
-            📅 The exact schedule will be coordinated directly with the school or instructor
-            through the <strong>in-platform chat</strong>.
-          </p>
-
-          <p style="font-size:13px;color:#64748b;margin-top:20px;">
-            For your safety, all communication and payments must remain inside The Travel Wild.
-            Any attempt to bypass the platform may result in account suspension.
-          </p>
-        </div>
-    """)
-
-
-# Booking created provider email HTML
-def booking_created_provider_email_html(listing_title: str, user_email: str) -> str:
-    return base_email_template(f"""
-        <div style="text-align:center;">
-          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
-            New booking request
-          </h2>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            You have received a new booking request for <strong>{listing_title}</strong>.
-          </p>
-
-          <p style="font-size:14px;color:#475569;line-height:1.6;">
-            Please contact the guest (<strong>{user_email}</strong>) via the
-            <strong>platform chat</strong> to agree on the exact schedule.
-          </p>
-
-          <p style="font-size:13px;color:#b91c1c;margin-top:20px;font-weight:600;">
-            ⚠️ Important:
-          </p>
-
-          <p style="font-size:13px;color:#64748b;line-height:1.6;">
-            Any attempt to move communication or payment outside The Travel Wild
-            may be considered a breach of contract and could lead to account suspension
-            and legal action in cases of fraud.
-          </p>
-        </div>
-    """)
-
-
-# --------------- NEW HTML BUILDERS ---------------
-def booking_authorized_user_email_html(booking) -> str:
-    snapshot = booking.listing_snapshot or {}
-
-    title = snapshot.get("title") or "—"
-    date = booking.start_date.strftime("%d %B %Y") if booking.start_date else "—"
-    amount = f"{booking.total_price} {booking.currency}" if booking.total_price else "—"
-
-    return base_email_template(f"""
-        <div style="text-align:center;">
-          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
-            Your booking is authorized
-          </h2>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            <strong>Activity:</strong> {title}
-          </p>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            <strong>Date:</strong> {date}
-          </p>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            <strong>Amount authorized:</strong> {amount}
-          </p>
-
-          <p style="font-size:14px;color:#475569;line-height:1.6;">
-            The provider will contact you via the platform chat to coordinate the exact time.
-          </p>
-        </div>
-    """)
-
-def booking_authorized_provider_email_html(booking) -> str:
-    snapshot = booking.listing_snapshot or {}
-
-    title = snapshot.get("title") or "—"
-    date = booking.start_date.strftime("%d %B %Y") if booking.start_date else "—"
-    guest_email = booking.user.email if booking.user else "—"
-    payout = f"{booking.provider_payout} {booking.currency}" if booking.provider_payout else "—"
-
-    return base_email_template(f"""
-        <div style="text-align:center;">
-          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
-            New authorized booking
-          </h2>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            <strong>Activity:</strong> {title}
-          </p>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            <strong>Date:</strong> {date}
-          </p>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            <strong>Guest:</strong> {guest_email}
-          </p>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            <strong>Estimated payout:</strong> {payout}
-          </p>
-
-          <p style="font-size:14px;color:#475569;line-height:1.6;">
-            Please contact the guest via the platform chat to coordinate the details.
-          </p>
-        </div>
-    """)
-
-def booking_authorized_admin_email_html(booking) -> str:
-    snapshot = booking.listing_snapshot or {}
-
-    title = snapshot.get("title") or "—"
-    date = booking.start_date.strftime("%d %B %Y") if booking.start_date else "—"
-    customer = booking.user.email if booking.user else "—"
-    total = f"{booking.total_price} {booking.currency}" if booking.total_price else "—"
-    fee = f"{booking.service_fee} {booking.currency}" if booking.service_fee else "—"
-    payout = f"{booking.provider_payout} {booking.currency}" if booking.provider_payout else "—"
-
-    return base_email_template(f"""
-        <div style="text-align:center;">
-          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
-            Booking authorized
-          </h2>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            <strong>Booking ID:</strong> {booking.id}
-          </p>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            <strong>Activity:</strong> {title}
-          </p>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            <strong>Date:</strong> {date}
-          </p>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            <strong>Customer:</strong> {customer}
-          </p>
-
-          <hr style="margin:24px 0;"/>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            <strong>Total charged:</strong> {total}
-          </p>
+    return render("password_reset", {"code": code})
 
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            <strong>Platform fee:</strong> {fee}
-          </p>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            <strong>Provider payout:</strong> {payout}
-          </p>
-        </div>
-    """)
-
-
-# --------------- FINALIZED BOOKING EMAILS ---------------
-def booking_finalized_user_email_html(booking) -> str:
-    snapshot = booking.listing_snapshot or {}
-
-    title = snapshot.get("title") or "—"
-    date = booking.start_date.strftime("%d %B %Y") if booking.start_date else "—"
-    amount = f"{booking.adjusted_total_price or booking.total_price} {booking.currency}"
-
-    return base_email_template(f"""
-        <div style="text-align:center;">
-          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
-            Your activity has been completed
-          </h2>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            <strong>Activity:</strong> {title}
-          </p>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            <strong>Date:</strong> {date}
-          </p>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            <strong>Final amount charged:</strong> {amount}
-          </p>
-
-          <p style="font-size:14px;color:#475569;line-height:1.6;">
-            Thank you for using The Travel Wild. We hope to see you again soon.
-          </p>
-        </div>
-    """)
-
-
-def booking_finalized_provider_email_html(booking) -> str:
-    snapshot = booking.listing_snapshot or {}
-
-    title = snapshot.get("title") or "—"
-    date = booking.start_date.strftime("%d %B %Y") if booking.start_date else "—"
-    payout = f"{booking.provider_payout} {booking.currency}"
-
-    return base_email_template(f"""
-        <div style="text-align:center;">
-          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
-            Booking completed – payout confirmed
-          </h2>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            <strong>Activity:</strong> {title}
-          </p>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            <strong>Date:</strong> {date}
-          </p>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            <strong>Final payout:</strong> {payout}
-          </p>
-
-          <p style="font-size:14px;color:#475569;line-height:1.6;">
-            The payout has been processed according to the completed percentage.
-          </p>
-        </div>
-    """)
-
-
-def booking_finalized_admin_email_html(booking) -> str:
-    snapshot = booking.listing_snapshot or {}
-
-    title = snapshot.get("title") or "—"
-    customer = booking.user.email if booking.user else "—"
-    total = f"{booking.adjusted_total_price or booking.total_price} {booking.currency}"
-    fee = f"{booking.service_fee} {booking.currency}"
-    payout = f"{booking.provider_payout} {booking.currency}"
-
-    return base_email_template(f"""
-        <div style="text-align:center;">
-          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
-            Booking finalized
-          </h2>
-
-          <p><strong>Booking ID:</strong> {booking.id}</p>
-          <p><strong>Activity:</strong> {title}</p>
-          <p><strong>Customer:</strong> {customer}</p>
-
-          <hr style="margin:24px 0;"/>
-
-          <p><strong>Final amount charged:</strong> {total}</p>
-          <p><strong>Platform fee:</strong> {fee}</p>
-          <p><strong>Provider payout:</strong> {payout}</p>
-        </div>
-    """)
-
-# Admin notification templates for premium partner
-def premium_partner_activated_admin_email_html(partner_name: str) -> str:
-    return base_email_template(f"""
-        <div style="text-align:center;">
-          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
-            Premium Partner Activated
-          </h2>
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            <strong>{partner_name}</strong> has been activated as a Premium Partner.
-          </p>
-        </div>
-    """)
-
-def premium_partner_pending_admin_email_html(partner_name: str) -> str:
-    return base_email_template(f"""
-        <div style="text-align:center;">
-          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
-            Premium Partner Pending
-          </h2>
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            <strong>{partner_name}</strong> is pending Premium Partner activation.
-          </p>
-        </div>
-    """)
-
-# --------------- PROVIDER/INSTRUCTOR DOCUMENTS UPLOADED EMAILS ---------------
-def provider_documents_uploaded_email_html(provider) -> str:
-    return base_email_template(f"""
-        <div style="text-align:center;">
-          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
-            New provider documents uploaded
-          </h2>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            A provider has uploaded new verification documents.
-          </p>
-
-          <p><strong>Provider:</strong> {provider.user.get_full_name() or provider.user.email}</p>
-          <p><strong>Email:</strong> {provider.user.email}</p>
-
-          <p style="margin-top:20px;font-size:14px;color:#475569;">
-            Please review the documents in the admin dashboard.
-          </p>
-        </div>
-    """)
-
-
-def instructor_documents_uploaded_email_html(instructor) -> str:
-    return base_email_template(f"""
-        <div style="text-align:center;">
-          <h2 style="margin-top:0;font-size:24px;font-weight:700;color:#0f2a44;">
-            New instructor documents uploaded
-          </h2>
-
-          <p style="font-size:15px;color:#475569;line-height:1.6;">
-            An instructor has uploaded new verification documents.
-          </p>
-
-          <p><strong>Instructor:</strong> {instructor.user.get_full_name() or instructor.user.email}</p>
-          <p><strong>Email:</strong> {instructor.user.email}</p>
-
-          <p style="margin-top:20px;font-size:14px;color:#475569;">
-            Please review the documents in the admin dashboard.
-          </p>
-        </div>
-    """)
 
 # --------------- TEMPLATE RENDERING ---------------
 def _render_template(template: str, context: dict) -> str:
     """
-    Maps template name to HTML builder and renders with context.
+    Renders a registered template. `context` is plain data (see
+    email_templates.booking_email_data); model instances under "booking",
+    "provider" or "instructor" are still accepted and converted.
     """
     if not isinstance(context, dict):
         raise Exception("context must be a dict")
-    if template == "booking_authorized_user":
-        booking = context.get("booking")
-        if not booking:
-            raise Exception("Template 'booking_authorized_user' requires 'booking' in context")
-        return booking_authorized_user_email_html(booking)
-    elif template == "booking_authorized_provider":
-        booking = context.get("booking")
-        if not booking:
-            raise Exception("Template 'booking_authorized_provider' requires 'booking' in context")
-        return booking_authorized_provider_email_html(booking)
-    elif template == "booking_authorized_admin":
-        booking = context.get("booking")
-        if not booking:
-            raise Exception("Template 'booking_authorized_admin' requires 'booking' in context")
-        return booking_authorized_admin_email_html(booking)
-    elif template == "booking_finalized_user":
-        booking = context.get("booking")
-        if not booking:
-            raise Exception("Template 'booking_finalized_user' requires 'booking' in context")
-        return booking_finalized_user_email_html(booking)
-
-    elif template == "booking_finalized_provider":
-        booking = context.get("booking")
-        if not booking:
-            raise Exception("Template 'booking_finalized_provider' requires 'booking' in context")
-        return booking_finalized_provider_email_html(booking)
-
-    elif template == "booking_finalized_admin":
-        booking = context.get("booking")
-        if not booking:
-            raise Exception("Template 'booking_finalized_admin' requires 'booking' in context")
-        return booking_finalized_admin_email_html(booking)
-    elif template == "premium_partner_activated_admin":
-        partner_name = context.get("partner_name")
-        if not partner_name:
-            raise Exception("Template 'premium_partner_activated_admin' requires 'partner_name' in context")
-        return premium_partner_activated_admin_email_html(partner_name)
-    elif template == "premium_partner_pending_admin":
-        partner_name = context.get("partner_name")
-        if not partner_name:
-            raise Exception("Template 'premium_partner_pending_admin' requires 'partner_name' in context")
-        return premium_partner_pending_admin_email_html(partner_name)
-    elif template == "provider_documents_uploaded":
-        provider = context.get("provider")
-        if not provider:
-            raise Exception("Template 'provider_documents_uploaded' requires 'provider' in context")
-        return provider_documents_uploaded_email_html(provider)
-    elif template == "instructor_documents_uploaded":
-        instructor = context.get("instructor")
-        if not instructor:
-            raise Exception("Template 'instructor_documents_uploaded' requires 'instructor' in context")
-        return instructor_documents_uploaded_email_html(instructor)
-    else:
-        raise Exception(f"Unknown template: {template}")
+    return render(template, plain_context(context))
 
 
-def send_email(
+def build_payload(
     *,
     to: list[str] | str,
     subject: str,
@@ -517,9 +43,9 @@ def send_email(
     from_email: str | None = None,
     reply_to: str | None = None,
     attachments: list | None = None,
-):
+) -> dict:
     """
-    Centralized Resend email sender.
+    Renders an email into the Resend JSON payload (no I/O).
     Supports both direct HTML and template+context usage.
     """
     # Validation for html/template usage
@@ -543,11 +69,6 @@ def send_email(
     else:
         raise Exception("'to' must be a string or list of strings")
 
-    headers = {
-        "Authorization": f"Bearer {settings.RESEND_API_KEY}",
-        "Content-Type": "application/json",
-    }
-
     payload = {
         "from": from_email or DEFAULT_FROM_NOREPLY,
         "to": to_list,
@@ -571,16 +92,51 @@ def send_email(
                 "content": encoded,
             })
 
-    response = requests.post(
-        RESEND_URL,
-        headers=headers,
-        json=payload,
-        timeout=10,
-    )
+    return payload
+
+
+def _rate_limit(timeout):
+    if timeout is None:
+        timeout = settings.EMAIL_RATE_LIMIT["SYNC_TIMEOUT"]
+    throttle(email_bucket(), timeout)
+
 
-    if response.status_code >= 400:
-        raise Exception(
-            f"Resend error {response.status_code}: {response.text}"
-        )
+def send_email(*, rate_limit_timeout: float | None = None, **kwargs):
+    """
+    Centralized Resend email sender (see build_payload for arguments).
+
+    Every send takes a token from the shared email bucket, waiting at most
+    `rate_limit_timeout` seconds (default EMAIL_RATE_LIMIT["SYNC_TIMEOUT"])
+    before raising RateLimited. Celery tasks pass 0 and reschedule instead.
+    """
+    payload = build_payload(**kwargs)
+    _rate_limit(rate_limit_timeout)
+    return get_transport().send(payload)
 
-    return response.json()
\ No newline at end of file
+
+def send_batch(payloads: list[dict], *, rate_limit_timeout: float | None = None):
+    """
+    Sends already built payloads with as few requests as possible: one
+    batch request (one rate-limit token) per BATCH_LIMIT emails. Payloads
+    with attachments, which batches don't support, go out one by one.
+    Returns the provider ids, in order.
+    """
+    transport = get_transport()
+    single = [p for p in payloads if p.get("attachments")]
+    batched = [p for p in payloads if not p.get("attachments")]
+
+    results = {}
+    for start in range(0, len(batched), BATCH_LIMIT):
+        chunk = batched[start:start + BATCH_LIMIT]
+        _rate_limit(rate_limit_timeout)
+        if len(chunk) == 1:
+            ids = [transport.send(chunk[0]).get("id")]
+        else:
+            ids = [item.get("id") for item in transport.send_batch(chunk)]
+        results.update(zip(map(id, chunk), ids))
+
+    for payload in single:
+        _rate_limit(rate_limit_timeout)
+        results[id(payload)] = transport.send(payload).get("id")
+
+    return [results[id(p)] for p in payloads]
@@ -0,0 +1,94 @@
+"""
+Local stand-in for the Resend HTTP API (tests and offline dev).
+
+Accepts POST /emails and POST /emails/batch like Resend, records every
+request and never delivers anything. Point the transport at it with
+RESEND_API_URL=http://127.0.0.1:<port> (or override EMAIL_TRANSPORT).
+
+    with FakeResendServer() as server:
+        with override_settings(EMAIL_TRANSPORT={..., "OPTIONS": {"base_url": server.url}}):
+            ...
+        server.requests      # [(path, body), ...]
+        server.connections   # distinct client sockets seen (keep-alive check)
+"""
+import json
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+
+    def do_POST(self):
+        server = self.server.owner
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"null")
+
+        with server.lock:
+            server.requests.append((self.path, body))
+            server.connections.add(self.client_address)
+            status = server.fail_with.pop(0) if server.fail_with else 200
+
+        if status >= 400:
+            self._reply(status, {"name": "fake_error", "message": "Failure requested by the test"})
+        elif self.path == "/emails":
+            self._reply(200, {"id": str(uuid.uuid4())})
+        elif self.path == "/emails/batch":
+            self._reply(200, {"data": [{"id": str(uuid.uuid4())} for _ in body]})
+        else:
+            self._reply(404, {"name": "not_found", "message": self.path})
+
+    def _reply(self, status, data):
+        raw = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeResendServer:
+    def __init__(self, host="127.0.0.1", port=0):
+        self.requests = []
+        self.connections = set()
+        self.fail_with = []  # Status codes for the next requests, e.g. [500]
+        self.lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.owner = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def emails(self):
+        """
+        Every email received, batch or not.
+        """
+        sent = []
+        for path, body in self.requests:
+            sent.extend(body if path == "/emails/batch" else [body])
+        return sent
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
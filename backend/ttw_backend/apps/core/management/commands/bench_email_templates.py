@@ -0,0 +1,42 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from apps.core.email_templates import TEMPLATES, render
+
+SAMPLE = {
+    "code": "123456",
+    "booking_id": "8d6f3c1e-8a3b-4a57-9a53-0c1f2b7e5d11",
+    "title": "Kitesurf camp in Tarifa",
+    "date": "05 January 2027",
+    "customer_email": "traveler@example.com",
+    "authorized_amount": "450.00 EUR",
+    "estimated_fee": "112.50 EUR",
+    "estimated_payout": "337.50 EUR",
+    "final_amount": "450.00 EUR",
+    "fee": "112.50 EUR",
+    "payout": "337.50 EUR",
+    "partner_name": "Tarifa Kite School",
+    "name": "Tarifa Kite School",
+    "email": "school@example.com",
+}
+
+
+class Command(BaseCommand):
+    help = "Microbenchmark: per-email render cost of every registered template"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--number", type=int, default=20000)
+
+    def handle(self, *args, **options):
+        number = options["number"]
+        self.stdout.write(f"⏱️  {number} renders per template\n")
+
+        total = 0.0
+        for name in TEMPLATES:
+            seconds = min(timeit.repeat(lambda: render(name, SAMPLE), number=number, repeat=3))
+            per_email = seconds / number * 1e6
+            total += per_email
+            self.stdout.write(f"{name:<34} {per_email:7.2f} µs/email")
+
+        self.stdout.write(self.style.SUCCESS(f"\n✅ mean {total / len(TEMPLATES):.2f} µs/email"))
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.core.fake_resend import FakeResendServer
+
+
+class Command(BaseCommand):
+    help = "Run a local fake Resend API (set RESEND_API_URL to the printed URL)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--port", type=int, default=8025)
+
+    def handle(self, *args, **options):
+        with FakeResendServer(port=options["port"]) as server:
+            self.stdout.write(self.style.SUCCESS(f"📭 Fake Resend listening on {server.url}"))
+            seen = 0
+            try:
+                while True:
+                    time.sleep(1)
+                    for email in server.emails[seen:]:
+                        self.stdout.write(f"📧 {email.get('subject')} -> {', '.join(email.get('to', []))}")
+                    seen = len(server.emails)
+            except KeyboardInterrupt:
+                pass
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEmail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('to', models.JSONField(default=list)),
+                ('subject', models.CharField(max_length=255)),
+                ('template', models.CharField(max_length=100)),
+                ('context', models.JSONField(blank=True, default=dict)),
+                ('from_email', models.CharField(blank=True, max_length=255)),
+                ('reply_to', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('SENT', 'Sent'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='core_outbox_status_71db61_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import models
+
+
+class OutboxEmail(models.Model):
+    """
+    Transactional outbox for emails.
+
+    Rows are written in the same transaction as the change that triggers
+    them (e.g. a booking) and sent by Celery after commit — see
+    apps.core.outbox. Context holds JSON only (ids, not model instances).
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Pending"
+        SENDING = "SENDING", "Sending"  # Claimed by a worker (see claimed_at)
+        SENT = "SENT", "Sent"
+        FAILED = "FAILED", "Failed"
+
+    to = models.JSONField(default=list)
+    subject = models.CharField(max_length=255)
+    template = models.CharField(max_length=100)
+    context = models.JSONField(default=dict, blank=True)
+    from_email = models.CharField(max_length=255, blank=True)
+    reply_to = models.CharField(max_length=255, blank=True)
+
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"]),  # Outbox sweep
+        ]
+
+    def __str__(self):
+        return f"{self.template} → {', '.join(self.to)} ({self.status})"
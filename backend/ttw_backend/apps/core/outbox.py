@@ -0,0 +1,188 @@
+"""
+Transactional email outbox.
+
+    with transaction.atomic():
+        booking = ...
+        enqueue_email(to=..., subject=..., template="booking_created_user",
+                      context=booking_email_data(booking))
+
+The email row commits (or rolls back) together with the booking; only after
+commit is a Celery task scheduled to send it, so the request never waits on
+the mail provider. Emails queued close together go out in one batch
+request (see deliver). If the broker is down the row stays PENDING and the
+periodic `flush_email_outbox` task picks it up.
+
+Sending never holds a transaction open: rows are claimed (PENDING → SENDING)
+in one short transaction, sent, and the outcome is recorded in another. A
+worker dying mid-send leaves its rows SENDING; they become claimable again
+after CLAIM_TIMEOUT (at-least-once delivery).
+"""
+import logging
+from datetime import timedelta
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .emails import build_payload, send_batch
+from .models import OutboxEmail
+from .ratelimit import RateLimited
+from .transport import BATCH_LIMIT
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+SWEEP_DELAY = timedelta(minutes=1)  # Leave fresh rows to their own task
+SWEEP_BATCH = 100
+CLAIM_TIMEOUT = timedelta(minutes=10)  # SENDING rows older than this were abandoned
+
+
+def enqueue_email(*, to, subject, template, context=None, from_email=None, reply_to=None):
+    """
+    Queues an email in the current transaction. `context` must be JSON:
+    the plain template data (e.g. booking_email_data(booking)).
+    """
+    email = OutboxEmail.objects.create(
+        to=[to] if isinstance(to, str) else list(to),
+        subject=subject,
+        template=template,
+        context=context or {},
+        from_email=from_email or "",
+        reply_to=reply_to or "",
+    )
+    # robust: a broker outage must not fail the already committed request
+    transaction.on_commit(partial(_schedule, email.pk), robust=True)
+    return email
+
+
+def _schedule(outbox_id):
+    from .tasks import dispatch_outbox_email
+    dispatch_outbox_email.delay(outbox_id)
+
+
+def _claimable():
+    return Q(status=OutboxEmail.Status.PENDING) | Q(
+        status=OutboxEmail.Status.SENDING, claimed_at__lt=timezone.now() - CLAIM_TIMEOUT
+    )
+
+
+def _claim(outbox_id, batch_size):
+    """
+    Marks `outbox_id` (plus fresh pending emails to batch with it) SENDING
+    and returns the claimed rows; [] if it isn't claimable.
+    """
+    with transaction.atomic():
+        claimable = OutboxEmail.objects.select_for_update(skip_locked=True)
+        email = claimable.filter(_claimable(), pk=outbox_id).first()
+        if email is None:
+            return []
+
+        batch = [email]
+        if email.attempts == 0 and batch_size > 1:
+            batch += (
+                claimable.filter(status=OutboxEmail.Status.PENDING, attempts=0)
+                .exclude(pk=email.pk)
+                .order_by("created_at")[:batch_size - 1]
+            )
+
+        OutboxEmail.objects.filter(pk__in=[row.pk for row in batch]).update(
+            status=OutboxEmail.Status.SENDING, claimed_at=timezone.now()
+        )
+        return batch
+
+
+def _record_failure(email, exc):
+    email.attempts += 1
+    email.last_error = str(exc)[:2000]
+    email.status = OutboxEmail.Status.FAILED if email.attempts >= MAX_ATTEMPTS else OutboxEmail.Status.PENDING
+    email.save(update_fields=["attempts", "last_error", "status"])
+
+
+def _release(emails):
+    # Back to PENDING without counting an attempt
+    OutboxEmail.objects.filter(pk__in=[row.pk for row in emails]).update(
+        status=OutboxEmail.Status.PENDING, claimed_at=None
+    )
+
+
+def deliver(outbox_id, batch_size=BATCH_LIMIT):
+    """
+    Sends the PENDING email `outbox_id`, together with up to `batch_size - 1`
+    other fresh pending emails, in ONE batch request. Bursts (three emails
+    per booking) thus cost one round-trip; the other rows' own tasks then
+    find nothing to do.
+
+    Returns the number of emails sent (0 = already sent, given up, or being
+    sent by another worker). Failures are recorded on the rows and re-raised
+    so the caller can retry; RateLimited is re-raised without counting as an
+    attempt. Emails that failed before are retried alone, so one bad email
+    cannot keep failing everyone else's batch.
+    """
+    batch = _claim(outbox_id, batch_size)
+    if not batch:
+        return 0
+
+    # No transaction nor row lock held while rendering / calling the provider
+    emails, payloads, failures = [], [], []
+    for row in batch:
+        try:
+            payloads.append(build_payload(
+                to=row.to,
+                subject=row.subject,
+                template=row.template,
+                context=row.context,
+                from_email=row.from_email or None,
+                reply_to=row.reply_to or None,
+            ))
+            emails.append(row)
+        except Exception as exc:
+            failures.append((row, exc))
+
+    error = next((exc for row, exc in failures if row.pk == outbox_id), None)
+    if emails:
+        try:
+            send_batch(payloads, rate_limit_timeout=0)
+        except RateLimited:
+            with transaction.atomic():
+                _release(emails)
+                for row, exc in failures:
+                    _record_failure(row, exc)
+            raise  # Not a failure: the caller reschedules
+        except Exception as exc:
+            error = exc
+            failures += [(row, exc) for row in emails]
+            emails = []
+
+    with transaction.atomic():
+        if emails:
+            OutboxEmail.objects.filter(pk__in=[row.pk for row in emails]).update(
+                status=OutboxEmail.Status.SENT, sent_at=timezone.now()
+            )
+        for row, exc in failures:
+            _record_failure(row, exc)
+
+    if error is not None:
+        raise error
+    return len(emails)
+
+
+def flush_pending(limit=SWEEP_BATCH):
+    """
+    Sends PENDING emails whose task never ran (broker outage, lost task) and
+    SENDING ones abandoned by a dead worker. Returns the number sent.
+    """
+    ids = list(
+        OutboxEmail.objects
+        .filter(_claimable(), created_at__lt=timezone.now() - SWEEP_DELAY)
+        .values_list("pk", flat=True)[:limit]
+    )
+    sent = 0
+    for outbox_id in ids:
+        try:
+            sent += deliver(outbox_id)
+        except RateLimited:
+            break  # Budget spent; the next sweep continues
+        except Exception as exc:
+            logger.warning("Outbox email %s failed: %s", outbox_id, exc)
+    return sent
@@ -0,0 +1,195 @@
+"""
+Keyset (seek) pagination.
+
+The global PageNumberPagination does `OFFSET n` + `COUNT(*)`, so deep pages
+get slower the further you go. Views using KeysetPagination keep the normal
+page-number behaviour, but clients can opt in to keyset mode with `?cursor=`
+(empty for the first page). Each page is then one indexed range query
+`WHERE (key, id) < (last_key, last_id) ORDER BY key, id LIMIT size + 1`
+— no COUNT, and page N costs the same as page 1.
+
+View options:
+- `keyset_ordering`: default ordering, e.g. ("-created_at", "-id").
+- `keyset_fields`: fields a client may pick with `?ordering=` (the primary
+  key is always appended as tie-breaker).
+- `keyset_ordered_params`: query params whose filters impose an order the
+  keyset can't follow (search relevance, distance). Combined with `?cursor=`
+  they need an explicit `?ordering=` from `keyset_fields`, otherwise 400.
+
+Ordering keys may also be annotations (e.g. the time of a room's last
+message); their cursor values are parsed with the annotation's output field.
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    default_keyset_ordering = ("-created_at", "-id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            self.keyset = False
+            return super().paginate_queryset(queryset, request, view)
+
+        self.keyset = True
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = remove_query_param(request.build_absolute_uri(), self.page_query_param)
+        self.ordering = self.get_keyset_ordering(request, view)
+        self.check_ordered_params(request, view)
+
+        position, reverse = self.decode_cursor(request, queryset)
+
+        ordering = _reverse(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(_seek_q(ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        page = results[:self.page_size]
+        has_more = len(results) > len(page)
+
+        if reverse:
+            page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.keyset_page = page
+        return page
+
+    def get_keyset_ordering(self, request, view):
+        requested = _requested_ordering(request, view)
+        if requested is None:
+            return tuple(getattr(view, "keyset_ordering", self.default_keyset_ordering))
+
+        desc = "-" if requested.startswith("-") else ""
+        return (requested, f"{desc}id")
+
+    def check_ordered_params(self, request, view):
+        """
+        Keyset pages follow `self.ordering`, not the relevance / distance order
+        some filters apply: refuse the mix instead of silently reordering.
+        """
+        if _requested_ordering(request, view) is not None:
+            return
+        used = [p for p in getattr(view, "keyset_ordered_params", ()) if request.query_params.get(p)]
+        if used:
+            raise ValidationError({
+                self.cursor_query_param: (
+                    f"Cannot be combined with {', '.join(used)} unless ?ordering= is one of: "
+                    f"{', '.join(getattr(view, 'keyset_fields', ()))}."
+                )
+            })
+
+    # --- Cursors -------------------------------------------------------------
+
+    def encode_cursor(self, instance, reverse):
+        values = [_position_value(getattr(instance, name.lstrip("-"))) for name in self.ordering]
+        payload = {"o": list(self.ordering), "p": values}
+        if reverse:
+            payload["r"] = 1
+
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        encoded = urlsafe_b64encode(raw).decode().rstrip("=")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request, queryset):
+        """
+        Returns (position, reverse). An empty cursor means "first page".
+        """
+        encoded = request.query_params.get(self.cursor_query_param, "")
+        if not encoded:
+            return None, False
+
+        try:
+            raw = urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+            payload = json.loads(raw)
+            if payload["o"] != list(self.ordering) or len(payload["p"]) != len(self.ordering):
+                raise ValueError("Cursor does not match the current ordering")
+
+            position = [
+                _key_field(queryset, name.lstrip("-")).to_python(value)
+                for name, value in zip(self.ordering, payload["p"])
+            ]
+        except (TypeError, ValueError, KeyError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, bool(payload.get("r"))
+
+    # --- Links / response ----------------------------------------------------
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next or not self.keyset_page:
+            return None
+        return self.encode_cursor(self.keyset_page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if not self.has_previous or not self.keyset_page:
+            return None
+        return self.encode_cursor(self.keyset_page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+
+def _requested_ordering(request, view):
+    """
+    The client's `?ordering=` when it is a keyset field, otherwise None.
+    """
+    requested = request.query_params.get("ordering", "").split(",")[0].strip()
+    if requested.lstrip("-") in getattr(view, "keyset_fields", ()):
+        return requested
+    return None
+
+
+def _reverse(ordering):
+    return tuple(name[1:] if name.startswith("-") else f"-{name}" for name in ordering)
+
+
+def _key_field(queryset, name):
+    annotation = queryset.query.annotations.get(name)
+    if annotation is not None:
+        return annotation.output_field
+    return queryset.model._meta.get_field(name)
+
+
+def _position_value(value):
+    # Datetimes / Decimals / UUIDs → str; parsed back with the model field's to_python()
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else str(value)
+
+
+def _seek_q(ordering, position):
+    """
+    Rows strictly after `position` in `ordering`:
+    (a > x) OR (a = x AND b > y) ..., with < for descending fields.
+    """
+    q = Q()
+    for i, name in enumerate(ordering):
+        field = name.lstrip("-")
+        lookup = "lt" if name.startswith("-") else "gt"
+        clause = Q(**{f"{field}__{lookup}": position[i]})
+        for prev_name, prev_value in zip(ordering[:i], position[:i]):
+            clause &= Q(**{prev_name.lstrip("-"): prev_value})
+        q |= clause
+    return q
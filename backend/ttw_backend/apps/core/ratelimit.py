@@ -0,0 +1,146 @@
+"""
+Shared token-bucket rate limiter.
+
+Buckets live in Redis (CACHE_URL / REDIS_URL) and are updated by a single
+Lua script, so every web process and Celery worker draws from the same
+budget. Without Redis (dev) — or while it is unreachable — each process uses
+an in-memory bucket instead; after a failure Redis is skipped for
+BREAKER_COOLDOWN seconds (the breaker of apps.core.cache, same server) so an
+outage doesn't cost the socket timeout on every email.
+
+    wait = email_bucket().take()   # 0 → go ahead, else seconds until a token
+
+Callers that must not block (Celery tasks) turn a non-zero wait into a
+reschedule; see `throttle()` and apps.core.tasks.EmailTask.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .cache import breaker_open, trip_breaker
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] = bucket, ARGV = rate (tokens/s), burst, cost. Returns the wait in seconds.
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = (cost - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+return tostring(wait)
+"""
+
+
+class RateLimited(Exception):
+    """
+    Over budget; `retry_after` is the number of seconds until a token is due.
+    """
+
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__(f"Rate limited, retry in {retry_after:.2f}s")
+
+
+class TokenBucket:
+    def __init__(self, name, rate, burst):
+        self.key = f"ttw:bucket:{name}"
+        self.rate = float(rate)
+        self.burst = float(burst)
+
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._ts = time.monotonic()
+
+    def take(self, tokens=1):
+        """
+        Takes `tokens` if available and returns 0, otherwise takes nothing
+        and returns the seconds to wait before trying again.
+        """
+        client = None if breaker_open() else _redis()
+        if client is not None:
+            try:
+                return float(client.eval(_TAKE_SCRIPT, 1, self.key, self.rate, self.burst, tokens))
+            except Exception as exc:  # Redis down / timeout
+                trip_breaker(exc, fallback="local rate-limit buckets")
+        return self._take_local(tokens)
+
+    def _take_local(self, tokens):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._ts) * self.rate)
+            self._ts = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+
+_client = None
+
+
+def _redis():
+    global _client
+    url = getattr(settings, "CACHE_URL", None)
+    if not url:
+        return None
+    if _client is None:
+        import redis
+
+        _client = redis.Redis.from_url(url, socket_connect_timeout=1, socket_timeout=1)
+    return _client
+
+
+_buckets = {}
+
+
+def email_bucket():
+    """
+    Bucket shared by every outbound email (provider quota).
+    """
+    if "email" not in _buckets:
+        config = settings.EMAIL_RATE_LIMIT
+        _buckets["email"] = TokenBucket("email", config["RATE"], config["BURST"])
+    return _buckets["email"]
+
+
+def throttle(bucket, timeout):
+    """
+    Waits up to `timeout` seconds for a token, then raises RateLimited.
+    `timeout=0` never sleeps: the caller reschedules itself instead.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        wait = bucket.take()
+        if not wait:
+            return
+        if time.monotonic() + wait > deadline:
+            raise RateLimited(wait)
+        time.sleep(wait)
+
+
+@receiver(setting_changed)
+def _reset_buckets(*, setting, **kwargs):
+    global _client
+    if setting in ("EMAIL_RATE_LIMIT", "CACHE_URL"):
+        _buckets.clear()
+        _client = None
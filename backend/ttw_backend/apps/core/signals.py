@@ -0,0 +1,54 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from apps.destinations.models import Destination
+from apps.instructors.models import InstructorProfile
+from apps.listings.models import Listing, Sport
+from apps.locations.models import City, Country
+from apps.providers.models import MerchantProfile, ProviderProfile
+from apps.users.models import User
+
+from .cache import bump_model_version
+
+# Models behind the cached public endpoints (see apps.core.cache)
+# (and embedded in them: names, hosts, merchants)
+CACHED_MODELS = (
+    Listing, Sport, Destination, ProviderProfile, InstructorProfile,
+    MerchantProfile, User, City, Country,
+)
+
+
+def bump_on_commit(model):
+    # After commit: bumped earlier, a concurrent GET could cache the
+    # pre-commit rows under the new version for the whole TTL
+    transaction.on_commit(partial(bump_model_version, model))
+
+
+def invalidate_response_cache(sender, update_fields=None, **kwargs):
+    # Logins save last_login only, which no cached response shows
+    if update_fields is not None and set(update_fields) == {"last_login"}:
+        return
+    bump_on_commit(sender)
+
+
+def invalidate_profile_sports(sender, action, **kwargs):
+    # `sports` is exposed by the public profile serializers
+    if action in ("post_add", "post_remove", "post_clear"):
+        for model in (ProviderProfile, InstructorProfile):
+            if sender is model.sports.through:
+                bump_on_commit(model)
+
+
+for model in CACHED_MODELS:
+    label = model._meta.label_lower
+    post_save.connect(invalidate_response_cache, sender=model, dispatch_uid=f"cache-{label}-save")
+    post_delete.connect(invalidate_response_cache, sender=model, dispatch_uid=f"cache-{label}-delete")
+
+for model in (ProviderProfile, InstructorProfile):
+    m2m_changed.connect(
+        invalidate_profile_sports,
+        sender=model.sports.through,
+        dispatch_uid=f"cache-{model._meta.label_lower}-sports",
+    )
@@ -1,16 +1,60 @@
-from celery import shared_task
+from celery import Task, shared_task
 from apps.core.emails import send_email
+from apps.core.email_templates import booking_email_data
+from apps.core.outbox import MAX_ATTEMPTS, deliver, flush_pending
+from apps.core.ratelimit import RateLimited
 from apps.bookings.models import Booking
-import time
+import random
 from django.conf import settings
 from apps.providers.models import ProviderProfile
 from apps.instructors.models import InstructorProfile
 from django.utils import timezone
 
 
+class EmailTask(Task):
+    """
+    Base for tasks that send email. Over the shared send budget send_email
+    raises RateLimited; the task is then queued again for when a token is
+    due instead of sleeping in the worker. Not counted as a retry.
+    """
+    dont_autoretry_for = (RateLimited,)
+
+    def __call__(self, *args, **kwargs):
+        try:
+            return super().__call__(*args, **kwargs)
+        except RateLimited as exc:
+            self.reschedule(exc, args=args, kwargs=kwargs)
+
+    def reschedule(self, exc, args=(), kwargs=None):
+        # Jitter so rescheduled tasks don't all wake on the same tick
+        countdown = exc.retry_after + random.uniform(0, 1)
+        self.apply_async(args=args, kwargs=kwargs or {}, countdown=countdown)
+
+
+@shared_task(bind=True, base=EmailTask, max_retries=MAX_ATTEMPTS - 1)
+def dispatch_outbox_email(self, outbox_id):
+    """
+    Sends one outbox email (scheduled on commit by enqueue_email).
+    """
+    try:
+        deliver(outbox_id)
+    except RateLimited:
+        raise
+    except Exception as exc:
+        raise self.retry(exc=exc, countdown=30 * 2 ** self.request.retries)
+
+
+@shared_task
+def flush_email_outbox():
+    """
+    Periodic safety net for outbox emails whose task was never run.
+    """
+    return flush_pending()
+
 
 @shared_task(
     bind=True,
+    base=EmailTask,
     autoretry_for=(Exception,),
     retry_backoff=10,
     retry_kwargs={"max_retries": 3},
@@ -26,42 +70,40 @@ def send_booking_email_task(
 ):
     """
     Background task to send booking-related emails safely.
-    Resolves booking from booking_id and injects it into template context.
+    `context` is the plain template data (email_templates.booking_email_data).
     """
 
-    booking_id = context.get("booking_id")
-    if not booking_id:
-        raise Exception("send_booking_email_task requires booking_id in context")
-
-    try:
-        booking = Booking.objects.get(id=booking_id)
-    except Booking.DoesNotExist:
-        raise Exception(f"Booking {booking_id} not found for email task")
-
-    # Inject booking object for templates
-    context = {"booking": booking}
-
     # Normalize recipients (Resend allows max 2, so send one by one)
     if isinstance(to, str):
         recipients = [to]
     else:
         recipients = list(to)
 
-    for recipient in recipients:
-        send_email(
-            to=recipient,
-            subject=subject,
-            template=template,
-            context=context,
-            from_email=from_email,
-        )
-
-        # Respect Resend rate limits
-        time.sleep(0.6)
+    for i, recipient in enumerate(recipients):
+        try:
+            send_email(
+                to=recipient,
+                subject=subject,
+                template=template,
+                context=context,
+                from_email=from_email,
+                rate_limit_timeout=0,
+            )
+        except RateLimited as exc:
+            # Resend rate limit: come back later for the recipients left
+            self.reschedule(exc, kwargs={
+                "to": recipients[i:],
+                "subject": subject,
+                "template": template,
+                "context": context,
+                "from_email": from_email,
+            })
+            return
 
 
 @shared_task(
     bind=True,
+    base=EmailTask,
     autoretry_for=(Exception,),
     retry_backoff=30,
     retry_kwargs={"max_retries": 5},
@@ -79,8 +121,9 @@ def send_booking_authorized_user_email(self, booking_id: str):
         to=booking.user.email,
         subject="Your booking is authorized – The Travel Wild",
         template="booking_authorized_user",
-        context={"booking": booking},
+        context=booking_email_data(booking),
         from_email=settings.BOOKINGS_EMAIL,
+        rate_limit_timeout=0,
     )
 
     booking.authorized_user_email_sent_at = timezone.now()
@@ -89,6 +132,7 @@ def send_booking_authorized_user_email(self, booking_id: str):
 
 @shared_task(
     bind=True,
+    base=EmailTask,
     autoretry_for=(Exception,),
     retry_backoff=30,
     retry_kwargs={"max_retries": 5},
@@ -110,8 +154,9 @@ def send_booking_authorized_provider_email(self, booking_id: str):
         to=provider_email,
         subject="New booking authorized – The Travel Wild",
         template="booking_authorized_provider",
-        context={"booking": booking},
+        context=booking_email_data(booking),
         from_email=settings.BOOKINGS_EMAIL,
+        rate_limit_timeout=0,
     )
 
     booking.authorized_provider_email_sent_at = timezone.now()
@@ -120,6 +165,7 @@ def send_booking_authorized_provider_email(self, booking_id: str):
 
 @shared_task(
     bind=True,
+    base=EmailTask,
     autoretry_for=(Exception,),
     retry_backoff=30,
     retry_kwargs={"max_retries": 5},
@@ -138,8 +184,9 @@ def send_booking_authorized_admin_email(self, booking_id: str):
         to=support_email,
         subject="New booking authorized – Internal notification",
         template="booking_authorized_admin",
-        context={"booking": booking},
+        context=booking_email_data(booking),
         from_email=settings.BOOKINGS_EMAIL,
+        rate_limit_timeout=0,
     )
 
     booking.authorized_admin_email_sent_at = timezone.now()
@@ -148,6 +195,7 @@ def send_booking_authorized_admin_email(self, booking_id: str):
 
 @shared_task(
     bind=True,
+    base=EmailTask,
     autoretry_for=(Exception,),
     retry_backoff=30,
     retry_kwargs={"max_retries": 5},
@@ -162,11 +210,13 @@ def send_premium_partner_activated_admin_email(self, premium_intent_id: str, act
             "activated_target": activated_target,
         },
         from_email=settings.BOOKINGS_EMAIL,
+        rate_limit_timeout=0,
     )
 
 
 @shared_task(
     bind=True,
+    base=EmailTask,
     autoretry_for=(Exception,),
     retry_backoff=30,
     retry_kwargs={"max_retries": 5},
@@ -180,10 +230,12 @@ def send_premium_partner_pending_admin_email(self, premium_intent_id: str):
             "premium_intent_id": premium_intent_id,
         },
         from_email=settings.BOOKINGS_EMAIL,
+        rate_limit_timeout=0,
     )
 
 
 @shared_task(
+    base=EmailTask,
     autoretry_for=(Exception,),
     retry_backoff=10,
     retry_kwargs={"max_retries": 3},
@@ -216,9 +268,11 @@ def send_provider_documents_uploaded_email_task(*, provider_id: str):
         },
         attachments=attachments,
         from_email=settings.BOOKINGS_EMAIL,
+        rate_limit_timeout=0,
     )
 
 @shared_task(
+    base=EmailTask,
     autoretry_for=(Exception,),
     retry_backoff=5,
     retry_kwargs={"max_retries": 5},
@@ -250,4 +304,5 @@ def send_instructor_documents_uploaded_email_task(*, instructor_id: str):
         },
         attachments=attachments,
         from_email=settings.BOOKINGS_EMAIL,
+        rate_limit_timeout=0,
     )
\ No newline at end of file
@@ -0,0 +1,174 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from apps.core import cache
+from apps.core.email_templates import render
+from apps.core.emails import send_batch, send_email
+from apps.core.fake_resend import FakeResendServer
+from apps.core.ratelimit import RateLimited, TokenBucket, throttle
+from apps.core.tasks import send_booking_email_task
+
+
+@override_settings(CACHE_URL=None)
+class TokenBucketTests(SimpleTestCase):
+    def test_burst_then_wait(self):
+        bucket = TokenBucket("test", rate=2, burst=2)
+
+        self.assertEqual(bucket.take(), 0)
+        self.assertEqual(bucket.take(), 0)
+        self.assertAlmostEqual(bucket.take(), 0.5, places=1)
+
+    def test_throttle_never_sleeps_with_zero_timeout(self):
+        bucket = TokenBucket("test", rate=1, burst=1)
+        bucket.take()
+
+        with mock.patch("apps.core.ratelimit.time.sleep") as sleep:
+            with self.assertRaises(RateLimited) as ctx:
+                throttle(bucket, 0)
+
+        sleep.assert_not_called()
+        self.assertGreater(ctx.exception.retry_after, 0)
+
+    @override_settings(CACHE_URL="redis://127.0.0.1:1/0")
+    def test_falls_back_to_local_bucket_without_redis(self):
+        with mock.patch("apps.core.ratelimit._client", None), \
+                mock.patch.object(cache, "_shared_down_until", 0.0):
+            self.assertEqual(TokenBucket("test", rate=1, burst=1).take(), 0)
+
+    @override_settings(CACHE_URL="redis://cache:6379/0")
+    def test_outage_skips_redis_until_cooldown(self):
+        client = mock.Mock()
+        client.eval.side_effect = ConnectionError("redis down")
+        bucket = TokenBucket("test", rate=1, burst=2)
+
+        with mock.patch("apps.core.ratelimit._client", client), \
+                mock.patch.object(cache, "_shared_down_until", 0.0):
+            self.assertEqual(bucket.take(), 0)
+            self.assertEqual(bucket.take(), 0)
+            self.assertGreater(bucket.take(), 0)  # Local budget, no second Redis call
+            self.assertEqual(client.eval.call_count, 1)
+
+            client.eval.side_effect = None
+            client.eval.return_value = b"0"
+            with mock.patch.object(cache.time, "monotonic", return_value=cache._shared_down_until):
+                self.assertEqual(bucket.take(), 0)
+            self.assertEqual(client.eval.call_count, 2)
+
+
+class CacheBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.shared = mock.Mock()
+        self.shared.get.side_effect = ConnectionError("redis down")
+        self.shared.get_many.side_effect = ConnectionError("redis down")
+        self.local = cache.caches["local"]
+        self.local.clear()
+        patches = [
+            mock.patch.object(cache, "caches", {"default": self.shared, "local": self.local}),
+            mock.patch.object(cache, "_shared_down_until", 0.0),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_outage_skips_shared_cache_until_cooldown(self):
+        self.assertIsNone(cache._call("get", "key"))
+        self.assertEqual(cache.model_versions("listings.listing"), [0])
+        cache.bump_model_version("listings.listing")
+
+        self.assertEqual(self.shared.get.call_count, 1)
+        self.shared.get_many.assert_not_called()
+        self.shared.add.assert_not_called()
+        self.assertEqual(cache.model_versions("listings.listing"), [1])
+
+        with mock.patch.object(cache.time, "monotonic", return_value=cache._shared_down_until):
+            cache._call("get", "key")
+        self.assertEqual(self.shared.get.call_count, 2)
+
+
+class EmailTemplateTests(SimpleTestCase):
+    def test_render_escapes_values(self):
+        html = render("booking_created_user", {"title": "Surf & <b>Yoga</b>"})
+
+        self.assertIn("Surf &amp; &lt;b&gt;Yoga&lt;/b&gt;", html)
+        self.assertIn("<!DOCTYPE html>", html)
+
+    def test_missing_fields_raise(self):
+        with self.assertRaisesMessage(Exception, "requires customer_email, title"):
+            render("booking_created_provider", {})
+
+    def test_premium_templates_accept_task_context(self):
+        html = render("premium_partner_pending_admin", {"premium_intent_id": "pi_123"})
+        self.assertIn("pi_123", html)
+
+
+class EmailTaskTests(SimpleTestCase):
+    def test_rate_limited_recipients_are_rescheduled(self):
+        sent = []
+
+        def send_email(to, **kwargs):
+            if sent:
+                raise RateLimited(0.5)
+            sent.append(to)
+
+        context = {"booking_id": "1", "title": "Kite camp"}
+        with mock.patch("apps.core.tasks.send_email", side_effect=send_email), \
+                mock.patch.object(send_booking_email_task, "apply_async") as apply_async:
+            send_booking_email_task(
+                to=["a@example.com", "b@example.com", "c@example.com"],
+                subject="Hi",
+                template="booking_finalized_user",
+                context=context,
+            )
+
+        self.assertEqual(sent, ["a@example.com"])
+        kwargs = apply_async.call_args.kwargs
+        self.assertEqual(kwargs["kwargs"]["to"], ["b@example.com", "c@example.com"])
+        self.assertEqual(kwargs["kwargs"]["context"], context)
+        self.assertGreaterEqual(kwargs["countdown"], 0.5)
+
+
+@override_settings(
+    CACHE_URL=None,
+    EMAIL_RATE_LIMIT={"RATE": 1000, "BURST": 1000, "SYNC_TIMEOUT": 0},
+)
+class ResendTransportTests(SimpleTestCase):
+    def setUp(self):
+        self.server = FakeResendServer().start()
+        self.addCleanup(self.server.stop)
+
+        transport = override_settings(EMAIL_TRANSPORT={
+            "BACKEND": "apps.core.transport.ResendTransport",
+            "OPTIONS": {"base_url": self.server.url, "api_key": "test"},
+        })
+        transport.enable()
+        self.addCleanup(transport.disable)
+
+    def payload(self, n):
+        return {"from": "a@example.com", "to": [f"user{n}@example.com"], "subject": f"#{n}", "html": "<p>hi</p>"}
+
+    def test_send_reuses_connection(self):
+        for n in range(3):
+            send_email(to=f"user{n}@example.com", subject="Hi", html="<p>hi</p>")
+
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_batch_is_one_request(self):
+        ids = send_batch([self.payload(n) for n in range(3)])
+
+        self.assertEqual([path for path, _ in self.server.requests], ["/emails/batch"])
+        self.assertEqual(len(ids), 3)
+        self.assertEqual([e["subject"] for e in self.server.emails], ["#0", "#1", "#2"])
+
+    def test_attachments_are_sent_alone(self):
+        with_attachment = dict(self.payload(2), attachments=[{"filename": "a.pdf", "content": "eA=="}])
+        ids = send_batch([self.payload(0), self.payload(1), with_attachment])
+
+        self.assertEqual(sorted(path for path, _ in self.server.requests), ["/emails", "/emails/batch"])
+        self.assertEqual(len([i for i in ids if i]), 3)
+
+    def test_provider_errors_raise(self):
+        self.server.fail_with = [500]
+        with self.assertRaisesMessage(Exception, "Resend error 500"):
+            send_batch([self.payload(0), self.payload(1)])
@@ -0,0 +1,78 @@
+"""
+Email transports (how a rendered payload reaches the provider).
+
+The backend is configured like a cache backend:
+
+    EMAIL_TRANSPORT = {
+        "BACKEND": "apps.core.transport.ResendTransport",
+        "OPTIONS": {"base_url": "https://api.resend.com"},
+    }
+
+A transport implements `send(payload)` and `send_batch(payloads)`, where a
+payload is the Resend email JSON. ResendTransport keeps one pooled,
+keep-alive requests.Session per process, so consecutive sends reuse the
+TLS connection instead of opening a new one each time.
+"""
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BATCH_LIMIT = 100  # Resend: max emails per batch request
+
+
+class ResendTransport:
+    def __init__(self, base_url="https://api.resend.com", api_key=None, timeout=10, pool_size=10):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key or settings.RESEND_API_KEY}",
+            "Content-Type": "application/json",
+        })
+
+    def _post(self, path, body):
+        response = self.session.post(f"{self.base_url}{path}", json=body, timeout=self.timeout)
+        if response.status_code >= 400:
+            raise Exception(
+                f"Resend error {response.status_code}: {response.text}"
+            )
+        return response.json() if response.content else {}
+
+    def send(self, payload):
+        return self._post("/emails", payload)
+
+    def send_batch(self, payloads):
+        """
+        Sends up to BATCH_LIMIT emails in ONE request. All or nothing:
+        Resend rejects the whole batch if one email is invalid.
+        Attachments are not supported in batches.
+        """
+        if len(payloads) > BATCH_LIMIT:
+            raise ValueError(f"At most {BATCH_LIMIT} emails per batch")
+        return self._post("/emails/batch", list(payloads)).get("data", [])
+
+
+_transport = None
+
+
+def get_transport():
+    global _transport
+    if _transport is None:
+        config = settings.EMAIL_TRANSPORT
+        _transport = import_string(config["BACKEND"])(**config.get("OPTIONS", {}))
+    return _transport
+
+
+@receiver(setting_changed)
+def _reset_transport(*, setting, **kwargs):
+    global _transport
+    if setting in ("EMAIL_TRANSPORT", "RESEND_API_KEY"):
+        _transport = None
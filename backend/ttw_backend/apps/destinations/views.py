@@ -1,6 +1,8 @@
 from rest_framework import viewsets
 from rest_framework.permissions import AllowAny
 
+from apps.core.cache import cache_response
+
 from .models import Destination
 from .serializers import DestinationSerializer
 
@@ -17,3 +19,11 @@ class DestinationViewSet(viewsets.ReadOnlyModelViewSet):
 
     def get_queryset(self):
         return Destination.objects.filter(is_active=True)
+
+    @cache_response(Destination)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response(Destination)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
@@ -14,7 +14,10 @@ from .serializers import (
 )
 from rest_framework import status
 from apps.core.tasks import send_instructor_documents_uploaded_email_task
+from apps.core.cache import cache_response
 from apps.users.models import User
+from apps.listings.models import Sport
+from apps.locations.models import City, Country
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
     """
@@ -67,6 +70,10 @@ class InstructorViewSet(viewsets.ModelViewSet):
 
         return qs
 
+    @cache_response(InstructorProfile, User, City, Country, Sport)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     @action(detail=False, methods=['get', 'patch'], permission_classes=[permissions.IsAuthenticated])
     def me(self, request):
         """
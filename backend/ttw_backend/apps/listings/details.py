@@ -0,0 +1,142 @@
+"""
+Write-time derivations of `Listing.details`.
+
+Filterable keys are promoted to typed, indexed storage.
+
+`details` stays the source of truth (the React contract); on every save the
+keys below are copied into columns on Listing (scalars) and into the
+ListingSeasonMonth / ListingLanguage tables (multi-valued), so filters like
+"trips in July with Spanish guides" are index scans instead of JSON scans.
+"""
+from rest_framework import serializers
+
+
+def _int(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _count(value):
+    number = _int(value)
+    return number if number is not None and number >= 0 else None
+
+
+def _month_list(value):
+    # 0-based like the frontend (JS Date.getMonth): 0 = January
+    months = [_int(m) for m in value] if isinstance(value, (list, tuple)) else []
+    return sorted({m for m in months if m is not None and 0 <= m <= 11})
+
+
+def _language_list(value):
+    languages = value if isinstance(value, (list, tuple)) else [value] if isinstance(value, str) else []
+    # Deduplicated, original order kept (first = main language)
+    return list(dict.fromkeys(str(lang).strip()[:50] for lang in languages if str(lang).strip()))
+
+
+def validate_promoted_details(cleaned):
+    """
+    Normalizes the promoted keys of already-cleaned details in place
+    (called from ListingCreateSerializer.validate_details).
+    """
+    errors = {}
+
+    if "seasonMonths" in cleaned and cleaned["seasonMonths"] is not None:
+        raw = cleaned["seasonMonths"]
+        if not isinstance(raw, (list, tuple)) or any(_int(m) not in range(12) for m in raw):
+            errors["seasonMonths"] = "Expected a list of month numbers (0 = January ... 11 = December)."
+        else:
+            cleaned["seasonMonths"] = _month_list(raw)
+
+    if "languages" in cleaned and cleaned["languages"] is not None:
+        cleaned["languages"] = _language_list(cleaned["languages"])
+
+    for key in ("maxGroupSize", "minAge", "maxGuests"):
+        value = cleaned.get(key)
+        if value in (None, ""):
+            continue
+        number = _count(value)
+        if number is None:
+            errors[key] = "Expected a non-negative whole number."
+        else:
+            cleaned[key] = number
+
+    if errors:
+        raise serializers.ValidationError(errors)
+    return cleaned
+
+
+def promoted_columns(details):
+    """
+    Values for the promoted columns / tables of a listing. Lenient: anything
+    malformed (e.g. legacy rows) is simply left out.
+    """
+    details = details if isinstance(details, dict) else {}
+
+    # Trips size their groups with maxGuests
+    group_size = _count(details.get("maxGroupSize"))
+    if group_size is None:
+        group_size = _count(details.get("maxGuests"))
+
+    return {
+        "trip_category": str(details.get("tripCategory") or "")[:20],
+        "risk_level": str(details.get("riskLevel") or "")[:20],
+        "max_group_size": group_size,
+        "min_age": _count(details.get("minAge")),
+        "season_months": _month_list(details.get("seasonMonths")),
+        "languages": _language_list(details.get("languages")),
+    }
+
+
+def build_trip_meta(details):
+    """
+    Normalized read-only trip metadata, stored in `Listing.trip_meta` on save
+    so serializers don't walk `details` on every read. Always the same keys,
+    even when `details` is empty.
+    """
+    details = details if isinstance(details, dict) else {}
+
+    def get_nested(parent, key):
+        value = details.get(parent)
+        return value.get(key) if isinstance(value, dict) else None
+
+    return {
+        "tripCategory": details.get("tripCategory"),
+        "riskLevel": details.get("riskLevel"),
+
+        # Direct Access to these is useful for the Trip Cards
+        "tempMin": get_nested("expectedConditions", "tempMin"),
+        "tempMax": get_nested("expectedConditions", "tempMax"),
+        "altitudeMax": get_nested("expectedConditions", "altitudeMax"),
+
+        "hoursPerDay": get_nested("physicalEffort", "hoursPerDay"),
+        "backpackWeight": get_nested("physicalEffort", "backpackWeight"),
+        "consecutiveDays": get_nested("physicalEffort", "consecutiveDays"),
+
+        "mandatoryEquipment": details.get("mandatoryEquipment"),
+        "tripRouteType": details.get("tripRouteType"),
+    }
+
+
+def backfill_trip_meta(queryset, batch_size=1000):
+    """
+    Recomputes `trip_meta` for every listing in `queryset` (bulk, no save()).
+    """
+    batch, updated = [], 0
+    for listing in queryset.only("id", "details", "trip_meta").iterator(chunk_size=batch_size):
+        meta = build_trip_meta(listing.details)
+        if listing.trip_meta != meta:
+            listing.trip_meta = meta
+            batch.append(listing)
+        if len(batch) >= batch_size:
+            queryset.model.objects.bulk_update(batch, ["trip_meta"])
+            updated += len(batch)
+            batch = []
+
+    if batch:
+        queryset.model.objects.bulk_update(batch, ["trip_meta"])
+        updated += len(batch)
+    return updated
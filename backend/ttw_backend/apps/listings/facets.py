@@ -0,0 +1,182 @@
+"""
+Marketplace facet counts (type / sport / country / price bucket).
+
+Counts for ACTIVE listings are pre-aggregated in ListingFacetCount and
+adjusted incrementally on every Listing save/delete (and rebuilt when a
+country is renamed or a city moves to another one), so the unfiltered
+marketplace (or one narrowed by type / sport / country only) renders its
+filter sidebar from a single read of that table. Any other filter set is
+answered with ONE grouped query over the filtered listing queryset.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, CharField, Count, F, Value, When
+
+from .models import Listing, ListingFacetCount
+
+# (label, lower bound inclusive, upper bound exclusive)
+PRICE_BUCKETS = [
+    ("0-50", 0, 50),
+    ("50-100", 50, 100),
+    ("100-250", 100, 250),
+    ("250-500", 250, 500),
+    ("500-1000", 500, 1000),
+    ("1000+", 1000, None),
+]
+
+# Public facet name → ListingFacetCount column
+FACETS = {
+    "type": "type",
+    "sport__slug": "sport_slug",
+    "city__country__name": "country",
+    "price": "price_bucket",
+}
+
+# Query params the pre-aggregated table can answer (→ table column lookup)
+TABLE_FILTERS = {
+    "type": "type",
+    "sport__slug": "sport_slug",
+    "city__country__name__iexact": "country__iexact",
+}
+
+
+def price_bucket(price) -> str:
+    for label, low, high in PRICE_BUCKETS:
+        if price >= low and (high is None or price < high):
+            return label
+    return PRICE_BUCKETS[0][0]
+
+
+def price_bucket_expression():
+    whens = [
+        When(price__lt=high, then=Value(label))
+        for label, _, high in PRICE_BUCKETS
+        if high is not None
+    ]
+    return Case(*whens, default=Value(PRICE_BUCKETS[-1][0]), output_field=CharField())
+
+
+def _key(type_, sport_slug, country, price, status):
+    if status != "ACTIVE":
+        return None
+    return (type_, sport_slug, country or "", price_bucket(price))
+
+
+def facet_key(listing):
+    """
+    Facet combination a listing currently counts towards (None if not ACTIVE).
+    """
+    city = getattr(listing, "city", None)
+    country = city.country.name if city and city.country_id else ""
+    return _key(listing.type, listing.sport_id, country, listing.price, listing.status)
+
+
+def stored_facet_key(pk):
+    row = (
+        Listing.objects.filter(pk=pk)
+        .values("type", "sport_id", "city__country__name", "price", "status")
+        .first()
+    )
+    if row is None:
+        return None
+    return _key(row["type"], row["sport_id"], row["city__country__name"], row["price"], row["status"])
+
+
+def adjust_facet_count(key, delta):
+    if key is None or delta == 0:
+        return
+
+    type_, sport_slug, country, bucket = key
+    lookup = {"type": type_, "sport_slug": sport_slug, "country": country, "price_bucket": bucket}
+
+    updated = ListingFacetCount.objects.filter(**lookup).update(count=F("count") + delta)
+    if updated or delta < 0:
+        return
+
+    try:
+        with transaction.atomic():
+            ListingFacetCount.objects.create(count=delta, **lookup)
+    except IntegrityError:
+        # Created concurrently by another writer
+        ListingFacetCount.objects.filter(**lookup).update(count=F("count") + delta)
+
+
+def rebuild_facet_counts():
+    """
+    Recomputes the whole table from scratch (backfill, country renames,
+    drift repair after bulk `.update()` calls, which bypass the signals).
+    """
+    rows = (
+        Listing.objects.filter(status="ACTIVE")
+        .order_by()
+        .annotate(price_bucket=price_bucket_expression())
+        .values("type", "sport_id", "city__country__name", "price_bucket")
+        .annotate(n=Count("id"))
+    )
+
+    counts = defaultdict(int)
+    for row in rows:
+        key = (row["type"], row["sport_id"], row["city__country__name"] or "", row["price_bucket"])
+        counts[key] += row["n"]
+
+    with transaction.atomic():
+        ListingFacetCount.objects.all().delete()
+        ListingFacetCount.objects.bulk_create([
+            ListingFacetCount(
+                type=type_, sport_slug=sport_slug, country=country, price_bucket=bucket, count=n
+            )
+            for (type_, sport_slug, country, bucket), n in counts.items()
+        ])
+
+    return len(counts)
+
+
+def _collect(rows, columns):
+    """
+    rows: iterable of dicts with `columns` (in FACETS order) + "n".
+    """
+    facets = {name: defaultdict(int) for name in FACETS}
+    for row in rows:
+        if not row["n"]:
+            continue
+        for name, column in zip(FACETS, columns):
+            facets[name][row[column] or ""] += row["n"]
+    return {name: dict(values) for name, values in facets.items()}
+
+
+def table_filters(params, ignored=()):
+    """
+    Returns ListingFacetCount lookups for `params` when the pre-aggregated
+    table can answer them, or None if a grouped query is required.
+    """
+    lookups = {}
+    for param, value in params.items():
+        if param in ignored or value in (None, ""):
+            continue
+        if param not in TABLE_FILTERS:
+            return None
+        lookups[TABLE_FILTERS[param]] = value
+    return lookups
+
+
+def facet_counts_from_table(**lookups):
+    rows = (
+        ListingFacetCount.objects.filter(count__gt=0, **lookups)
+        .annotate(n=F("count"))
+        .values("type", "sport_slug", "country", "price_bucket", "n")
+    )
+    return _collect(rows, ["type", "sport_slug", "country", "price_bucket"])
+
+
+def facet_counts_for_queryset(queryset):
+    """
+    All facets for an arbitrary filtered listing queryset in ONE grouped query.
+    """
+    rows = (
+        queryset.order_by()
+        .annotate(price_bucket=price_bucket_expression())
+        .values("type", "sport_id", "city__country__name", "price_bucket")
+        .annotate(n=Count("id"))
+    )
+    return _collect(rows, ["type", "sport_id", "city__country__name", "price_bucket"])
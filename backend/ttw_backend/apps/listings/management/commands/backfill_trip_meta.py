@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.listings.details import backfill_trip_meta
+from apps.listings.models import Listing
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored Listing.trip_meta from details for existing listings"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        self.stdout.write("🚀 Backfilling listing trip_meta...")
+        updated = backfill_trip_meta(Listing.objects.all(), batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"✅ {updated} listings updated"))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from apps.listings.facets import rebuild_facet_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute the pre-aggregated listing facet counts (ListingFacetCount)"
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write("🚀 Rebuilding listing facet counts...")
+        combinations = rebuild_facet_counts()
+        self.stdout.write(self.style.SUCCESS(f"✅ {combinations} facet combinations stored"))
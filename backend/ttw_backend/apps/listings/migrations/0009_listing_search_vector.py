@@ -0,0 +1,75 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:35
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+POSTGRES_FORWARD = [
+    "CREATE INDEX IF NOT EXISTS listings_listing_search_vector_gin "
+    "ON listings_listing USING gin (search_vector)",
+    """
+    UPDATE listings_listing l SET search_vector =
+        setweight(to_tsvector('simple', coalesce(l.title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(
+            (SELECT s.name || ' ' || s.slug FROM listings_sport s WHERE s.slug = l.sport_id), ''
+        )), 'B') ||
+        setweight(to_tsvector('simple', coalesce(
+            (SELECT c.name || ' ' || co.name FROM locations_city c
+             JOIN locations_country co ON co.id = c.country_id
+             WHERE c.id = l.city_id), ''
+        )), 'C') ||
+        setweight(to_tsvector('simple', coalesce(l.description, '')), 'D')
+    """,
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS listings_listing_search_vector_gin",
+]
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS listings_listing_fts USING fts5("
+    "listing_id UNINDEXED, title, sport, city, description, "
+    "tokenize = 'unicode61 remove_diacritics 2')",
+    """
+    INSERT INTO listings_listing_fts (listing_id, title, sport, city, description)
+    SELECT l.id, l.title, s.name || ' ' || s.slug,
+           coalesce(c.name || ' ' || co.name, ''), l.description
+    FROM listings_listing l
+    JOIN listings_sport s ON s.slug = l.sport_id
+    LEFT JOIN locations_city c ON c.id = l.city_id
+    LEFT JOIN locations_country co ON co.id = c.country_id
+    """,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TABLE IF EXISTS listings_listing_fts",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        statements = statements_by_vendor.get(schema_editor.connection.vendor, [])
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0008_alter_listing_physical_intensity'),
+        ('locations', '0002_alter_city_slug'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listing',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        # Search index: GIN on PostgreSQL, FTS5 virtual table on SQLite.
+        migrations.RunPython(
+            _run({"postgresql": POSTGRES_FORWARD, "sqlite": SQLITE_FORWARD}),
+            _run({"postgresql": POSTGRES_BACKWARD, "sqlite": SQLITE_BACKWARD}),
+        ),
+    ]
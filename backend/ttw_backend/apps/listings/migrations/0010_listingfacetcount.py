@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:37
+
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def backfill_facet_counts(apps, schema_editor):
+    from apps.listings.facets import price_bucket
+
+    Listing = apps.get_model("listings", "Listing")
+    ListingFacetCount = apps.get_model("listings", "ListingFacetCount")
+
+    rows = Listing.objects.filter(status="ACTIVE").values_list(
+        "type", "sport_id", "city__country__name", "price"
+    )
+    counts = Counter(
+        (type_, sport, country or "", price_bucket(price))
+        for type_, sport, country, price in rows.iterator()
+    )
+    ListingFacetCount.objects.bulk_create([
+        ListingFacetCount(type=t, sport_slug=s, country=c, price_bucket=b, count=n)
+        for (t, s, c, b), n in counts.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0009_listing_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(max_length=20)),
+                ('sport_slug', models.CharField(max_length=50)),
+                ('country', models.CharField(blank=True, max_length=100)),
+                ('price_bucket', models.CharField(max_length=20)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('type', 'sport_slug', 'country', 'price_bucket'), name='unique_listing_facet_combination')],
+            },
+        ),
+        migrations.RunPython(backfill_facet_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0010_listingfacetcount'),
+        ('locations', '0003_city_geohash'),
+        ('providers', '0010_alter_providerprofile_stripe_connect_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['rating', 'id'], name='listings_li_rating_74229b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['price', 'id'], name='listings_li_price_bb620d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['created_at', 'id'], name='listings_li_created_dd6edd_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0011_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listing',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Frozen copy of apps.listings.details as of this migration, so later changes
+# to the live helpers don't change what it does.
+
+def _count(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number >= 0 else None
+
+
+def _month_list(value):
+    # 0-based like the frontend (JS Date.getMonth): 0 = January
+    months = [_count(m) for m in value] if isinstance(value, (list, tuple)) else []
+    return sorted({m for m in months if m is not None and m <= 11})
+
+
+def _language_list(value):
+    languages = value if isinstance(value, (list, tuple)) else [value] if isinstance(value, str) else []
+    return list(dict.fromkeys(str(lang).strip()[:50] for lang in languages if str(lang).strip()))
+
+
+def backfill_detail_columns(apps, schema_editor):
+    Listing = apps.get_model("listings", "Listing")
+    ListingSeasonMonth = apps.get_model("listings", "ListingSeasonMonth")
+    ListingLanguage = apps.get_model("listings", "ListingLanguage")
+
+    scalar_fields = ["trip_category", "risk_level", "max_group_size", "min_age"]
+    listings, months, languages = [], [], []
+
+    for listing in Listing.objects.only("id", "details").iterator(chunk_size=2000):
+        details = listing.details if isinstance(listing.details, dict) else {}
+        group_size = _count(details.get("maxGroupSize"))
+        listing.trip_category = str(details.get("tripCategory") or "")[:20]
+        listing.risk_level = str(details.get("riskLevel") or "")[:20]
+        listing.max_group_size = group_size if group_size is not None else _count(details.get("maxGuests"))
+        listing.min_age = _count(details.get("minAge"))
+        listings.append(listing)
+        months += [ListingSeasonMonth(listing_id=listing.id, month=m) for m in _month_list(details.get("seasonMonths"))]
+        languages += [ListingLanguage(listing_id=listing.id, language=l) for l in _language_list(details.get("languages"))]
+
+    Listing.objects.bulk_update(listings, scalar_fields, batch_size=2000)
+    ListingSeasonMonth.objects.bulk_create(months, batch_size=2000)
+    ListingLanguage.objects.bulk_create(languages, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0012_listing_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listing',
+            name='max_group_size',
+            field=models.PositiveIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='listing',
+            name='min_age',
+            field=models.PositiveIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='listing',
+            name='risk_level',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='listing',
+            name='trip_category',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=20),
+        ),
+        migrations.CreateModel(
+            name='ListingLanguage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=50)),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='languages', to='listings.listing')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['language', 'listing'], name='listings_li_languag_4f0cb6_idx')],
+                'constraints': [models.UniqueConstraint(fields=('listing', 'language'), name='unique_listing_language')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ListingSeasonMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.PositiveSmallIntegerField()),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='season_months', to='listings.listing')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['month', 'listing'], name='listings_li_month_a445f0_idx')],
+                'constraints': [models.UniqueConstraint(fields=('listing', 'month'), name='unique_listing_season_month')],
+            },
+        ),
+        migrations.RunPython(backfill_detail_columns, migrations.RunPython.noop),
+    ]
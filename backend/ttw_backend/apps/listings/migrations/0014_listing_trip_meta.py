@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:54
+
+from django.db import migrations, models
+
+
+def build_trip_meta(details):
+    # Frozen copy of apps.listings.details.build_trip_meta
+    details = details if isinstance(details, dict) else {}
+
+    def get_nested(parent, key):
+        value = details.get(parent)
+        return value.get(key) if isinstance(value, dict) else None
+
+    return {
+        "tripCategory": details.get("tripCategory"),
+        "riskLevel": details.get("riskLevel"),
+        "tempMin": get_nested("expectedConditions", "tempMin"),
+        "tempMax": get_nested("expectedConditions", "tempMax"),
+        "altitudeMax": get_nested("expectedConditions", "altitudeMax"),
+        "hoursPerDay": get_nested("physicalEffort", "hoursPerDay"),
+        "backpackWeight": get_nested("physicalEffort", "backpackWeight"),
+        "consecutiveDays": get_nested("physicalEffort", "consecutiveDays"),
+        "mandatoryEquipment": details.get("mandatoryEquipment"),
+        "tripRouteType": details.get("tripRouteType"),
+    }
+
+
+def backfill(apps, schema_editor):
+    # Only save() fills trip_meta; compute it for the existing listings
+    Listing = apps.get_model("listings", "Listing")
+
+    listings = []
+    for listing in Listing.objects.only("id", "details").iterator(chunk_size=2000):
+        listing.trip_meta = build_trip_meta(listing.details)
+        listings.append(listing)
+    Listing.objects.bulk_update(listings, ["trip_meta"], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0013_listing_detail_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listing',
+            name='trip_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
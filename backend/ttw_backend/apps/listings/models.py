@@ -1,7 +1,9 @@
 from django.db import models
+from django.contrib.postgres.search import SearchVectorField
 from django.utils.text import slugify
 from django.core.validators import MinValueValidator
 from apps.locations.models import City
+from .details import promoted_columns, build_trip_meta
 import uuid
 
 # --- 1. GLOBAL & LOGISTICS ENUMS ---
@@ -136,7 +138,7 @@ class Listing(models.Model):
     - accessType: EASY | HIKE | 4x4 | BOAT_ONLY
     - mustKnowSwimming: bool
     - badWeatherAlternative: string
-    - seasonMonths: number[]
+    - seasonMonths: number[]  (0 = January ... 11 = December)
 
     EXPERIENCE:
     - experienceAltitude: string
@@ -178,6 +180,21 @@ class Listing(models.Model):
     is_verified = models.BooleanField(default=False)
     status = models.CharField(max_length=20, default='ACTIVE')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Normalized trip metadata, derived from `details` on save
+    trip_meta = models.JSONField(default=dict, blank=True, editable=False)
+
+    # Filterable copies of `details` keys (see apps.listings.details).
+    # Multi-valued keys live in ListingSeasonMonth / ListingLanguage.
+    trip_category = models.CharField(max_length=20, blank=True, default="", editable=False, db_index=True)
+    risk_level = models.CharField(max_length=20, blank=True, default="", editable=False, db_index=True)
+    max_group_size = models.PositiveIntegerField(null=True, blank=True, editable=False, db_index=True)
+    min_age = models.PositiveIntegerField(null=True, blank=True, editable=False, db_index=True)
+
+    # Full-text search document, maintained by apps.listings.search.
+    # PostgreSQL only (GIN index created in migration 0009); SQLite uses FTS5.
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -197,7 +214,105 @@ class Listing(models.Model):
             elif merchant_profile:
                 self.merchant = merchant_profile
 
+        update_fields = kwargs.get("update_fields")
+        sync_details = update_fields is None or "details" in update_fields
+        if sync_details:
+            columns = promoted_columns(self.details)
+            for field in ("trip_category", "risk_level", "max_group_size", "min_age"):
+                setattr(self, field, columns[field])
+            self.trip_meta = build_trip_meta(self.details)
+            if update_fields is not None:
+                kwargs["update_fields"] = {
+                    *update_fields, "trip_category", "risk_level", "max_group_size", "min_age", "trip_meta",
+                }
+
+        adding = self._state.adding
         super().save(*args, **kwargs)
 
+        if sync_details:
+            self.sync_detail_rows(columns, adding=adding)
+
+    def sync_detail_rows(self, columns, adding=False):
+        """
+        Keeps ListingSeasonMonth / ListingLanguage in line with `details`.
+        Only touches the rows that changed.
+        """
+        for model, field, values in (
+            (ListingSeasonMonth, "month", columns["season_months"]),
+            (ListingLanguage, "language", columns["languages"]),
+        ):
+            wanted = set(values)
+            current = set() if adding else set(
+                model.objects.filter(listing=self).values_list(field, flat=True)
+            )
+            if current - wanted:
+                model.objects.filter(listing=self, **{f"{field}__in": current - wanted}).delete()
+            if wanted - current:
+                model.objects.bulk_create(
+                    [model(listing=self, **{field: value}) for value in wanted - current],
+                    ignore_conflicts=True,
+                )
+
+    class Meta:
+        indexes = [
+            # Keyset pagination (?cursor=) for the marketplace orderings
+            models.Index(fields=['rating', 'id']),
+            models.Index(fields=['price', 'id']),
+            models.Index(fields=['created_at', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.type})"
+
+class ListingSeasonMonth(models.Model):
+    """ details.seasonMonths, one row per (listing, month) → ?season_months__month=6 (July, 0-based) """
+    listing = models.ForeignKey(Listing, on_delete=models.CASCADE, related_name='season_months')
+    month = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["listing", "month"], name="unique_listing_season_month"),
+        ]
+        indexes = [models.Index(fields=["month", "listing"])]
+
+    def __str__(self):
+        return f"{self.listing_id}: {self.month}"
+
+
+class ListingLanguage(models.Model):
+    """ details.languages, one row per (listing, language) → ?languages__language=Spanish """
+    listing = models.ForeignKey(Listing, on_delete=models.CASCADE, related_name='languages')
+    language = models.CharField(max_length=50)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["listing", "language"], name="unique_listing_language"),
+        ]
+        indexes = [models.Index(fields=["language", "listing"])]
+
+    def __str__(self):
+        return f"{self.listing_id}: {self.language}"
+
+
+class ListingFacetCount(models.Model):
+    """
+    Pre-aggregated marketplace facet counts (ACTIVE listings only).
+    One row per (type, sport, country, price bucket) combination, kept up to
+    date incrementally by apps.listings.facets on Listing save/delete.
+    """
+    type = models.CharField(max_length=20)
+    sport_slug = models.CharField(max_length=50)
+    country = models.CharField(max_length=100, blank=True)
+    price_bucket = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["type", "sport_slug", "country", "price_bucket"],
+                name="unique_listing_facet_combination",
+            ),
+        ]
+
     def __str__(self):
-        return f"{self.title} ({self.type})"
\ No newline at end of file
+        return f"{self.type}/{self.sport_slug}/{self.country}/{self.price_bucket}: {self.count}"
@@ -0,0 +1,174 @@
+"""
+Full-text search for listings.
+
+Each listing keeps a weighted search document (title > sport > city/country >
+description) so `/api/listings/?search=` becomes an index lookup instead of an
+ILIKE scan over every active listing.
+
+- PostgreSQL: `Listing.search_vector` (tsvector) with a GIN index.
+- SQLite (local / dev): an FTS5 virtual table `listings_listing_fts`.
+- Any other backend falls back to DRF's plain SearchFilter.
+"""
+import re
+
+from django.db import connection
+from rest_framework import filters
+
+SEARCH_CONFIG = "simple"  # Multilingual catalogue → no language-specific stemming
+FTS_TABLE = "listings_listing_fts"
+
+# Relative weights (PostgreSQL letters / SQLite bm25 column weights)
+FIELD_WEIGHTS = {
+    "title": ("A", 10.0),
+    "sport": ("B", 4.0),
+    "city": ("C", 2.0),
+    "description": ("D", 1.0),
+}
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def search_document(listing) -> dict:
+    """
+    Plain-text fields that make up the search document of a listing.
+    """
+    sport = getattr(listing, "sport", None)
+    city = getattr(listing, "city", None)
+    country = getattr(city, "country", None) if city else None
+
+    return {
+        "title": listing.title or "",
+        "sport": " ".join(filter(None, [getattr(sport, "name", ""), getattr(sport, "slug", "")])),
+        "city": " ".join(filter(None, [getattr(city, "name", ""), getattr(country, "name", "")])),
+        "description": listing.description or "",
+    }
+
+
+def fts_available(conn=None) -> bool:
+    """
+    True when the SQLite FTS5 index exists on this connection.
+    Only positive answers are cached (the table appears after `migrate`).
+    """
+    conn = conn or connection
+    if conn.vendor != "sqlite":
+        return False
+    if getattr(conn, "_listing_fts_available", False):
+        return True
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [FTS_TABLE],
+        )
+        available = cursor.fetchone() is not None
+    conn._listing_fts_available = available
+    return available
+
+
+def update_search_document(listing):
+    """
+    Rebuilds the search document of a single listing.
+    Called from the Listing post_save signal.
+    """
+    doc = search_document(listing)
+
+    if connection.vendor == "postgresql":
+        from django.contrib.postgres.search import SearchVector
+        from django.db.models import TextField, Value
+        from .models import Listing
+
+        vector = None
+        for field, (weight, _) in FIELD_WEIGHTS.items():
+            part = SearchVector(
+                Value(doc[field], output_field=TextField()),
+                weight=weight,
+                config=SEARCH_CONFIG,
+            )
+            vector = part if vector is None else vector + part
+
+        Listing.objects.filter(pk=listing.pk).update(search_vector=vector)
+        return
+
+    if fts_available():
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE listing_id = %s", [listing.pk.hex])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (listing_id, title, sport, city, description) "
+                f"VALUES (%s, %s, %s, %s, %s)",
+                [listing.pk.hex, doc["title"], doc["sport"], doc["city"], doc["description"]],
+            )
+
+
+def remove_search_document(listing_pk):
+    if fts_available():
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE listing_id = %s", [listing_pk.hex])
+
+
+def reindex_listings(queryset):
+    """
+    Rebuilds the search document of every listing in `queryset`.
+    Used when a Sport / City / Country is renamed and by the initial backfill.
+    """
+    for listing in queryset.select_related("sport", "city", "city__country").iterator():
+        update_search_document(listing)
+
+
+def _terms(raw_terms):
+    """
+    Splits user input into safe word tokens (no tsquery / FTS5 operators).
+    """
+    terms = []
+    for raw in raw_terms:
+        terms.extend(_TERM_RE.findall(raw))
+    return terms[:10]
+
+
+class ListingSearchFilter(filters.SearchFilter):
+    """
+    Drop-in replacement for SearchFilter on ListingViewSet.
+    Matches every term as a prefix (`kite` → `kitesurf`) and orders by relevance
+    unless the client asked for an explicit `?ordering=`.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = _terms(self.get_search_terms(request))
+        if not terms:
+            return super().filter_queryset(request, queryset, view)
+
+        if connection.vendor == "postgresql":
+            return self._filter_postgres(queryset, terms)
+
+        if fts_available():
+            return self._filter_sqlite(queryset, terms)
+
+        return super().filter_queryset(request, queryset, view)
+
+    def _filter_postgres(self, queryset, terms):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+        from django.db.models import F
+
+        query = SearchQuery(
+            " & ".join(f"{term}:*" for term in terms),
+            search_type="raw",
+            config=SEARCH_CONFIG,
+        )
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(search_rank=SearchRank(F("search_vector"), query))
+            .order_by("-search_rank", "-rating")
+        )
+
+    def _filter_sqlite(self, queryset, terms):
+        match = " AND ".join('"%s"*' % term for term in terms)
+        weights = ", ".join(str(w) for _, w in FIELD_WEIGHTS.values())
+        table = queryset.model._meta.db_table
+
+        return queryset.extra(
+            select={"search_rank": f"-bm25({FTS_TABLE}, 0, {weights})"},
+            tables=[FTS_TABLE],
+            where=[
+                f"{FTS_TABLE} MATCH %s",
+                f"{FTS_TABLE}.listing_id = {table}.id",
+            ],
+            params=[match],
+        ).order_by("-search_rank", "-rating")
@@ -6,6 +6,7 @@ from .models import (
     TripCategory, RiskLevel 
 )
 from apps.locations.serializers import CitySerializer 
+from .details import validate_promoted_details
 
 class SportSerializer(serializers.ModelSerializer):
     listing_count = serializers.IntegerField(read_only=True)
@@ -13,7 +14,63 @@ class SportSerializer(serializers.ModelSerializer):
         model = Sport
         fields = '__all__'
 
-class ListingSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """
+    ?fields=id,title,price → only those fields are serialized (and computed).
+    Unknown names are ignored; a selection matching nothing keeps every field.
+    """
+    fields_query_param = "fields"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        request = self.context.get("request")
+        raw = request.query_params.get(self.fields_query_param) if request else None
+        if not raw:
+            return
+
+        wanted = {name.strip() for name in raw.split(",")}
+        if wanted & set(self.fields):
+            for name in set(self.fields) - wanted:
+                self.fields.pop(name)
+
+
+class ListingCardSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Slim representation for marketplace grid cards (?view=card).
+    The queryset only loads CARD_COLUMNS (see ListingViewSet.get_queryset).
+    """
+    CARD_COLUMNS = (
+        'id', 'title', 'slug', 'type', 'price', 'currency',
+        'rating', 'review_count', 'is_verified', 'images', 'created_at',
+        'sport__name', 'city__name', 'city__country__name',
+    )
+
+    sport_name = serializers.CharField(source='sport.name', read_only=True)
+    city_name = serializers.CharField(source='city.name', read_only=True, allow_null=True)
+    country_name = serializers.CharField(source='city.country.name', read_only=True, allow_null=True)
+    image = serializers.SerializerMethodField()
+    distance_km = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Listing
+        fields = [
+            'id', 'title', 'slug', 'type',
+            'price', 'currency', 'rating', 'review_count', 'is_verified',
+            'image', 'sport', 'sport_name', 'city_name', 'country_name',
+            'distance_km',
+        ]
+
+    def get_image(self, obj):
+        images = obj.images or []
+        return images[0] if images else None
+
+    def get_distance_km(self, obj):
+        distance = getattr(obj, "distance_km", None)
+        return round(distance, 2) if distance is not None else None
+
+
+class ListingSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     images = serializers.JSONField()
     city = CitySerializer(read_only=True)
     merchant = serializers.SerializerMethodField()
@@ -21,7 +78,11 @@ class ListingSerializer(serializers.ModelSerializer):
     sport_name = serializers.CharField(source='sport.name', read_only=True)
     
     # We keep trip_meta for convenience, enables the frontend to access specific trip data easily
-    trip_meta = serializers.SerializerMethodField()
+    # (precomputed from `details` on save, see apps.listings.details.build_trip_meta)
+    trip_meta = serializers.JSONField(read_only=True)
+
+    # Only present on ?near= searches (annotated by CityGeoFilter)
+    distance_km = serializers.SerializerMethodField()
 
     class Meta:
         model = Listing
@@ -34,9 +95,14 @@ class ListingSerializer(serializers.ModelSerializer):
             'host',
             'details', 'status', 
             'universal_level', 'technical_grade', 'physical_intensity',
-            'trip_meta'
+            'trip_meta',
+            'distance_km',
         ]
 
+    def get_distance_km(self, obj):
+        distance = getattr(obj, "distance_km", None)
+        return round(distance, 2) if distance is not None else None
+
     def get_merchant(self, obj):
         merchant = getattr(obj, "merchant", None)
         if merchant is None:
@@ -44,7 +110,7 @@ class ListingSerializer(serializers.ModelSerializer):
         return {
             "id": str(merchant.id),
             "name": merchant.legal_name or merchant.user.email,
-            "logo": merchant.logo.url if merchant.logo else None,
+            "logo": merchant.logo or None,  # URLField → plain string
             "type": merchant.type 
         }
 
@@ -78,40 +144,12 @@ class ListingSerializer(serializers.ModelSerializer):
                 "type": "INSTRUCTOR",
                 "name": instructor.display_name or instructor.user.email,
                 "profile_image": instructor.profile_image,
-                "verified": instructor.is_verified,
+                "verified": instructor.verification_status == "APPROVED",
                 "url": f"/instructors/{instructor.id}",
             }
 
         return None
 
-    def get_trip_meta(self, obj):
-        """
-        Normalized read-only trip metadata.
-        This ensures the Frontend always gets an object, even if DB is empty.
-        """
-        details = obj.details or {}
-
-        # Safe extraction helper
-        def get_nested(parent, key):
-            return details.get(parent, {}).get(key)
-
-        return {
-            "tripCategory": details.get("tripCategory"),
-            "riskLevel": details.get("riskLevel"),
-            
-            # Direct Access to these is useful for the Trip Cards
-            "tempMin": get_nested("expectedConditions", "tempMin"),
-            "tempMax": get_nested("expectedConditions", "tempMax"),
-            "altitudeMax": get_nested("expectedConditions", "altitudeMax"),
-            
-            "hoursPerDay": get_nested("physicalEffort", "hoursPerDay"),
-            "backpackWeight": get_nested("physicalEffort", "backpackWeight"),
-            "consecutiveDays": get_nested("physicalEffort", "consecutiveDays"),
-            
-            "mandatoryEquipment": details.get("mandatoryEquipment"),
-            "tripRouteType": details.get("tripRouteType"),
-        }
-
 class ListingCreateSerializer(serializers.ModelSerializer):
     images = serializers.ListField(child=serializers.CharField(), required=False)
 
@@ -121,7 +159,8 @@ class ListingCreateSerializer(serializers.ModelSerializer):
             'id', 'title', 'description', 'type', 'sport',
             'city',
             'price', 'currency', 'universal_level', 'technical_grade', 'physical_intensity',
-            'images', 'details', 'status'
+            'images', 'details', 'status',
+            'trip_meta',  # read-only, derived from details on save
         ]
 
     def validate_sport(self, sport):
@@ -233,7 +272,8 @@ class ListingCreateSerializer(serializers.ModelSerializer):
             for k in rent_keys:
                 if k in details: cleaned[k] = details[k]
 
-        return cleaned
+        # Keys copied to indexed columns on save must have the right types
+        return validate_promoted_details(cleaned)
 
     def create(self, validated_data):
         request = self.context.get("request")
@@ -0,0 +1,89 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from apps.locations.models import City, Country
+from .models import Listing, Sport
+from .search import update_search_document, remove_search_document, reindex_listings
+from .facets import facet_key, stored_facet_key, adjust_facet_count, rebuild_facet_counts
+
+
+@receiver(post_save, sender=Listing)
+def refresh_listing_search_document(sender, instance, raw=False, **kwargs):
+    """
+    Keeps the full-text search document in sync with the listing.
+    """
+    if raw:
+        return
+    update_search_document(instance)
+
+
+@receiver(post_delete, sender=Listing)
+def drop_listing_search_document(sender, instance, **kwargs):
+    remove_search_document(instance.pk)
+
+
+@receiver(pre_save, sender=Listing)
+def remember_listing_facet_key(sender, instance, raw=False, **kwargs):
+    """
+    Captures the facet combination the listing counted towards BEFORE the
+    save, so post_save can move it between ListingFacetCount rows.
+    """
+    if raw or instance._state.adding:
+        instance._facet_key_before = None
+        return
+    instance._facet_key_before = stored_facet_key(instance.pk)
+
+
+@receiver(post_save, sender=Listing)
+def update_listing_facet_counts(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    before = getattr(instance, "_facet_key_before", None)
+    after = facet_key(instance)
+    if before != after:
+        adjust_facet_count(before, -1)
+        adjust_facet_count(after, +1)
+
+
+@receiver(post_delete, sender=Listing)
+def decrement_listing_facet_counts(sender, instance, **kwargs):
+    adjust_facet_count(facet_key(instance), -1)
+
+
+@receiver(post_save, sender=Sport)
+def reindex_sport_listings(sender, instance, created, raw=False, **kwargs):
+    """
+    Sport names are part of the search document → reindex on rename.
+    """
+    if created or raw:
+        return
+    reindex_listings(Listing.objects.filter(sport=instance))
+
+
+@receiver(post_save, sender=City)
+def reindex_city_listings(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    reindex_listings(Listing.objects.filter(city=instance))
+
+
+@receiver(post_save, sender=Country)
+def reindex_country_listings(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    reindex_listings(Listing.objects.filter(city__country=instance))
+
+
+@receiver(post_save, sender=City)
+@receiver(post_save, sender=Country)
+def rebuild_facets_on_rename(sender, instance, created, raw=False, **kwargs):
+    """
+    Facet rows are keyed by country name (sports by their slug primary key):
+    a renamed country, or a city moved to another country, re-keys every
+    listing under it. Rare admin edits, so the whole table is rebuilt once
+    committed.
+    """
+    if created or raw:
+        return
+    transaction.on_commit(rebuild_facet_counts)
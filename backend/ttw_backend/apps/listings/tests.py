@@ -1,3 +1,292 @@
-from django.test import TestCase
+from importlib import import_module
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+from rest_framework.test import APIClient
+
+from apps.instructors.models import InstructorProfile
+from apps.listings.details import validate_promoted_details
+from apps.listings.models import Listing, Sport
+from apps.listings.search import fts_available
+from apps.listings.views import ListingViewSet
+from apps.locations.models import City, Country
+from apps.users.models import User
+
+
+class ListingTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+        country = Country.objects.create(code="ES", name="Spain")
+        self.city = City.objects.create(
+            name="Tarifa", slug="tarifa", latitude=36.01, longitude=-5.6, country=country
+        )
+        self.sport = Sport.objects.create(name="Kitesurf", slug="kitesurf")
+
+        self.provider_user = User.objects.create_user(
+            email="school@example.com", password="x", role="PROVIDER"
+        )
+        self.instructor_user = User.objects.create_user(
+            email="instructor@example.com", password="x", role="INSTRUCTOR"
+        )
+        InstructorProfile.objects.get_or_create(user=self.instructor_user)
+
+        self.add_listings(2)
+
+    def add_listings(self, count):
+        for i in range(count):
+            for owner in (self.provider_user, self.instructor_user):
+                Listing.objects.create(
+                    owner=owner,
+                    title=f"Kite lesson {i}",
+                    description="Learn to kite",
+                    type="SESSION",
+                    sport=self.sport,
+                    city=self.city,
+                    price=50 + i,
+                    universal_level="BEGINNER",
+                )
+
+    def get(self, url):
+        cache.clear()
+        response = self.client.get(url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+
+class ListingQueryCountTests(ListingTestCase):
+    """
+    Listing endpoints must cost a constant number of queries, however many
+    listings (and hosts) end up on the page.
+    """
+
+    def assertConstantQueries(self, url, num):
+        with self.assertNumQueries(num):
+            self.get(url)
+
+        self.add_listings(5)
+
+        with self.assertNumQueries(num):
+            self.get(url)
+
+    def test_hosts_are_resolved(self):
+        results = self.get("/api/listings/").json()["results"]
+        self.assertEqual({r["host"]["type"] for r in results}, {"SCHOOL", "INSTRUCTOR"})
+
+    def test_list(self):
+        # version stamp + COUNT + page
+        self.assertConstantQueries("/api/listings/", 3)
+
+    def test_list_card_view(self):
+        self.assertConstantQueries("/api/listings/?view=card", 3)
+
+    def test_featured(self):
+        self.assertConstantQueries("/api/listings/featured/", 1)
+
+    def test_retrieve(self):
+        listing = Listing.objects.filter(owner=self.instructor_user).first()
+        with self.assertNumQueries(1):
+            self.get(f"/api/listings/{listing.pk}/")
+
+    def test_my_listings(self):
+        self.client.force_authenticate(self.provider_user)
+        # merchant lookup + listings
+        self.assertConstantQueries("/api/listings/my/", 2)
+
+
+@override_settings(RESPONSE_CACHE=True)
+class ResponseCacheTests(ListingTestCase):
+    url = "/api/listings/featured/"
+
+    def test_cached_until_a_dependency_commits(self):
+        self.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url, secure=True)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.sport.name = "Kiteboarding"
+            self.sport.save()
+            # Not committed yet: readers keep the old version (and rows)
+            with self.assertNumQueries(0):
+                self.client.get(self.url, secure=True)
+
+        for callback in callbacks:
+            callback()
+        response = self.client.get(self.url, secure=True)
+        self.assertEqual({r["sport_name"] for r in response.json()} - {None}, {"Kiteboarding"})
+
+    @override_settings(RESPONSE_CACHE=False)
+    def test_disabled_without_a_shared_cache(self):
+        self.get(self.url)
+        with self.assertNumQueries(1):
+            self.client.get(self.url, secure=True)
+
+
+class ListingETagTests(ListingTestCase):
+    def etag(self):
+        # Not self.get(): clearing the cache would reset the model versions
+        response = self.client.get("/api/listings/", secure=True)
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"]
+
+    def test_embedded_rows_change_the_etag(self):
+        etag = self.etag()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.city.name = "Tarifa (Cádiz)"
+            self.city.save()
+        self.assertNotEqual(self.etag(), etag)
+        etag = self.etag()
+
+        merchant = self.provider_user.provider_profile.merchant
+        with self.captureOnCommitCallbacks(execute=True):
+            merchant.legal_name = "Tarifa Kite School"
+            merchant.save()
+        self.assertNotEqual(self.etag(), etag)
+
+    def test_unchanged_list_is_not_modified(self):
+        etag = self.etag()
+        response = self.client.get("/api/listings/", secure=True, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_filters_run_once(self):
+        with mock.patch.object(
+            ListingViewSet, "filter_queryset", autospec=True,
+            side_effect=ListingViewSet.filter_queryset,
+        ) as filter_queryset:
+            self.get(f"/api/listings/?facets=true&search=kite&sport={self.sport.pk}")
+        self.assertEqual(filter_queryset.call_count, 1)
+
+
+class ListingSearchTests(ListingTestCase):
+    def search(self, terms):
+        return [r["title"] for r in self.get(f"/api/listings/?search={terms}").json()["results"]]
+
+    def test_sqlite_uses_the_fts5_index(self):
+        self.assertTrue(fts_available())
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(len(self.search("kite")), 4)
+        self.assertTrue(any("MATCH" in q["sql"] for q in queries.captured_queries))
+
+    def test_title_matches_rank_above_description_matches(self):
+        for title, description in [("Surf camp", "Kite and wing foil"), ("Wing foil clinic", "Surf and kite")]:
+            Listing.objects.create(
+                owner=self.provider_user, title=title, description=description, type="SESSION",
+                sport=self.sport, city=self.city, price=50, universal_level="BEGINNER",
+            )
+
+        self.assertEqual(self.search("wing")[:2], ["Wing foil clinic", "Surf camp"])
+        self.assertEqual(self.search("surf"), ["Surf camp", "Wing foil clinic"])
+
+    def test_terms_match_as_prefixes(self):
+        self.assertEqual(len(self.search("kitesu")), 4)  # sport slug
+        self.assertEqual(len(self.search("tari kite")), 4)
+        self.assertEqual(self.search("kite paris"), [])
+
+    def test_renames_reindex_the_listings(self):
+        renames = [(self.sport, "Wingfoil"), (self.city, "Ericeira"), (self.city.country, "Portugal")]
+        for instance, name in renames:
+            instance.name = name
+            instance.save()
+            self.assertEqual(len(self.search(name)), 4, name)
+        self.assertEqual(self.search("spain"), [])
+
+
+class ListingFacetTests(ListingTestCase):
+    def facets(self, query=""):
+        return self.get(f"/api/listings/?facets=true{query}").json()["facets"]
+
+    def test_table_is_keyed_like_the_filters(self):
+        facets = self.facets()
+        self.assertEqual(facets["sport__slug"], {"kitesurf": 4})
+        self.assertEqual(facets["city__country__name"], {"Spain": 4})
+        # Table answer == grouped query answer (search forces the latter)
+        self.assertEqual(self.facets("&sport__slug=kitesurf"), self.facets("&search=kite"))
+
+    def test_country_rename_rebuilds_the_table(self):
+        country = self.city.country
+        with self.captureOnCommitCallbacks(execute=True):
+            country.name = "España"
+            country.save()
+
+        facets = self.facets("&city__country__name__iexact=españa")
+        self.assertEqual(facets["city__country__name"], {"España": 4})
+
+    def test_city_moved_to_another_country(self):
+        portugal = Country.objects.create(code="PT", name="Portugal")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.city.country = portugal
+            self.city.save()
+
+        self.assertEqual(self.facets()["city__country__name"], {"Portugal": 4})
+
+
+class ListingKeysetTests(ListingTestCase):
+    def test_cursor_rejects_search_relevance_order(self):
+        response = self.client.get("/api/listings/?cursor=&search=kite", secure=True)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("cursor", response.json())
+
+    def test_cursor_rejects_distance_order(self):
+        response = self.client.get("/api/listings/?cursor=&near=36.0,-5.6", secure=True)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("cursor", response.json())
+
+    def test_cursor_with_explicit_ordering_pages_in_that_order(self):
+        url = "/api/listings/?cursor=&search=kite&near=36.0,-5.6&ordering=-price&page_size=3"
+        prices = []
+        while url:
+            page = self.get(url).json()
+            prices += [float(r["price"]) for r in page["results"]]
+            url = page["next"]
+        self.assertEqual(len(prices), 4)
+        self.assertEqual(prices, sorted(prices, reverse=True))
+
+
+class SeasonMonthTests(SimpleTestCase):
+    def test_months_are_zero_based(self):
+        self.assertEqual(validate_promoted_details({"seasonMonths": [11, 0, 0]})["seasonMonths"], [0, 11])
+
+        with self.assertRaises(serializers.ValidationError):
+            validate_promoted_details({"seasonMonths": [12]})
+
+
+class SeasonMonthFilterTests(ListingTestCase):
+    def test_january_is_stored_and_filterable(self):
+        listing = Listing.objects.first()
+        listing.details = {"seasonMonths": [0, 6]}
+        listing.save()
+
+        self.assertEqual(sorted(listing.season_months.values_list("month", flat=True)), [0, 6])
+        results = self.get("/api/listings/?season_months__month=0").json()["results"]
+        self.assertEqual([r["id"] for r in results], [str(listing.pk)])
+
+    def test_migration_backfills_zero_based_months(self):
+        Listing.objects.update(details={"seasonMonths": [0, 11, 12], "languages": ["es", "en"]})
+
+        migration = import_module("apps.listings.migrations.0013_listing_detail_columns")
+        migration.backfill_detail_columns(apps, None)
+
+        listing = Listing.objects.first()
+        self.assertEqual(sorted(listing.season_months.values_list("month", flat=True)), [0, 11])
+        self.assertEqual(sorted(listing.languages.values_list("language", flat=True)), ["en", "es"])
+
+
+class TripMetaBackfillTests(ListingTestCase):
+    def test_migration_fills_existing_listings(self):
+        details = {"tripCategory": "TREKKING", "physicalEffort": {"hoursPerDay": 6}}
+        Listing.objects.update(details=details, trip_meta={})  # As left by the AddField
+
+        migration = import_module("apps.listings.migrations.0014_listing_trip_meta")
+        migration.backfill(apps, None)
+
+        for meta in Listing.objects.values_list("trip_meta", flat=True):
+            self.assertEqual(meta["tripCategory"], "TREKKING")
+            self.assertEqual(meta["hoursPerDay"], 6)
+            self.assertIsNone(meta["riskLevel"])
@@ -6,7 +6,32 @@ from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Count
 
 from .models import Listing, Sport
-from .serializers import ListingSerializer, ListingCreateSerializer, SportSerializer
+from .serializers import ListingSerializer, ListingCardSerializer, ListingCreateSerializer, SportSerializer
+from .search import ListingSearchFilter
+from apps.locations.geo import CityGeoFilter
+from apps.core.pagination import KeysetPagination
+from apps.core.cache import cache_response, model_versions
+from apps.core.conditional import queryset_stamp, version_stamp, not_modified, set_validators
+from apps.instructors.models import InstructorProfile
+from apps.locations.models import City, Country
+from apps.providers.models import MerchantProfile, ProviderProfile
+from apps.users.models import User
+from .facets import table_filters, facet_counts_from_table, facet_counts_for_queryset
+
+# Everything ListingSerializer reads per row (city, sport, merchant and the
+# public host behind it), joined into the page query instead of N+1 lookups.
+LISTING_RELATED = (
+    'city', 'city__country', 'sport', 'owner',
+    'merchant', 'merchant__user',
+    'merchant__provider',
+    'merchant__instructor', 'merchant__instructor__user',
+)
+
+# Models whose rows are embedded in listing responses (names, hosts, merchants)
+EMBEDDED_MODELS = (
+    Sport, ProviderProfile, InstructorProfile, MerchantProfile, User, City, Country,
+)
+
 
 class SportViewSet(viewsets.ModelViewSet):
     """ 
@@ -22,6 +47,10 @@ class SportViewSet(viewsets.ModelViewSet):
             return [permissions.IsAdminUser()]
         return [permissions.AllowAny()]
 
+    @cache_response(Sport, Listing)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
 
 class ListingViewSet(viewsets.ModelViewSet):
     """ 
@@ -39,9 +68,12 @@ class ListingViewSet(viewsets.ModelViewSet):
 
         return [permissions.AllowAny()]
 
-    queryset = Listing.objects.select_related('city', 'city__country', 'sport', 'owner', 'merchant')
+    queryset = Listing.objects.select_related(*LISTING_RELATED)
     serializer_class = ListingSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # ?search= → full-text index (tsvector / FTS5), ranked by relevance
+    # ?near= / ?bbox= → geohash-indexed proximity search on City
+    filter_backends = [DjangoFilterBackend, ListingSearchFilter, CityGeoFilter, filters.OrderingFilter]
+    geo_city_field = 'city'
     
     filterset_fields = {
         'type': ['exact'],
@@ -49,18 +81,34 @@ class ListingViewSet(viewsets.ModelViewSet):
         'city__country__name': ['iexact'], 
         'city__name': ['iexact'], 
         'price': ['lte', 'gte'],
+        # Promoted `details` keys (indexed columns / tables, see listings.details)
+        'trip_category': ['exact'],
+        'risk_level': ['exact'],
+        'max_group_size': ['gte', 'lte'],
+        'min_age': ['lte'],
+        'season_months__month': ['exact'],
+        'languages__language': ['exact'],
     }
-    search_fields = ['title', 'description']
+    search_fields = ['title', 'description']  # Fallback for backends without a search index
     ordering_fields = ['price', 'rating', 'created_at']
+    # ?cursor= → keyset pagination on (<ordering>, id), no COUNT
+    pagination_class = KeysetPagination
+    keyset_fields = ['price', 'rating', 'created_at']
+    # Relevance / distance orders aren't keyset-able: cursor needs ?ordering=
+    keyset_ordered_params = ['search', 'near']
 
     def get_queryset(self):
         user = self.request.user
 
         # 🔓 CONTEXTO PÚBLICO (marketplace)
         if self.action in ['list', 'retrieve', 'featured']:
-            qs = Listing.objects.select_related(
-                'city', 'city__country', 'sport', 'owner', 'merchant'
-            ).filter(status='ACTIVE')
+            qs = Listing.objects.select_related(*LISTING_RELATED).filter(status='ACTIVE')
+
+            if self.is_card_view():
+                # Grid cards: only the columns ListingCardSerializer renders
+                qs = qs.select_related(None).select_related(
+                    'city', 'city__country', 'sport'
+                ).only(*ListingCardSerializer.CARD_COLUMNS)
 
             provider_id = self.request.query_params.get("provider")
             instructor_id = self.request.query_params.get("instructor")
@@ -89,9 +137,7 @@ class ListingViewSet(viewsets.ModelViewSet):
 
         # Admin puede ver todo
         if user.is_staff:
-            return Listing.objects.select_related(
-                'city', 'city__country', 'sport', 'owner', 'merchant'
-            )
+            return Listing.objects.select_related(*LISTING_RELATED)
 
         from apps.providers.models import MerchantProfile
 
@@ -112,13 +158,67 @@ class ListingViewSet(viewsets.ModelViewSet):
         if merchant is None:
             return Listing.objects.none()
 
-        return Listing.objects.select_related(
-            'city', 'city__country', 'sport', 'owner', 'merchant'
-        ).filter(owner=user)
+        return Listing.objects.select_related(*LISTING_RELATED).filter(owner=user)
+
+    # Params that never narrow the result set (safe to ignore for facets)
+    FACET_IGNORED_PARAMS = {'facets', 'page', 'page_size', 'ordering', 'format', 'cursor', 'view', 'fields'}
+
+    def list(self, request, *args, **kwargs):
+        """
+        ?facets=true → also returns type / sport / country / price-bucket
+        counts for the current filter set under "facets".
+
+        Supports conditional GET: an unchanged result set answers 304.
+        """
+        # Filtered once: stamp, page and facets all reuse it
+        queryset = self.filter_queryset(self.get_queryset())
+
+        stamp = version_stamp(
+            queryset_stamp(queryset),
+            # Sport / host / merchant / place names are embedded in every card
+            extra=[request.get_full_path(), *model_versions(*EMBEDDED_MODELS)],
+        )
+        cached = not_modified(request, stamp)
+        if cached is not None:
+            return cached
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            response = self.get_paginated_response(serializer.data)
+        else:
+            response = Response(self.get_serializer(queryset, many=True).data)
+        response = set_validators(response, stamp)
+
+        if request.query_params.get('facets') not in ('1', 'true', 'True'):
+            return response
+
+        facets = self.get_facets(request, queryset)
+        if isinstance(response.data, dict):
+            response.data['facets'] = facets
+        else:
+            response.data = {'results': response.data, 'facets': facets}
+        return response
+
+    def get_facets(self, request, queryset):
+        lookups = table_filters(request.query_params, ignored=self.FACET_IGNORED_PARAMS)
+        if lookups is not None:
+            # Pre-aggregated table: one read, no aggregation over listings
+            return facet_counts_from_table(**lookups)
+        return facet_counts_for_queryset(queryset)
+
+    def is_card_view(self):
+        """ ?view=card → slim grid-card representation on list pages """
+        return (
+            self.action in ['list', 'featured']
+            and self.request.query_params.get('view') == 'card'
+        )
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
             return ListingCreateSerializer
+        if self.is_card_view():
+            return ListingCardSerializer
         return ListingSerializer
 
     def perform_create(self, serializer):
@@ -167,6 +267,7 @@ class ListingViewSet(viewsets.ModelViewSet):
         serializer.save(owner=user, merchant=merchant)
     
     @action(detail=False, methods=['get'])
+    @cache_response(Listing, *EMBEDDED_MODELS)
     def featured(self, request):
         """ Top 8 rated listings for Home Page """
         featured = self.get_queryset().order_by('-rating')[:8]
@@ -238,7 +339,7 @@ class ListingViewSet(viewsets.ModelViewSet):
             queryset = Listing.objects.filter(owner=user)
 
         serializer = ListingSerializer(
-            queryset.select_related('city', 'city__country', 'sport', 'owner', 'merchant'),
+            queryset.select_related(*LISTING_RELATED),
             many=True,
             context={'request': request}
         )
@@ -0,0 +1,205 @@
+"""
+Geo helpers for City-based proximity search.
+
+Cities carry a geohash (btree-indexed). A radius / bounding-box query is
+turned into a handful of geohash prefixes covering the box (index range
+scans), narrowed by the lat/lng box and refined with the Haversine distance.
+"""
+import math
+
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_PRECISION = 12
+MAX_COVER_CELLS = 32
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bit, ch, even = 0, 0, True
+
+    while len(chars) < precision:
+        rng, value = (lng_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            ch = (ch << 1) | 1
+            rng[0] = mid
+        else:
+            ch = ch << 1
+            rng[1] = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(_BASE32[ch])
+            bit, ch = 0, 0
+
+    return "".join(chars)
+
+
+def _cell_size(precision: int):
+    bits = 5 * precision
+    lng_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits), lat_bits, lng_bits
+
+
+def _cell_ranges(min_lat, min_lng, max_lat, max_lng, precision):
+    lat_h, lng_w, lat_bits, lng_bits = _cell_size(precision)
+    iy = (int((min_lat + 90) // lat_h), min(int((max_lat + 90) // lat_h), (1 << lat_bits) - 1))
+    ix = (int((min_lng + 180) // lng_w), min(int((max_lng + 180) // lng_w), (1 << lng_bits) - 1))
+    return iy, ix, lat_h, lng_w
+
+
+def geohash_cover(boxes):
+    """
+    Geohash prefixes covering all `boxes` [(min_lat, min_lng, max_lat, max_lng)].
+    Uses the finest precision that stays within MAX_COVER_CELLS prefixes;
+    returns [] when even 1-char cells are too many (i.e. "whole world").
+    """
+    for precision in range(8, 0, -1):
+        ranges = [_cell_ranges(*box, precision) for box in boxes]
+        total = sum((iy[1] - iy[0] + 1) * (ix[1] - ix[0] + 1) for iy, ix, _, _ in ranges)
+        if total > MAX_COVER_CELLS:
+            continue
+
+        cells = set()
+        for (iy0, iy1), (ix0, ix1), lat_h, lng_w in ranges:
+            for iy in range(iy0, iy1 + 1):
+                for ix in range(ix0, ix1 + 1):
+                    cells.add(geohash_encode(-90 + (iy + 0.5) * lat_h, -180 + (ix + 0.5) * lng_w, precision))
+        return sorted(cells)
+    return []
+
+
+def haversine_km(lat1, lng1, lat2, lng2) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dlat = p2 - p1
+    dlng = math.radians(lng2 - lng1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+
+
+def haversine_expression(latitude, longitude, lat_field="latitude", lng_field="longitude"):
+    """
+    Great-circle distance (km) from (latitude, longitude) to the row's coordinates.
+    """
+    def const(value):
+        return Value(float(value), output_field=FloatField())
+
+    dlat = Radians(F(lat_field) - const(latitude))
+    dlng = Radians(F(lng_field) - const(longitude))
+    a = (
+        Power(Sin(dlat / const(2)), 2)
+        + Cos(Radians(const(latitude))) * Cos(Radians(F(lat_field))) * Power(Sin(dlng / const(2)), 2)
+    )
+    # Rounding can push sqrt(a) just past 1 for near-antipodal points
+    return const(2 * EARTH_RADIUS_KM) * ASin(Least(Sqrt(a), const(1)))
+
+
+def split_antimeridian(min_lat, min_lng, max_lat, max_lng):
+    """
+    Normalizes a box to [-180, 180] longitudes, splitting it in two when it
+    crosses the antimeridian.
+    """
+    min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0)
+    if max_lng - min_lng >= 360:
+        return [(min_lat, -180.0, max_lat, 180.0)]
+
+    min_lng = ((min_lng + 180) % 360) - 180
+    max_lng = ((max_lng + 180) % 360) - 180
+    if min_lng <= max_lng:
+        return [(min_lat, min_lng, max_lat, max_lng)]
+    return [(min_lat, min_lng, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lng)]
+
+
+def radius_box(latitude, longitude, radius_km):
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = math.cos(math.radians(latitude))
+    if cos_lat < 1e-6 or latitude + dlat >= 90 or latitude - dlat <= -90:
+        dlng = 360.0  # Polar caps → every longitude
+    else:
+        dlng = math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat))
+    return split_antimeridian(latitude - dlat, longitude - dlng, latitude + dlat, longitude + dlng)
+
+
+def boxes_q(boxes, prefix=""):
+    """
+    Indexed geohash prefix scans + exact lat/lng box for `boxes`.
+    `prefix` is the lookup path to the City (e.g. "city__").
+    """
+    q = Q()
+    for cell in geohash_cover(boxes):
+        q |= Q(**{f"{prefix}geohash__startswith": cell})
+
+    box_q = Q()
+    for min_lat, min_lng, max_lat, max_lng in boxes:
+        box_q |= Q(**{
+            f"{prefix}latitude__range": (min_lat, max_lat),
+            f"{prefix}longitude__range": (min_lng, max_lng),
+        })
+    return q & box_q
+
+
+def _floats(raw, count, param):
+    try:
+        values = [float(v) for v in raw.split(",")]
+    except (TypeError, ValueError):
+        values = []
+    if len(values) != count or not all(math.isfinite(v) for v in values):
+        raise ValidationError({param: f"Expected {count} comma-separated numbers."})
+    return values
+
+
+class CityGeoFilter(BaseFilterBackend):
+    """
+    Proximity filters on a model linked to City (`view.geo_city_field`).
+
+    - ?near=<lat>,<lng>&radius_km=<km>  → within radius (default 50 km),
+      annotated with `distance_km` and ordered by distance.
+    - ?bbox=<min_lng>,<min_lat>,<max_lng>,<max_lat>  → inside the map viewport.
+    """
+    default_radius_km = 50.0
+    max_radius_km = 2000.0
+
+    def filter_queryset(self, request, queryset, view):
+        city_field = getattr(view, "geo_city_field", "city")
+        prefix = f"{city_field}__"
+
+        bbox = request.query_params.get("bbox")
+        if bbox:
+            min_lng, min_lat, max_lng, max_lat = _floats(bbox, 4, "bbox")
+            if min_lat > max_lat:
+                raise ValidationError({"bbox": "min_lat must be <= max_lat."})
+            boxes = split_antimeridian(min_lat, min_lng, max_lat, max_lng)
+            queryset = queryset.filter(boxes_q(boxes, prefix))
+
+        near = request.query_params.get("near")
+        if near:
+            latitude, longitude = _floats(near, 2, "near")
+            if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                raise ValidationError({"near": "Invalid coordinates."})
+
+            (radius_km,) = _floats(
+                request.query_params.get("radius_km", str(self.default_radius_km)), 1, "radius_km"
+            )
+            radius_km = min(max(radius_km, 0.0), self.max_radius_km)
+
+            queryset = (
+                queryset.filter(boxes_q(radius_box(latitude, longitude, radius_km), prefix))
+                .annotate(distance_km=haversine_expression(
+                    latitude, longitude,
+                    lat_field=f"{prefix}latitude",
+                    lng_field=f"{prefix}longitude",
+                ))
+                .filter(distance_km__lte=radius_km)
+                .order_by("distance_km")
+            )
+
+        return queryset
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:38
+
+from django.db import migrations, models
+
+
+def backfill_geohash(apps, schema_editor):
+    from apps.locations.geo import geohash_encode
+
+    City = apps.get_model("locations", "City")
+    batch = []
+    for city in City.objects.only("id", "latitude", "longitude").iterator(chunk_size=2000):
+        city.geohash = geohash_encode(city.latitude, city.longitude)
+        batch.append(city)
+        if len(batch) >= 2000:
+            City.objects.bulk_update(batch, ["geohash"])
+            batch = []
+    if batch:
+        City.objects.bulk_update(batch, ["geohash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0002_alter_city_slug'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='city',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,8 @@
 import uuid
 from django.db import models
 
+from .geo import geohash_encode
+
 class Country(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     code = models.CharField(max_length=2, unique=True)
@@ -16,6 +18,8 @@ class City(models.Model):
     slug = models.SlugField(max_length=150)
     latitude = models.FloatField()
     longitude = models.FloatField()
+    # Spatial grid cell (see apps.locations.geo) → btree prefix scans for radius / bbox search
+    geohash = models.CharField(max_length=12, blank=True, db_index=True, editable=False)
     country = models.ForeignKey(Country, on_delete=models.CASCADE, related_name="cities")
 
     class Meta:
@@ -24,5 +28,10 @@ class City(models.Model):
             models.Index(fields=["name"]),
         ]
 
+    def save(self, *args, **kwargs):
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = geohash_encode(self.latitude, self.longitude)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.name
\ No newline at end of file
@@ -0,0 +1,114 @@
+import math
+
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from apps.listings.models import Listing, Sport
+from apps.locations.geo import (
+    EARTH_RADIUS_KM,
+    geohash_cover,
+    geohash_encode,
+    haversine_expression,
+    haversine_km,
+    radius_box,
+    split_antimeridian,
+)
+from apps.locations.models import City, Country
+from apps.users.models import User
+
+
+class GeoHelperTests(SimpleTestCase):
+    def test_geohash_encode(self):
+        self.assertEqual(geohash_encode(57.64911, 10.40744, 11), "u4pruydqqvj")
+        self.assertEqual(geohash_encode(-25.382708, -49.265506, 6), "6gkzwg")
+
+    def test_haversine(self):
+        madrid, barcelona = (40.4168, -3.7038), (41.3874, 2.1686)
+        self.assertAlmostEqual(haversine_km(*madrid, *barcelona), 505, delta=2)
+        self.assertAlmostEqual(haversine_km(36.0, -5.6, -36.0, 174.4), math.pi * EARTH_RADIUS_KM, delta=0.01)
+
+    def test_cover_contains_points_in_the_box(self):
+        box = (35.9, -5.8, 36.6, -5.5)
+        cover = geohash_cover([box])
+
+        self.assertLessEqual(len(cover), 32)
+        for lat, lng in [(35.9, -5.8), (36.01, -5.6), (36.6, -5.5)]:
+            self.assertTrue(any(geohash_encode(lat, lng).startswith(cell) for cell in cover))
+        self.assertNotIn(True, [geohash_encode(40.42, -3.7).startswith(cell) for cell in cover])
+
+    def test_cover_falls_back_to_coarser_cells(self):
+        self.assertEqual(len(geohash_cover([(-90, -180, 90, 180)])), 32)
+        self.assertEqual(len(geohash_cover([(-90, -180, 90, 180), (0, 0, 1, 1)])), 0)
+
+    def test_boxes_crossing_the_antimeridian_are_split(self):
+        self.assertEqual(
+            split_antimeridian(-20, 170, -10, 190),
+            [(-20, 170, -10, 180.0), (-20, -180.0, -10, -170)],
+        )
+        self.assertEqual(split_antimeridian(-95, 0, 95, 400), [(-90.0, -180.0, 90.0, 180.0)])
+
+    def test_radius_box_near_a_pole_spans_every_longitude(self):
+        ((min_lat, min_lng, max_lat, max_lng),) = radius_box(89.9, 10, 50)
+        self.assertEqual((min_lng, max_lng), (-180.0, 180.0))
+        self.assertLess(min_lat, 89.9)
+
+
+class CityGeoFilterTests(TestCase):
+    CITIES = {
+        "Tarifa": (36.01, -5.60),
+        "Cádiz": (36.53, -6.29),
+        "Madrid": (40.42, -3.70),
+        "Suva": (-18.14, 178.44),
+        "Apia": (-13.83, -171.76),
+    }
+
+    def setUp(self):
+        self.client = APIClient()
+        country = Country.objects.create(code="XX", name="Anywhere")
+        sport = Sport.objects.create(name="Kitesurf", slug="kitesurf")
+        owner = User.objects.create_user(email="school@example.com", password="x", role="PROVIDER")
+        for name, (latitude, longitude) in self.CITIES.items():
+            city = City.objects.create(
+                name=name, slug=name.lower(), latitude=latitude, longitude=longitude, country=country
+            )
+            Listing.objects.create(
+                owner=owner, title=f"Kite in {name}", description="Learn to kite", type="SESSION",
+                sport=sport, city=city, price=50, universal_level="BEGINNER",
+            )
+
+    def search(self, **params):
+        response = self.client.get("/api/listings/", params, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def test_near_filters_by_radius_and_orders_by_distance(self):
+        results = self.search(near="36.0,-5.5", radius_km=100)
+
+        self.assertEqual([r["title"] for r in results], ["Kite in Tarifa", "Kite in Cádiz"])
+        distances = [r["distance_km"] for r in results]
+        self.assertEqual(distances, sorted(distances))
+        self.assertAlmostEqual(distances[0], haversine_km(36.0, -5.5, 36.01, -5.60), places=2)
+
+    def test_default_radius(self):
+        self.assertEqual(len(self.search(near="36.01,-5.6")), 1)  # 50 km: Cádiz is ~85 km away
+
+    def test_bbox(self):
+        results = self.search(bbox="-7,35,-3,41")
+        self.assertEqual({r["title"] for r in results}, {"Kite in Tarifa", "Kite in Cádiz", "Kite in Madrid"})
+
+    def test_bbox_across_the_antimeridian(self):
+        results = self.search(bbox="170,-20,-170,-10")
+        self.assertEqual({r["title"] for r in results}, {"Kite in Suva", "Kite in Apia"})
+
+    def test_invalid_coordinates_are_rejected(self):
+        for params in ({"near": "91,0"}, {"near": "north"}, {"bbox": "0,10,1,5"}):
+            response = self.client.get("/api/listings/", params, secure=True)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_antipodal_distance(self):
+        # Rounding can push the haversine term past 1: asin must not fail / go NULL
+        latitude, longitude = self.CITIES["Tarifa"]
+        city = City.objects.annotate(
+            d=haversine_expression(-latitude, longitude + 180)
+        ).get(name="Tarifa")
+        self.assertAlmostEqual(city.d, math.pi * EARTH_RADIUS_KM, delta=0.01)
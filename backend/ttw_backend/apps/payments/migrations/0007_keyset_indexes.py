@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0015_keyset_indexes'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('payments', '0006_merchantpayout_platform_fee_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='merchantpayout',
+            index=models.Index(fields=['created_at', 'id'], name='payments_me_created_63db97_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['created_at', 'id'], name='payments_tr_created_60b600_idx'),
+        ),
+    ]
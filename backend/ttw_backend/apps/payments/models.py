@@ -29,6 +29,11 @@ class Transaction(models.Model):
     error_message = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"]),  # Keyset pagination
+        ]
+
     def __str__(self):
         return f"{self.type} - {self.amount} ({self.status})"
 
@@ -97,6 +102,11 @@ class MerchantPayout(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     paid_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"]),  # Keyset pagination
+        ]
+
     def __str__(self):
         return f"Payout {self.amount_due} {self.currency} → {self.merchant}"
 
@@ -20,6 +20,7 @@ from apps.core.tasks import (
 )
 from django.contrib.auth import get_user_model
 from apps.bookings.models import Booking
+from apps.calendar.reconcile import materialize_on_commit
 from .models import Transaction, MerchantPayout, PremiumSignupIntent
 from django.utils import timezone
 
@@ -40,6 +41,7 @@ from django.db import transaction as db_transaction
 # --- STRIPE HANDLED EVENTS ---
 STRIPE_HANDLED_EVENTS = {
     "checkout.session.completed",
+    "checkout.session.expired",
     "invoice.payment_succeeded",
     "payment_intent.succeeded",
     "payment_intent.canceled",
@@ -243,6 +245,7 @@ def _handle_checkout_session_completed(event):
             booking.payment_authorized_at = timezone.now()
             _ensure_booking_snapshot_and_financials(booking)
             booking.save()
+            materialize_on_commit(booking)
             Transaction.objects.create(
                 booking=booking,
                 stripe_id=session["payment_intent"],
@@ -272,6 +275,27 @@ def _handle_checkout_session_completed(event):
     print(f"END _handle_checkout_session_completed, event_id={event['id']}")
 
 
+def _handle_checkout_session_expired(event):
+    print(f"START _handle_checkout_session_expired, event_id={event['id']}")
+    with db_transaction.atomic():
+        session = event['data']['object']
+        booking_id = (session.get('metadata') or {}).get('booking_id')
+        if not booking_id:
+            print(f"END _handle_checkout_session_expired, event_id={event['id']}")
+            return
+        # Abandoned checkout: the booking was never paid, give its seats back
+        # (Booking.save releases them on cancellation; replays find nothing)
+        booking = Booking.objects.filter(
+            id=booking_id,
+            status=Booking.Status.AUTHORIZED,
+            payment_authorized_at__isnull=True,
+        ).first()
+        if booking is not None:
+            booking.status = Booking.Status.CANCELLED
+            booking.save()
+    print(f"END _handle_checkout_session_expired, event_id={event['id']}")
+
+
 def _handle_invoice_payment_succeeded(event):
     print(f"START _handle_invoice_payment_succeeded, event_id={event['id']}")
     with db_transaction.atomic():
@@ -360,6 +384,8 @@ def stripe_main_webhook(request):
         return HttpResponse(status=400)
     if event['type'] == 'checkout.session.completed':
         _handle_checkout_session_completed(event)
+    elif event['type'] == 'checkout.session.expired':
+        _handle_checkout_session_expired(event)
     elif event['type'] == 'invoice.payment_succeeded':
         _handle_invoice_payment_succeeded(event)
     elif event["type"] == "payment_intent.succeeded":
@@ -390,6 +416,8 @@ def stripe_webhook(request):
         return HttpResponse(status=200)
     if event_type == "checkout.session.completed":
         _handle_checkout_session_completed(event)
+    elif event_type == "checkout.session.expired":
+        _handle_checkout_session_expired(event)
     elif event_type == "invoice.payment_succeeded":
         _handle_invoice_payment_succeeded(event)
     elif event_type == "payment_intent.succeeded":
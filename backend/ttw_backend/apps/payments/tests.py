@@ -1,3 +1,63 @@
+from datetime import timedelta
+from unittest import mock
+
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from apps.bookings.models import Booking
+from apps.core.models import OutboxEmail
+from apps.listings.models import Listing, Sport
+from apps.locations.models import City, Country
+from apps.payments.views import stripe_webhook
+from apps.users.models import User
+
+
+class AuthorizedWebhookTests(TestCase):
+    def setUp(self):
+        country = Country.objects.create(code="ES", name="Spain")
+        city = City.objects.create(
+            name="Tarifa", slug="tarifa", latitude=36.01, longitude=-5.6, country=country
+        )
+        owner = User.objects.create_user(email="school@example.com", password="x", role="PROVIDER")
+        traveler = User.objects.create_user(email="traveler@example.com", password="x")
+        listing = Listing.objects.create(
+            owner=owner,
+            title="Kite camp",
+            description="Learn to kite",
+            type="TRIP",
+            sport=Sport.objects.create(name="Kitesurf", slug="kitesurf"),
+            city=city,
+            price=100,
+            universal_level="BEGINNER",
+        )
+        self.booking = Booking.objects.create(
+            listing=listing,
+            user=traveler,
+            start_date=timezone.now().date() + timedelta(days=10),
+            guests=1,
+            total_price=100,
+        )
+
+    def test_emails_are_queued_with_plain_context(self):
+        event = {
+            "type": "payment_intent.amount_authorized",
+            "data": {"object": {"id": "pi_1", "amount": 10000, "metadata": {"booking_id": str(self.booking.pk)}}},
+        }
+        request = APIRequestFactory().post("/", b"{}", content_type="application/json", HTTP_STRIPE_SIGNATURE="t")
+
+        with mock.patch("stripe.Webhook.construct_event", return_value=event), \
+                mock.patch("apps.core.tasks.dispatch_outbox_email.delay"), \
+                mock.patch("apps.calendar.tasks.materialize_booking_task.delay"), \
+                mock.patch("apps.core.emails.send_email") as send_email:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = stripe_webhook(request)
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 200)
+        send_email.assert_not_called()
+        emails = OutboxEmail.objects.all()
+        self.assertEqual(
+            sorted(e.template for e in emails),
+            ["booking_authorized_admin", "booking_authorized_provider", "booking_authorized_user"],
+        )
+        self.assertTrue(all(e.context["title"] == "Kite camp" for e in emails))
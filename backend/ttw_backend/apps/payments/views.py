@@ -17,9 +17,14 @@ stripe.api_key = settings.STRIPE_SECRET_KEY
 
 from .utils import create_checkout_session, create_stripe_express_account, create_account_link
 from apps.bookings.models import Booking
+from apps.bookings.availability import SoldOut, release_seats, reserve_seats
+from apps.calendar.reconcile import materialize_on_commit
 from apps.providers.models import ProviderProfile
 from apps.payments.models import MerchantPayout, Transaction, PremiumSignupIntent
 from apps.payments.serializers import MerchantPayoutSerializer, AdminTransactionSerializer
+from apps.core.email_templates import booking_email_data
+from apps.core.outbox import enqueue_email
+from apps.core.pagination import KeysetPagination
 
 
 class CreateCheckoutSessionView(views.APIView):
@@ -48,14 +53,22 @@ class CreateCheckoutSessionView(views.APIView):
         from apps.listings.models import Listing
         listing = get_object_or_404(Listing, id=listing_id)
 
-        booking = Booking.objects.create(
-            user=request.user,
-            listing=listing,
-            start_date=start_date,
-            guests=guests,
-            total_price=listing.price * guests,
-            status=Booking.Status.AUTHORIZED
-        )
+        if guests < 1:
+            return Response({"error": "Invalid guests value."}, status=400)
+
+        try:
+            with db_transaction.atomic():
+                booking = Booking.objects.create(
+                    user=request.user,
+                    listing=listing,
+                    start_date=start_date,
+                    guests=guests,
+                    total_price=listing.price * guests,
+                    status=Booking.Status.AUTHORIZED,
+                    slot=reserve_seats(listing, start_date, guests),
+                )
+        except SoldOut as exc:
+            return Response({"error": str(exc.detail)}, status=exc.status_code)
         booking_id = booking.id
 
         try:
@@ -73,6 +86,8 @@ class CreateCheckoutSessionView(views.APIView):
 
             return Response({"url": url})
         except Exception as e:
+            # No checkout, no seats held
+            release_seats(booking)
             return Response({"error": str(e)}, status=400)
 
 
@@ -327,6 +342,7 @@ class AdminTransactionViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class = AdminTransactionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination  # ?cursor= → keyset on (created_at, id)
 
     def get_queryset(self):
         return Transaction.objects.select_related(
@@ -349,6 +365,7 @@ class AdminMerchantPayoutViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class = MerchantPayoutSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination  # ?cursor= → keyset on (created_at, id)
 
     def get_queryset(self):
         return MerchantPayout.objects.select_related(
@@ -542,57 +559,55 @@ def stripe_webhook(request):
             return Response(status=200)
 
         try:
-            booking = Booking.objects.get(id=booking_id)
+            booking = Booking.objects.select_related("user", "listing__owner").get(id=booking_id)
         except Booking.DoesNotExist:
             return Response(status=200)
 
-        booking.status = Booking.Status.AUTHORIZED
-        booking.stripe_payment_intent_id = data.get("id")
-        booking.authorized_amount = Decimal(data.get("amount", 0)) / 100
-        booking.save(update_fields=[
-            "status",
-            "stripe_payment_intent_id",
-            "authorized_amount",
-        ])
-
-        # ---------------- EMAILS ----------------
-        from apps.core.emails import send_email
-
-        # USER
-        if booking.user and booking.user.email:
-            send_email(
-                subject="Your booking is authorized – The Travel Wild",
-                to=[booking.user.email],
-                template="booking_authorized_user",
-                context={
-                    "booking": booking,
-                },
-            )
+        with db_transaction.atomic():
+            booking.status = Booking.Status.AUTHORIZED
+            booking.stripe_payment_intent_id = data.get("id")
+            booking.payment_authorized_at = timezone.now()
+            booking.save(update_fields=[
+                "status",
+                "stripe_payment_intent_id",
+                "payment_authorized_at",
+            ])
+            materialize_on_commit(booking)
+
+            # ---------------- EMAILS ----------------
+            # Queued with the booking update, sent (batched) by Celery after
+            # commit: a slow or rate-limited provider can't fail the webhook
+            context = booking_email_data(booking)
+
+            # USER
+            if booking.user and booking.user.email:
+                enqueue_email(
+                    subject="Your booking is authorized – The Travel Wild",
+                    to=[booking.user.email],
+                    template="booking_authorized_user",
+                    context=context,
+                )
 
-        # PROVIDER
-        provider_email = booking.listing.owner.email if booking.listing.owner else None
-        if provider_email:
-            send_email(
-                subject="New booking authorized – The Travel Wild",
-                to=[provider_email],
-                template="booking_authorized_provider",
-                context={
-                    "booking": booking,
-                },
-            )
+            # PROVIDER
+            provider_email = booking.listing.owner.email if booking.listing.owner else None
+            if provider_email:
+                enqueue_email(
+                    subject="New booking authorized – The Travel Wild",
+                    to=[provider_email],
+                    template="booking_authorized_provider",
+                    context=context,
+                )
 
-        # ADMIN / OPS
-        send_email(
-            subject="New booking authorized – Admin notification",
-            to=[settings.SUPPORT_EMAIL],
-            template="booking_authorized_admin",
-            context={
-                "booking": booking,
-            },
-        )
+            # ADMIN / OPS
+            enqueue_email(
+                subject="New booking authorized – Admin notification",
+                to=[settings.SUPPORT_EMAIL],
+                template="booking_authorized_admin",
+                context=context,
+            )
 
-        # ---------------- CHAT ----------------
-        from apps.chat.models import ChatRoom
-        ChatRoom.objects.get_or_create(booking=booking)
+            # ---------------- CHAT ----------------
+            from apps.chat.models import ChatRoom
+            ChatRoom.objects.get_or_create(booking=booking)
 
     return Response(status=200)
\ No newline at end of file
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('providers', '0010_alter_providerprofile_stripe_connect_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='merchantprofile',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='providerprofile',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
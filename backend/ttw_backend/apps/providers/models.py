@@ -24,6 +24,7 @@ class MerchantProfile(models.Model):
     phone = models.CharField(max_length=50, blank=True, null=True)
     logo = models.URLField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.user.email} ({self.type})"
@@ -126,6 +127,7 @@ class ProviderProfile(models.Model):
     auto_accept_bookings = models.BooleanField(default=False)
     
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.company_name
@@ -166,8 +168,9 @@ class Message(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_save
 from django.dispatch import receiver
+from django.utils import timezone
 
 @receiver(post_save, sender=ProviderProfile)
 def ensure_merchant_profile(sender, instance, created, **kwargs):
@@ -230,4 +233,22 @@ def ensure_merchant_for_instructor(sender, instance, created, **kwargs):
     # Sync commission rate if instructor already had a merchant
     if instructor and merchant and merchant.commission_rate != instructor.commission_rate:
         merchant.commission_rate = instructor.commission_rate
-        merchant.save(update_fields=["commission_rate"])
\ No newline at end of file
+        merchant.save(update_fields=["commission_rate"])
+
+
+@receiver(m2m_changed, sender=ProviderProfile.sports.through)
+def touch_profile_on_sports_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    The through table has no timestamps: bump the profiles' updated_at so
+    sports changes reach the dashboard's ETag.
+    """
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        profiles = ProviderProfile.objects.filter(pk=instance.pk)
+    elif reverse and action in ("post_add", "post_remove"):
+        profiles = ProviderProfile.objects.filter(pk__in=pk_set)
+    elif reverse and action == "pre_clear":
+        # sport.providers.clear(): pk_set isn't known afterwards
+        profiles = ProviderProfile.objects.filter(sports=instance)
+    else:
+        return
+    profiles.update(updated_at=timezone.now())
@@ -1,3 +1,43 @@
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from apps.listings.models import Sport
+from apps.users.models import User
+
+
+class DashboardETagTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="school@example.com", password="x", role="PROVIDER"
+        )
+        self.profile = self.user.provider_profile
+        self.sport = Sport.objects.create(name="Kitesurf", slug="kitesurf")
+        self.client = APIClient()
+
+    def etag(self):
+        # A fresh user per request, like the real authentication
+        self.client.force_authenticate(User.objects.get(pk=self.user.pk))
+        response = self.client.get("/api/providers/dashboard/", secure=True)
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"]
+
+    def assertChangesETag(self, change):
+        etag = self.etag()
+        change()
+        self.assertNotEqual(self.etag(), etag)
+
+    def test_sports_changes_change_the_etag(self):
+        self.assertChangesETag(lambda: self.profile.sports.add(self.sport))
+        self.assertChangesETag(lambda: self.sport.providers.clear())
+        self.assertChangesETag(lambda: self.sport.providers.add(self.profile))
+
+    def test_sport_renames_change_the_etag(self):
+        self.profile.sports.add(self.sport)
+        self.sport.name = "Kiteboarding"
+
+        def rename():
+            with self.captureOnCommitCallbacks(execute=True):
+                self.sport.save()
+        self.assertChangesETag(rename)
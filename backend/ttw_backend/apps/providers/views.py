@@ -6,6 +6,9 @@ from django.db.models import Q
 from rest_framework.authentication import SessionAuthentication
 
 from apps.providers.models import MerchantProfile
+from apps.listings.models import Sport
+from apps.locations.models import City, Country
+from apps.users.models import User
 
 from .models import ProviderProfile, ProviderNotification, Conversation, Message
 from .serializers import (
@@ -20,6 +23,8 @@ from .serializers import (
 )
 from apps.providers.serializers import ProviderDocumentsSerializer
 from apps.core.tasks import send_provider_documents_uploaded_email_task
+from apps.core.cache import cache_response, model_versions
+from apps.core.conditional import version_stamp, not_modified, set_validators
 
 class ProviderViewSet(viewsets.ModelViewSet):
     def create(self, request, *args, **kwargs):
@@ -33,6 +38,11 @@ class ProviderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         return super().create(request, *args, **kwargs)
+
+    @cache_response(ProviderProfile, User, City, Country, Sport)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
             return [permissions.AllowAny()]
@@ -91,11 +101,24 @@ class ProviderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
 
+        # Profile, merchant (commission / Stripe) and user rows all carry
+        # updated_at; sports changes touch the profile's (see models.py)
+        merchant = profile.merchant
+        stamp = version_stamp(
+            (1, profile.updated_at),
+            (1 if merchant else 0, merchant.updated_at if merchant else None),
+            (1, request.user.updated_at),
+            extra=model_versions(Sport),  # Sport names are rendered
+        )
+        cached = not_modified(request, stamp)
+        if cached is not None:
+            return cached
+
         serializer = ProviderMeSerializer(
             profile,
             context={"request": request}
         )
-        return Response(serializer.data)
+        return set_validators(Response(serializer.data), stamp)
 
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def notifications(self, request):
@@ -1,3 +1,39 @@
+from unittest import mock
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.core.models import OutboxEmail
+from apps.users.models import User
+
+
+class AuthEmailTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_register_queues_verification_email(self):
+        with mock.patch("apps.core.tasks.dispatch_outbox_email.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post("/api/auth/register/", {
+                    "email": "new@example.com",
+                    "password": "long-enough",
+                    "first_name": "New",
+                    "last_name": "User",
+                }, secure=True)
+
+        self.assertEqual(response.status_code, 200)
+        email = OutboxEmail.objects.get()
+        self.assertEqual((email.template, email.to), ("verification", ["new@example.com"]))
+        self.assertEqual(email.context["code"], User.objects.get().verification_code)
+        delay.assert_called_once_with(email.pk)
+
+    def test_password_reset_queues_email(self):
+        User.objects.create_user(email="old@example.com", password="x")
+
+        with mock.patch("apps.core.tasks.dispatch_outbox_email.delay"):
+            response = self.client.post(
+                "/api/auth/password-reset/request", {"email": "old@example.com"}, secure=True
+            )
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(OutboxEmail.objects.get().template, "password_reset")
@@ -6,9 +6,10 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
 import random
 
-# Use Resend email utility for all outgoing emails (production-safe)
-from apps.core.emails import send_email
-from apps.core.emails import verification_email_html, password_reset_email_html
+# Outgoing emails go through the outbox: sent by Celery after commit, so a
+# slow or rate-limited mail provider never blocks (or fails) the request
+from django.db import transaction
+from apps.core.outbox import enqueue_email
 import random
 
 # --- MODELS & SERIALIZERS ---
@@ -39,30 +40,32 @@ class RegisterView(APIView):
     def post(self, request):
         serializer = RegisterSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        
-        # Create inactive user
-        user = serializer.save()
-        user.is_active = False # Cannot login yet
-        # --- CREATE ROLE PROFILE (PENDING VERIFICATION) ---
-        if user.role == User.Roles.PROVIDER:
-            ProviderProfile.objects.get_or_create(
-                user=user,
-                defaults={"verification_status": "PENDING"}
+
+        with transaction.atomic():
+            # Create inactive user
+            user = serializer.save()
+            user.is_active = False # Cannot login yet
+            # --- CREATE ROLE PROFILE (PENDING VERIFICATION) ---
+            if user.role == User.Roles.PROVIDER:
+                ProviderProfile.objects.get_or_create(
+                    user=user,
+                    defaults={"verification_status": "PENDING"}
+                )
+            elif user.role == User.Roles.INSTRUCTOR:
+                InstructorProfile.objects.get_or_create(user=user)
+
+            # Generate 6-digit code
+            code = str(random.randint(100000, 999999))
+            user.verification_code = code
+            user.save()
+
+            # Queue verification email (sent after commit)
+            enqueue_email(
+                to=user.email,
+                subject="Verify your email",
+                template="verification",
+                context={"code": code},
             )
-        elif user.role == User.Roles.INSTRUCTOR:
-            InstructorProfile.objects.get_or_create(user=user)
-        
-        # Generate 6-digit code
-        code = str(random.randint(100000, 999999))
-        user.verification_code = code
-        user.save()
-        
-        # Send verification email (PRODUCTION SAFE)
-        send_email(
-            to=user.email,
-            subject="Verify your email",
-            html=verification_email_html(code)
-        )
 
         return Response({
             "message": "Verification code sent to email",
@@ -134,15 +137,17 @@ class PasswordResetRequestView(APIView):
 
         # Generate 6-digit reset code
         code = str(random.randint(100000, 999999))
-        user.verification_code = code
-        user.save()
+        with transaction.atomic():
+            user.verification_code = code
+            user.save()
 
-        # Send password reset email (PRODUCTION SAFE)
-        send_email(
-            to=user.email,
-            subject="Reset your password",
-            html=password_reset_email_html(code)
-        )
+            # Queue password reset email (sent after commit)
+            enqueue_email(
+                to=user.email,
+                subject="Reset your password",
+                template="password_reset",
+                context={"code": code},
+            )
 
         return Response({"message": "Reset code sent to email"}, status=200)
 
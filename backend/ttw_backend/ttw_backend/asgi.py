@@ -8,13 +8,13 @@ django.setup()
 
 # 2. Import Channels AFTER django.setup()
 from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
+from apps.chat.middleware import JWTAuthMiddlewareStack
 from apps.chat.routing import websocket_urlpatterns
 
 # 3. Define the Application
 application = ProtocolTypeRouter({
     "http": get_asgi_application(),
-    "websocket": AuthMiddlewareStack(
+    "websocket": JWTAuthMiddlewareStack(
         URLRouter(websocket_urlpatterns)
     ),
 })
\ No newline at end of file
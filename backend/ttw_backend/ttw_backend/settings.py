@@ -209,9 +209,43 @@ else:
         },
     }
 
+# --- CACHE CONFIGURATION ---
+# "default": Redis when available (shared by all workers), otherwise in-process.
+# "local": in-process LRU, also used as fallback when Redis is unreachable.
+CACHE_URL = os.getenv("CACHE_URL") or os.getenv("REDIS_URL")
+
+LOCAL_CACHE = {
+    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    "LOCATION": "ttw-local",
+    "OPTIONS": {"MAX_ENTRIES": 1000},
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": CACHE_URL,
+        "KEY_PREFIX": "ttw",
+        "OPTIONS": {"socket_connect_timeout": 1, "socket_timeout": 1},
+    } if CACHE_URL else LOCAL_CACHE,
+    "local": LOCAL_CACHE,
+}
+
+# Response caching (apps.core.cache.cache_response) is only on with the shared
+# cache: per-process copies never see other workers' version bumps and would
+# serve stale responses for the whole TTL.
+RESPONSE_CACHE = bool(CACHE_URL)
+
 RESEND_API_KEY = os.getenv("RESEND_API_KEY")
 EMAIL_FROM = os.getenv("EMAIL_FROM")
 
+# How emails reach the provider (see apps/core/transport.py)
+EMAIL_TRANSPORT = {
+    "BACKEND": os.getenv("EMAIL_TRANSPORT_BACKEND", "apps.core.transport.ResendTransport"),
+    "OPTIONS": {
+        "base_url": os.getenv("RESEND_API_URL", "https://api.resend.com"),
+    },
+}
+
 # --- CUSTOM EMAIL ADDRESSES (USED BY apps/core/emails.py) ---
 
 EMAIL_FROM_NOREPLY = os.getenv(
@@ -237,11 +271,37 @@ EMAIL_REPLY_TO = os.getenv(
 # Partner / Admin emails
 PARTNERS_EMAIL = os.getenv("PARTNERS_EMAIL", SUPPORT_EMAIL)
 
+# Global outbound email budget (shared token bucket, see apps/core/ratelimit.py).
+# Resend allows 2 requests/second per team.
+EMAIL_RATE_LIMIT = {
+    "RATE": float(os.getenv("EMAIL_RATE_PER_SECOND", "2")),
+    "BURST": int(os.getenv("EMAIL_RATE_BURST", "2")),
+    # How long a web request may wait for a token (tasks never wait)
+    "SYNC_TIMEOUT": float(os.getenv("EMAIL_RATE_SYNC_TIMEOUT", "5")),
+}
+
 # --- CELERY CONFIGURATION ---
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_BACKEND = "django-db"
+CELERY_BEAT_SCHEDULE = {
+    # Emails left in the outbox (broker outage / lost task)
+    "flush-email-outbox": {
+        "task": "apps.core.tasks.flush_email_outbox",
+        "schedule": 60.0,
+    },
+    # Bookings not yet on the provider calendar (lost materialize task)
+    "sweep-calendar-bookings": {
+        "task": "apps.calendar.tasks.sweep_calendar_bookings",
+        "schedule": 300.0,
+    },
+    # Listings' weeklySchedule → sessions over the rolling horizon
+    "generate-recurring-sessions": {
+        "task": "apps.calendar.tasks.generate_recurring_sessions",
+        "schedule": 3600.0,
+    },
+}
 
 # --- SECURITY SETTINGS ---
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
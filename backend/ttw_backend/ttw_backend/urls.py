@@ -5,7 +5,7 @@ from django.conf.urls.static import static
 from rest_framework.routers import DefaultRouter
 
 from apps.listings.views import ListingViewSet
-from apps.bookings.views import BookingViewSet
+from apps.bookings.views import BookingViewSet, AvailabilityView
 from apps.providers.views import ProviderViewSet
 from apps.users.views import UserViewSet
 from apps.instructors.views import InstructorViewSet 
@@ -47,6 +47,8 @@ urlpatterns = [
     path("api/", include("apps.destinations.extra_urls")),
     path("api/reviews/", include("apps.reviews.extra_urls")),
     path('api/bookings/', include('apps.bookings.extra_urls')),
+    # Disponibilidad (plazas libres por día)
+    path("api/availability/", AvailabilityView.as_view(), name="availability"),
     path("api/instructors/", include("apps.instructors.extra_urls")),
     
 ]
@@ -299,13 +299,15 @@ function InstructorView() {
         if (!activeBookingId) return;
         const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
         const host = window.location.host; 
-        const wsUrl = `${protocol}//${host}/ws/chat/${activeBookingId}/`;
+        const wsUrl = `${protocol}//${host}/ws/chat/${activeBookingId}/?token=${localStorage.getItem("accessToken")}`;
         const chatSocket = new WebSocket(wsUrl);
 
         chatSocket.onmessage = (e) => {
             try {
                 const data = JSON.parse(e.data);
                 if (data.message) {
+                    // Chat is open: mark it read (also skips the email digest)
+                    chatSocket.send(JSON.stringify({ type: "read" }));
                     setMessages(prev => [...prev, {
                         id: Date.now(),
                         text: data.message,
@@ -1173,12 +1175,14 @@ function ProviderView() {
         if (!activeBookingId) return;
         const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
         const host = window.location.host; 
-        const wsUrl = `${protocol}//${host}/ws/chat/${activeBookingId}/`;
+        const wsUrl = `${protocol}//${host}/ws/chat/${activeBookingId}/?token=${localStorage.getItem("accessToken")}`;
         const chatSocket = new WebSocket(wsUrl);
         chatSocket.onmessage = (e) => {
             try {
                 const data = JSON.parse(e.data);
                 if (data.message) {
+                    // Chat is open: mark it read (also skips the email digest)
+                    chatSocket.send(JSON.stringify({ type: "read" }));
                     setMessages(prev => [...prev, {
                         id: Date.now(),
                         text: data.message,
@@ -126,9 +126,8 @@ const UserDashboard: React.FC = () => {
         // 1. Construct WebSocket URL dynamically
         const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
         const host = window.location.host; 
-        const wsUrl = `${protocol}//${host}/ws/chat/${activeBookingId}/`;
+        const wsUrl = `${protocol}//${host}/ws/chat/${activeBookingId}/?token=${localStorage.getItem("accessToken")}`;
         
-        console.log("Connecting to WebSocket:", wsUrl);
         const chatSocket = new WebSocket(wsUrl);
 
         chatSocket.onopen = () => {
@@ -141,6 +140,8 @@ const UserDashboard: React.FC = () => {
                 
                 // The backend sends: { message: "text", sender_id: "1", created_at: "..." }
                 if (data.message) {
+                    // Chat is open: mark it read (also skips the email digest)
+                    chatSocket.send(JSON.stringify({ type: "read" }));
                     const incomingMessage = {
                         id: Date.now(), // Use temp ID for display
                         text: data.message,